@@ -0,0 +1,30 @@
+"""add click depth columns to pages and simulation_results
+
+Revision ID: add_click_depth_001
+Revises: add_gsc_data_001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_click_depth_001'
+down_revision: Union[str, None] = 'add_gsc_data_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('pages', sa.Column('click_depth', sa.Integer(), nullable=True))
+    op.add_column('pages', sa.Column('crawl_depth', sa.Integer(), nullable=True))
+    op.add_column('simulation_results', sa.Column('new_click_depth', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('simulation_results', 'new_click_depth')
+    op.drop_column('pages', 'crawl_depth')
+    op.drop_column('pages', 'click_depth')
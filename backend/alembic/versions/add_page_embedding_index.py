@@ -0,0 +1,37 @@
+"""add page embedding index table
+
+Revision ID: add_page_embedding_index_001
+Revises: add_page_filter_indexes_001
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_page_embedding_index_001'
+down_revision: Union[str, None] = 'add_page_filter_indexes_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('page_embedding_indexes',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.String(), nullable=False),
+        sa.Column('n_pages', sa.Integer(), nullable=False),
+        sa.Column('dimension', sa.Integer(), nullable=False),
+        sa.Column('page_ids', sa.LargeBinary(), nullable=False),
+        sa.Column('vectors', sa.LargeBinary(), nullable=False),
+        sa.Column('centroids', sa.LargeBinary(), nullable=True),
+        sa.Column('list_bounds', sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('page_embedding_indexes')
@@ -0,0 +1,28 @@
+"""add page type and category indexes
+
+Revision ID: add_page_filter_indexes_001
+Revises: add_simulation_cache_001
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_page_filter_indexes_001'
+down_revision: Union[str, None] = 'add_simulation_cache_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_pages_project_type', 'pages', ['project_id', 'type'], unique=False)
+    op.create_index('ix_pages_project_category', 'pages', ['project_id', 'category'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pages_project_category', table_name='pages')
+    op.drop_index('ix_pages_project_type', table_name='pages')
@@ -0,0 +1,26 @@
+"""add pages_version to projects
+
+Revision ID: add_pages_version_001
+Revises: add_page_embedding_index_001
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_pages_version_001'
+down_revision: Union[str, None] = 'add_page_embedding_index_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('pages_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'pages_version')
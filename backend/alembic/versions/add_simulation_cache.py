@@ -0,0 +1,36 @@
+"""add simulation cache columns
+
+Revision ID: add_simulation_cache_001
+Revises: add_simulation_links_001
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_simulation_cache_001'
+down_revision: Union[str, None] = 'add_simulation_links_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('simulations') as batch_op:
+        batch_op.add_column(sa.Column('cache_key', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('cache_source_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('summary', sa.JSON(), nullable=True))
+        batch_op.create_index('ix_simulations_cache_key', ['cache_key'], unique=False)
+        batch_op.create_foreign_key('fk_simulations_cache_source_id', 'simulations', ['cache_source_id'], ['id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('simulations') as batch_op:
+        batch_op.drop_constraint('fk_simulations_cache_source_id', type_='foreignkey')
+        batch_op.drop_index('ix_simulations_cache_key')
+        batch_op.drop_column('summary')
+        batch_op.drop_column('cache_source_id')
+        batch_op.drop_column('cache_key')
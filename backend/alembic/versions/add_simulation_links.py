@@ -0,0 +1,34 @@
+"""add simulation_links table and simulations.seed
+
+Revision ID: add_simulation_links_001
+Revises: add_result_arrays_001
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_simulation_links_001'
+down_revision: Union[str, None] = 'add_result_arrays_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('simulations', sa.Column('seed', sa.Integer(), nullable=True))
+    op.create_table('simulation_links',
+        sa.Column('simulation_id', sa.Integer(), nullable=False),
+        sa.Column('n_links', sa.Integer(), nullable=False),
+        sa.Column('links', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['simulation_id'], ['simulations.id'], ),
+        sa.PrimaryKeyConstraint('simulation_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('simulation_links')
+    op.drop_column('simulations', 'seed')
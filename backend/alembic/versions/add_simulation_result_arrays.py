@@ -0,0 +1,35 @@
+"""add simulation_result_arrays table
+
+Revision ID: add_result_arrays_001
+Revises: add_solver_stats_001
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_result_arrays_001'
+down_revision: Union[str, None] = 'add_solver_stats_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('simulation_result_arrays',
+        sa.Column('simulation_id', sa.Integer(), nullable=False),
+        sa.Column('n_pages', sa.Integer(), nullable=False),
+        sa.Column('page_ids', sa.LargeBinary(), nullable=False),
+        sa.Column('new_pagerank', sa.LargeBinary(), nullable=False),
+        sa.Column('pagerank_delta', sa.LargeBinary(), nullable=False),
+        sa.Column('new_click_depth', sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(['simulation_id'], ['simulations.id'], ),
+        sa.PrimaryKeyConstraint('simulation_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('simulation_result_arrays')
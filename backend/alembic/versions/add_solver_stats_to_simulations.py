@@ -0,0 +1,26 @@
+"""add solver_stats to simulations
+
+Revision ID: add_solver_stats_001
+Revises: add_links_version_001
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_solver_stats_001'
+down_revision: Union[str, None] = 'add_links_version_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('simulations', sa.Column('solver_stats', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('simulations', 'solver_stats')
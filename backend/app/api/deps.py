@@ -11,6 +11,7 @@ from app.repositories.sqlite import (
 from app.repositories.gsc_repository import SQLiteGSCRepository
 from app.services.import_service import ImportService
 from app.services.simulation_service import SimulationService
+from app.services.graph_service import GraphService
 
 def get_project_repo(db: Session = Depends(get_db)) -> SQLiteProjectRepository:
     return SQLiteProjectRepository(db)
@@ -44,4 +45,13 @@ def get_simulation_service(
     link_repo = SQLiteLinkRepository(db)
     simulation_repo = SQLiteSimulationRepository(db)
     
-    return SimulationService(project_repo, page_repo, link_repo, simulation_repo)
\ No newline at end of file
+    return SimulationService(project_repo, page_repo, link_repo, simulation_repo)
+
+def get_graph_service(
+    db: Session = Depends(get_db)
+) -> GraphService:
+    project_repo = SQLiteProjectRepository(db)
+    page_repo = SQLitePageRepository(db)
+    link_repo = SQLiteLinkRepository(db)
+    
+    return GraphService(project_repo, page_repo, link_repo)
\ No newline at end of file
@@ -42,23 +42,28 @@ async def export_simulation_csv(
         'Current PageRank',
         'New PageRank',
         'PageRank Delta',
-        'Percent Change'
+        'Percent Change',
+        'Current Click Depth',
+        'New Click Depth'
     ])
     
     # Write data rows
-    for result in simulation.results:
-        page = page_lookup.get(result.page_id)
+    arrays = await simulation_repo.get_result_arrays(simulation_id)
+    for result in (arrays.to_results() if arrays is not None else []):
+        page = page_lookup.get(result["page_id"])
         if page:
-            percent_change = (result.pagerank_delta / page.current_pagerank * 100) if page.current_pagerank > 0 else 0
+            percent_change = (result["pagerank_delta"] / page.current_pagerank * 100) if page.current_pagerank > 0 else 0
             
             writer.writerow([
                 page.url,
                 page.type or 'other',
                 page.category or '',
                 f"{page.current_pagerank:.8f}",
-                f"{result.new_pagerank:.8f}",
-                f"{result.pagerank_delta:.8f}",
-                f"{percent_change:.2f}%"
+                f"{result['new_pagerank']:.8f}",
+                f"{result['pagerank_delta']:.8f}",
+                f"{percent_change:.2f}%",
+                page.click_depth if page.click_depth is not None else '',
+                result["new_click_depth"] if result["new_click_depth"] is not None else ''
             ])
     
     # Set headers for file download
@@ -90,15 +95,9 @@ async def export_implementation_plan(
     if simulation.status != "completed":
         raise HTTPException(status_code=400, detail="Simulation not completed")
     
-    # Import the simulator to regenerate links
-    from app.core.rules.multi_rule import MultiRule
-    
-    # Get pages and existing links
+    # Get pages for the URLs of the links
     pages = await page_repo.get_by_project(simulation.project_id)
-    links = await link_repo.get_by_project(simulation.project_id)
-    
     page_lookup = {page.id: page for page in pages}
-    existing_links = [(link.from_page_id, link.to_page_id) for link in links]
     
     # Recreate the same multi-rule used in the simulation
     rules_config = simulation.rules_config
@@ -121,9 +120,18 @@ async def export_implementation_plan(
     elif not isinstance(rules_config, list):
         rules_config = []
     
-    # Generate the same links the simulation created
-    multi_rule = MultiRule(rules_config)
-    new_links = multi_rule.generate_links(pages, existing_links)
+    # Links stored by the simulation itself
+    stored_links = await simulation_repo.get_links(simulation_id)
+    if stored_links is not None:
+        new_links = [tuple(link) for link in stored_links.tolist()]
+    else:
+        # Simulations from before links were stored: regenerate them
+        from app.core.rules.multi_rule import MultiRule
+        
+        links = await link_repo.get_by_project(simulation.project_id)
+        existing_links = [(link.from_page_id, link.to_page_id) for link in links]
+        multi_rule = MultiRule(rules_config, seed=getattr(simulation, 'seed', None))
+        new_links = multi_rule.generate_links(pages, existing_links)
     
     # Create CSV output
     output = io.StringIO()
@@ -1,18 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
+import asyncio
 import tempfile
 import os
 import json
 
 from app.db.session import get_db
-from app.api.deps import get_project_repo, get_page_repo, get_import_service, get_link_repo, get_gsc_repo
+from app.api.deps import get_project_repo, get_page_repo, get_import_service, get_link_repo, get_gsc_repo, get_graph_service
 from app.api.v1.schemas.project import ProjectResponse, ImportRequest, ImportResponse
 from app.api.v1.schemas.page import PageResponse
+from app.api.v1.schemas.graph import EquitySourcesRequest
 from app.repositories.sqlite import SQLiteProjectRepository, SQLitePageRepository, SQLiteLinkRepository
 from app.services.import_service import ImportService
+from app.services.graph_service import GraphService
 from app.core.pagerank.networkx_impl import NetworkXPageRankCalculator
+from app.core.pagerank.graph import compile_graph
+from app.core.pagerank.depth import find_root_index, compute_click_depth
 from app.core.config import settings
+from app.core.progress import ProgressReporter, progress_broker, pagerank_channel, sse_events
 
 router = APIRouter()
 
@@ -173,66 +180,141 @@ async def calculate_pagerank(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Get all pages and links for this project
-    pages = await page_repo.get_by_project(project_id)
-    links = await link_repo.get_by_project(project_id)
-    
-    if not pages:
-        raise HTTPException(status_code=400, detail="No pages found for project")
-    
-    # Convert links to tuples
-    link_tuples = [(link.from_page_id, link.to_page_id) for link in links]
-    
-    # Convert pages to dict format
-    pages_data = [
-        {
-            'id': page.id,
-            'url': page.url,
-            'type': page.type,
-            'category': page.category
-        } 
-        for page in pages
-    ]
-    
-    # Calculate PageRank
-    calculator = NetworkXPageRankCalculator()
-    pagerank_scores = await calculator.calculate(
-        pages_data, 
-        link_tuples,
-        damping=settings.PAGERANK_DAMPING
+    # Progress for GET /{project_id}/pagerank/events
+    progress_broker.reset(pagerank_channel(project_id))
+    progress = ProgressReporter(progress_broker, pagerank_channel(project_id))
+    try:
+        progress.phase("loading")
+        
+        # Get all pages and links for this project
+        pages = await page_repo.get_by_project(project_id)
+        links = await link_repo.get_by_project(project_id)
+        
+        if not pages:
+            progress.finish("failed", error="No pages found for project")
+            raise HTTPException(status_code=400, detail="No pages found for project")
+        
+        # Convert links to tuples
+        link_tuples = [(link.from_page_id, link.to_page_id) for link in links]
+        
+        # Convert pages to dict format
+        pages_data = [
+            {
+                'id': page.id,
+                'url': page.url,
+                'type': page.type,
+                'category': page.category
+            } 
+            for page in pages
+        ]
+        
+        # Calculate PageRank
+        progress.phase("solve", total_pages=len(pages), total_links=len(link_tuples))
+        calculator = NetworkXPageRankCalculator()
+        # CPU-bound: solve on a worker thread so the event loop keeps streaming progress
+        pagerank_scores = await asyncio.to_thread(asyncio.run, calculator.calculate(
+            pages_data, 
+            link_tuples,
+            damping=settings.PAGERANK_DAMPING,
+            progress=progress
+        ))
+        
+        # Get graph stats
+        graph_stats = calculator.get_graph_stats(pages_data, link_tuples)
+        
+        # Prepare bulk updates for much better performance
+        print(f"🔄 Preparing bulk update for {len(pages)} pages...")
+        
+        updates = []
+        for page in pages:
+            new_pagerank = pagerank_scores.get(page.id, 0.0)
+            updates.append({
+                'page_id': page.id,
+                'pagerank': new_pagerank
+            })
+        
+        # Execute bulk update - much faster than individual updates
+        progress.phase("persist", pages=len(updates))
+        print(f"🚀 Starting bulk PageRank update...")
+        await page_repo.bulk_update_pagerank(updates)
+        
+        # Baseline click depth from the homepage
+        click_depths = compute_click_depth(compile_graph(pages, link_tuples), find_root_index(pages))
+        await page_repo.bulk_update_click_depth([
+            {'page_id': page.id, 'click_depth': int(click_depths[idx])}
+            for idx, page in enumerate(pages)
+        ])
+        
+        updated_count = len(updates)
+        
+        # PageRank mass figures in cached graph reports are now stale
+        GraphService.invalidate(project_id)
+        progress.finish("completed", pages_updated=updated_count)
+        
+        return {
+            "project_id": project_id,
+            "pages_updated": updated_count,
+            "total_links": len(link_tuples),
+            "graph_stats": graph_stats,
+            "max_click_depth": int(click_depths.max()) if len(click_depths) else 0,
+            "pagerank_range": {
+                "min": min(pagerank_scores.values()) if pagerank_scores else 0,
+                "max": max(pagerank_scores.values()) if pagerank_scores else 0,
+                "total": sum(pagerank_scores.values()) if pagerank_scores else 0
+            }
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        progress.finish("failed", error=str(e))
+        raise HTTPException(status_code=500, detail=f"PageRank calculation failed: {str(e)}")
+    finally:
+        # Subscribers wait for a terminal event, whatever stopped the run
+        if not progress.finished:
+            progress.finish("failed", error="PageRank calculation interrupted")
+
+@router.get("/{project_id}/pagerank/events")
+async def stream_pagerank_events(project_id: int):
+    """Server-sent events of the current or last PageRank calculation of a project"""
+    return StreamingResponse(
+        sse_events(progress_broker, pagerank_channel(project_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
+
+@router.get("/{project_id}/diagnostics")
+async def get_graph_diagnostics(
+    project_id: int,
+    max_trap_size: int = 50,
+    limit: int = 100,
+    graph_service: GraphService = Depends(get_graph_service)
+):
+    """Detect orphan pages, dead ends and sink traps that absorb PageRank"""
+    try:
+        return await graph_service.get_diagnostics(project_id, max_trap_size, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/{project_id}/equity-sources")
+async def get_equity_sources(
+    project_id: int,
+    request: EquitySourcesRequest,
+    graph_service: GraphService = Depends(get_graph_service)
+):
+    """Find the pages that feed the most PageRank to one or more target pages"""
+    if not request.page_ids and not request.urls:
+        raise HTTPException(status_code=400, detail="Provide at least one target page_id or url")
     
-    # Get graph stats
-    graph_stats = calculator.get_graph_stats(pages_data, link_tuples)
-    
-    # Prepare bulk updates for much better performance
-    print(f"🔄 Preparing bulk update for {len(pages)} pages...")
-    
-    updates = []
-    for page in pages:
-        new_pagerank = pagerank_scores.get(page.id, 0.0)
-        updates.append({
-            'page_id': page.id,
-            'pagerank': new_pagerank
-        })
-    
-    # Execute bulk update - much faster than individual updates
-    print(f"🚀 Starting bulk PageRank update...")
-    await page_repo.bulk_update_pagerank(updates)
-    
-    updated_count = len(updates)
-    
-    return {
-        "project_id": project_id,
-        "pages_updated": updated_count,
-        "total_links": len(link_tuples),
-        "graph_stats": graph_stats,
-        "pagerank_range": {
-            "min": min(pagerank_scores.values()) if pagerank_scores else 0,
-            "max": max(pagerank_scores.values()) if pagerank_scores else 0,
-            "total": sum(pagerank_scores.values()) if pagerank_scores else 0
-        }
-    }
+    try:
+        return await graph_service.get_equity_sources(
+            project_id,
+            page_ids=request.page_ids,
+            urls=request.urls,
+            top_k=request.top_k,
+            epsilon=request.epsilon
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
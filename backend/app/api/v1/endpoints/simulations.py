@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 
 from app.api.deps import get_simulation_service
 from app.api.v1.schemas.simulation import (
     SimulationCreate, SimulationResponse, SimulationDetails, 
-    RuleInfo, PreviewRequest, PreviewResponse
+    RuleInfo, PreviewRequest, PreviewResponse,
+    SimulationSweepRequest, SimulationSweepResponse,
+    SimulationBatchRequest, SimulationBatchResponse, SimulationJobStatus,
+    TopResultsResponse, SimulationResultsPage, SimulationComparison
 )
 from app.services.simulation_service import SimulationService
+from app.core.progress import progress_broker, simulation_channel, sse_events, TERMINAL_EVENTS
 
 router = APIRouter()
 
@@ -21,23 +26,64 @@ async def get_available_rules(
 async def create_simulation(
     project_id: int,
     simulation_data: SimulationCreate,
+    run_async: bool = Query(False, alias="async", description="Queue the simulation and return a job handle"),
     simulation_service: SimulationService = Depends(get_simulation_service)
 ):
-    """Create and run a new simulation with multiple rules"""
+    """Create and run a new simulation with multiple rules (with ?async=true, queue it and poll /simulations/{id}/status)"""
     try:
-        result = await simulation_service.create_simulation(
+        if run_async:
+            return await simulation_service.enqueue_simulation(
+                project_id,
+                simulation_data.name,
+                simulation_data.rules,
+                simulation_data.page_boosts,
+                simulation_data.protected_pages,
+                time_budget=simulation_data.time_budget_seconds,
+                seed=simulation_data.seed
+            )
+        
+        return await simulation_service.create_simulation(
             project_id,
             simulation_data.name,
             simulation_data.rules,
             simulation_data.page_boosts,
-            simulation_data.protected_pages
+            simulation_data.protected_pages,
+            time_budget=simulation_data.time_budget_seconds,
+            seed=simulation_data.seed
         )
-        return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
+@router.post("/projects/{project_id}/simulations/batch", response_model=SimulationBatchResponse)
+async def create_batch_simulation(
+    project_id: int,
+    batch_data: SimulationBatchRequest,
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Create and run several simulations sharing one graph load"""
+    try:
+        return await simulation_service.create_batch_simulation(project_id, batch_data.scenarios)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch simulation failed: {str(e)}")
+
+@router.post("/projects/{project_id}/simulations/sweep", response_model=SimulationSweepResponse)
+async def run_parameter_sweep(
+    project_id: int,
+    sweep_data: SimulationSweepRequest,
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Solve a grid of links_per_page / damping / budget values in one job"""
+    try:
+        return await simulation_service.run_parameter_sweep(project_id, sweep_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sweep failed: {str(e)}")
+
 @router.get("/projects/{project_id}/simulations", response_model=List[SimulationResponse])
 async def list_simulations(
     project_id: int,
@@ -46,6 +92,104 @@ async def list_simulations(
     """List all simulations for a project"""
     return await simulation_service.list_simulations(project_id)
 
+@router.get("/simulations/{simulation_id}/status", response_model=SimulationJobStatus)
+async def get_simulation_status(
+    simulation_id: int,
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Poll the status of a queued or running simulation"""
+    try:
+        return await simulation_service.get_simulation_status(simulation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/simulations/{simulation_id}/events")
+async def stream_simulation_events(
+    simulation_id: int,
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Server-sent events: phases, per-iteration residuals and ETA until the simulation ends"""
+    try:
+        status = await simulation_service.get_simulation_status(simulation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    final_event = None
+    if status["status"] in TERMINAL_EVENTS:
+        final_event = {"type": status["status"], "simulation_id": simulation_id}
+    
+    return StreamingResponse(
+        sse_events(progress_broker, simulation_channel(simulation_id), final_event=final_event),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/simulations/{simulation_id}/cancel", response_model=dict)
+async def cancel_simulation(
+    simulation_id: int,
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Cancel a queued simulation or stop a running one (it keeps its best-so-far results)"""
+    try:
+        return await simulation_service.cancel_simulation(simulation_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/simulations/{simulation_id}/results/top", response_model=TopResultsResponse)
+async def get_top_results(
+    simulation_id: int,
+    sort_by: str = Query("pagerank_delta", pattern="^(new_pagerank|pagerank_delta|percent_change)$"),
+    k: int = Query(50, ge=1, le=10000),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Top-k pages of a simulation (biggest winners with order=desc, losers with asc)"""
+    try:
+        return await simulation_service.get_top_results(simulation_id, sort_by, k, order == "desc")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/simulations/{simulation_id}/results", response_model=SimulationResultsPage)
+async def get_simulation_results_page(
+    simulation_id: int,
+    sort_by: str = Query("pagerank_delta", pattern="^(new_pagerank|pagerank_delta|percent_change)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    type: Optional[str] = Query(None, description="Page type filter"),
+    category: Optional[str] = Query(None, description="Page category filter"),
+    url_contains: Optional[str] = Query(None, description="URL substring filter"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Sorted, filtered and cursor-paginated results (first screen without loading every page)"""
+    try:
+        return await simulation_service.get_results_page(
+            simulation_id, sort_by, order == "desc", limit,
+            page_type=type, category=category, url_contains=url_contains, cursor=cursor
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/simulations/{simulation_id}/compare/{other_simulation_id}", response_model=SimulationComparison)
+async def compare_simulations(
+    simulation_id: int,
+    other_simulation_id: int,
+    top_n: int = Query(1000, ge=2, le=100000, description="Pages ranked by new PageRank used for the correlations"),
+    limit: int = Query(50, ge=1, le=1000, description="Pages listed per section"),
+    simulation_service: SimulationService = Depends(get_simulation_service)
+):
+    """Compare two simulations of the same project (differences are other minus this one)"""
+    try:
+        return await simulation_service.compare_simulations(simulation_id, other_simulation_id, top_n, limit)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/simulations/{simulation_id}", response_model=SimulationDetails)
 async def get_simulation(
     simulation_id: int,
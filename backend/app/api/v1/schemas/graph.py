@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class EquitySourcesRequest(BaseModel):
+    """Targets for a "who feeds me" query"""
+    page_ids: List[int] = []
+    urls: List[str] = []
+    top_k: int = Field(20, ge=1)  # Number of contributing pages returned per target
+    epsilon: float = 1e-6  # Reverse-push residual threshold (smaller = more accurate)
\ No newline at end of file
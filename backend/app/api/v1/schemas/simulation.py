@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict, List, Any, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Any, Literal, Optional
 from datetime import datetime
 
 class LinkingRule(BaseModel):
@@ -12,6 +12,9 @@ class LinkingRule(BaseModel):
     links_per_page: int = 3
     bidirectional: bool = False
     avoid_self_links: bool = True
+    pagerank_top_n: Optional[int] = Field(None, gt=0)  # pagerank methods: pick among the top N instead of the first k
+    action: Optional[Literal["add", "remove"]] = None  # remove: delete existing links from sources to targets (default: add)
+    target_urls: Optional[List[str]] = None  # Only targets whose URL equals or contains one of these (menu/footer items)
 
 class PageBoost(BaseModel):
     """Configuration for boosting specific pages"""
@@ -28,6 +31,69 @@ class SimulationCreate(BaseModel):
     rules: List[LinkingRule]  # Multiple rules that will be applied cumulatively
     page_boosts: List[PageBoost] = []  # Optional URL-specific boosts
     protected_pages: List[PageProtect] = []  # Optional page protection
+    time_budget_seconds: Optional[float] = Field(None, gt=0)  # Run time limit (default: server setting)
+    seed: Optional[int] = Field(None, ge=0)  # Link generation seed (default: derived from the request)
+
+class SimulationBatchRequest(BaseModel):
+    """Several alternative rule sets run against one load of the project graph"""
+    scenarios: List[SimulationCreate]
+
+class BatchScenarioResult(BaseModel):
+    simulation_id: int
+    name: str
+    status: str
+    summary: Optional[Dict[str, Any]] = None
+    new_links_count: int
+    error: Optional[str] = None
+    computation_time: float
+
+class SimulationBatchResponse(BaseModel):
+    project_id: int
+    total_pages: int
+    scenarios: List[BatchScenarioResult]
+    timings: Dict[str, float]
+
+class SimulationSweepRequest(BaseModel):
+    """Grid of parameters solved in a single sweep job"""
+    rules: List[LinkingRule]
+    page_boosts: List[PageBoost] = []
+    protected_pages: List[PageProtect] = []
+    links_per_page: List[int] = [1, 2, 3, 5]  # Overrides links_per_page of every rule
+    damping: List[float] = [0.85]
+    eta_boost: List[float] = [0.08]  # Boost budget
+    eta_protect: List[float] = [0.05]  # Protection budget
+    seed: int = 42  # Fixed seed so that larger links_per_page values extend smaller ones
+
+class SweepPoint(BaseModel):
+    links_per_page: int
+    damping: float
+    eta_boost: float
+    eta_protect: float
+    new_links_added: int
+    links_removed: int = 0
+    pages_with_positive_change: int
+    pages_with_negative_change: int
+    pages_unchanged: int
+    average_delta: float
+    max_positive_delta: float
+    max_negative_delta: float
+    total_pagerank_redistribution: float
+    average_click_depth_before: Optional[float] = None
+    average_click_depth_after: Optional[float] = None
+    pages_with_reduced_depth: Optional[int] = None
+    pages_newly_reachable: Optional[int] = None
+    unreachable_pages_after: Optional[int] = None
+    solve_time: float
+
+class SimulationSweepResponse(BaseModel):
+    project_id: int
+    seed: int
+    total_pages: int
+    rule_description: str
+    grid_points: int
+    link_generation_time: float
+    total_time: float
+    results: List[SweepPoint]
 
 class SimulationResponse(BaseModel):
     id: int
@@ -37,11 +103,26 @@ class SimulationResponse(BaseModel):
     rules: List[LinkingRule]  # Multiple rules instead of single rule_config
     page_boosts: List[PageBoost] = []  # URL-specific boosts
     protected_pages: List[PageProtect] = []  # Page protection
+    solver_stats: Optional[Dict[str, Any]] = None  # iterations, residual, stop reason
+    seed: Optional[int] = None  # Reproduces the generated links
+    cache_source_id: Optional[int] = None  # Set when the results were reused from an identical run
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+class SimulationJobStatus(BaseModel):
+    """Status of a queued simulation job"""
+    simulation_id: int
+    status: str  # pending, running, completed, failed, cancelled, partial
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    queued: bool = False
+    queue_position: Optional[int] = None  # 1-based position among waiting jobs
+    running: bool = False
+    running_jobs: int = 0
+    waiting_jobs: int = 0
+
 class SimulationResult(BaseModel):
     page_id: int
     url: str
@@ -51,6 +132,49 @@ class SimulationResult(BaseModel):
     new_pagerank: float
     pagerank_delta: float
     percent_change: float
+    current_click_depth: Optional[int] = None  # -1 = unreachable from the homepage
+    new_click_depth: Optional[int] = None
+    click_depth_delta: Optional[int] = None
+
+class TopResultsResponse(BaseModel):
+    simulation_id: int
+    sort_by: str
+    total: int  # Pages in the simulation
+    results: List[SimulationResult]
+
+class SimulationResultsPage(BaseModel):
+    """One page of sorted and filtered simulation results"""
+    simulation_id: int
+    sort_by: str
+    order: str
+    total: int  # Pages matching the filters
+    results: List[SimulationResult]
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page
+
+class ComparedPage(BaseModel):
+    page_id: int
+    url: Optional[str] = None
+    type: Optional[str] = None
+    category: Optional[str] = None
+    new_pagerank_a: float
+    new_pagerank_b: float
+    pagerank_delta_a: float
+    pagerank_delta_b: float
+    difference: float  # B minus A
+
+class SimulationComparison(BaseModel):
+    """Two simulations of the same project compared page by page"""
+    simulation_a: int
+    simulation_b: int
+    project_id: int
+    common_pages: int
+    differences: Dict[str, float]
+    rank_correlation: Dict[str, Any]  # Spearman / Kendall on the top-N pages by new PageRank
+    pages_gaining_in_a_losing_in_b: int
+    pages_gaining_in_b_losing_in_a: int
+    largest_differences: List[ComparedPage]
+    divergent_pages: List[ComparedPage]  # Gaining in one simulation, losing in the other
+    by_category: Dict[str, Dict[str, float]] = {}
 
 class SimulationDetails(BaseModel):
     simulation: SimulationResponse
@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SimulationCancelled(Exception):
+    """Raised when a simulation is stopped before it has any result to keep"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Simulation stopped: {reason}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cooperative stop signal checked by long-running loops.
+
+    A token stops either when cancel() is called (from any thread) or
+    when its time budget runs out. The budget clock starts at start(),
+    so time spent waiting in the job queue does not count.
+    """
+
+    def __init__(self, time_budget: Optional[float] = None):
+        self.time_budget = time_budget
+        self._event = threading.Event()
+        self._deadline: Optional[float] = None
+
+    def start(self) -> None:
+        if self.time_budget:
+            self._deadline = time.monotonic() + self.time_budget
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """"cancelled", "timeout" or None while the work may continue"""
+        if self._event.is_set():
+            return "cancelled"
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            return "timeout"
+        return None
+
+    def should_stop(self) -> bool:
+        return self.reason is not None
+
+    def raise_if_stopped(self) -> None:
+        reason = self.reason
+        if reason is not None:
+            raise SimulationCancelled(reason)
+
+
+class CancellationRegistry:
+    """Tokens of queued and running simulations, keyed by simulation id"""
+
+    def __init__(self):
+        self._tokens: Dict[int, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def register(self, simulation_id: int, time_budget: Optional[float] = None) -> CancellationToken:
+        """Token for a simulation, reusing one registered at queue time"""
+        with self._lock:
+            token = self._tokens.get(simulation_id)
+            if token is None:
+                token = CancellationToken(time_budget)
+                self._tokens[simulation_id] = token
+            return token
+
+    def get(self, simulation_id: int) -> Optional[CancellationToken]:
+        with self._lock:
+            return self._tokens.get(simulation_id)
+
+    def release(self, simulation_id: int) -> None:
+        with self._lock:
+            self._tokens.pop(simulation_id, None)
+
+
+# Process-wide registry shared by the job queue and the API
+cancellation_registry = CancellationRegistry()
@@ -0,0 +1,139 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from scipy import stats
+
+from app.core.result_arrays import ResultArrays
+
+
+def align_results(a: ResultArrays, b: ResultArrays):
+    """Row indices of the pages present in both simulations, ordered by page id"""
+    page_ids, rows_a, rows_b = np.intersect1d(a.page_ids, b.page_ids, assume_unique=True, return_indices=True)
+    return page_ids, rows_a, rows_b
+
+
+def rank_correlation(values_a: np.ndarray, values_b: np.ndarray, top_n: int) -> Dict:
+    """
+    Spearman and Kendall correlation of two rankings on their top-N pages.
+
+    The compared set is the union of both top-N lists, so a page that
+    enters the top of only one simulation still counts.
+    """
+    n = len(values_a)
+    top_n = max(1, min(top_n, n)) if n else 0
+    if top_n == 0:
+        return {"top_n": 0, "pages_compared": 0, "spearman": None, "kendall": None, "top_n_overlap": None}
+
+    top_a = np.argpartition(-values_a, top_n - 1)[:top_n]
+    top_b = np.argpartition(-values_b, top_n - 1)[:top_n]
+    rows = np.union1d(top_a, top_b)
+
+    # Correlations are undefined when either ranking is constant
+    spearman = kendall = None
+    if len(rows) > 1 and np.ptp(values_a[rows]) > 0 and np.ptp(values_b[rows]) > 0:
+        spearman = stats.spearmanr(values_a[rows], values_b[rows]).statistic
+        kendall = stats.kendalltau(values_a[rows], values_b[rows]).statistic
+
+    return {
+        "top_n": top_n,
+        "pages_compared": int(len(rows)),
+        "spearman": _finite_or_none(spearman),
+        "kendall": _finite_or_none(kendall),
+        "top_n_overlap": len(np.intersect1d(top_a, top_b)) / top_n
+    }
+
+
+def compare_results(a: ResultArrays,
+                    b: ResultArrays,
+                    categories: Optional[Sequence[Optional[str]]] = None,
+                    top_n: int = 1000,
+                    limit: int = 50) -> Dict:
+    """
+    Per-page comparison of two simulations of the same project.
+
+    categories are aligned on a.page_ids. Differences are B minus A;
+    divergent pages gain in one simulation and lose in the other.
+    """
+    page_ids, rows_a, rows_b = align_results(a, b)
+    new_a = a.new_pagerank[rows_a].astype(np.float64)
+    new_b = b.new_pagerank[rows_b].astype(np.float64)
+    delta_a = a.pagerank_delta[rows_a].astype(np.float64)
+    delta_b = b.pagerank_delta[rows_b].astype(np.float64)
+    difference = new_b - new_a
+    n = len(page_ids)
+
+    gain_a_lose_b = (delta_a > 0) & (delta_b < 0)
+    gain_b_lose_a = (delta_b > 0) & (delta_a < 0)
+    divergent = np.flatnonzero(gain_a_lose_b | gain_b_lose_a)
+    divergent = divergent[np.argsort(-np.abs(difference[divergent]), kind='stable')[:limit]]
+
+    magnitude = np.abs(difference)
+    k = min(limit, n)
+    largest = np.argpartition(-magnitude, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+    largest = largest[np.argsort(-magnitude[largest], kind='stable')]
+
+    comparison = {
+        "common_pages": n,
+        "differences": {
+            "pages_higher_in_b": int(np.sum(difference > 0)),
+            "pages_higher_in_a": int(np.sum(difference < 0)),
+            "pages_equal": int(np.sum(difference == 0)),
+            "mean_abs_difference": float(magnitude.mean()) if n else 0.0,
+            "max_difference": float(difference.max()) if n else 0.0,
+            "min_difference": float(difference.min()) if n else 0.0,
+            "total_abs_difference": float(magnitude.sum())
+        },
+        "rank_correlation": rank_correlation(new_a, new_b, top_n),
+        "pages_gaining_in_a_losing_in_b": int(gain_a_lose_b.sum()),
+        "pages_gaining_in_b_losing_in_a": int(gain_b_lose_a.sum()),
+        "largest_differences": _page_rows(page_ids, largest, new_a, new_b, delta_a, delta_b),
+        "divergent_pages": _page_rows(page_ids, divergent, new_a, new_b, delta_a, delta_b)
+    }
+
+    if categories is not None:
+        comparison["by_category"] = _category_aggregates(
+            np.asarray(categories, dtype=object)[rows_a], delta_a, delta_b
+        )
+
+    return comparison
+
+
+def _category_aggregates(categories: np.ndarray, delta_a: np.ndarray, delta_b: np.ndarray) -> Dict[str, Dict]:
+    if len(categories) == 0:
+        return {}
+    names, inverse = np.unique(
+        np.array([category or "" for category in categories], dtype=object).astype(str),
+        return_inverse=True
+    )
+    pages = np.bincount(inverse, minlength=len(names))
+    total_a = np.bincount(inverse, weights=delta_a, minlength=len(names))
+    total_b = np.bincount(inverse, weights=delta_b, minlength=len(names))
+    return {
+        str(name): {
+            "pages": int(pages[i]),
+            "total_delta_a": float(total_a[i]),
+            "total_delta_b": float(total_b[i]),
+            "difference": float(total_b[i] - total_a[i])
+        }
+        for i, name in enumerate(names.tolist())
+    }
+
+
+def _page_rows(page_ids, rows, new_a, new_b, delta_a, delta_b) -> List[Dict]:
+    return [
+        {
+            "page_id": int(page_ids[row]),
+            "new_pagerank_a": float(new_a[row]),
+            "new_pagerank_b": float(new_b[row]),
+            "pagerank_delta_a": float(delta_a[row]),
+            "pagerank_delta_b": float(delta_b[row]),
+            "difference": float(new_b[row] - new_a[row])
+        }
+        for row in rows.tolist()
+    ]
+
+
+def _finite_or_none(value) -> Optional[float]:
+    """JSON-safe correlation (None instead of NaN)"""
+    if value is None or not np.isfinite(value):
+        return None
+    return float(value)
@@ -7,6 +7,16 @@ class Settings(BaseSettings):
     PAGERANK_MAX_ITER: int = 200  # Increased iterations for large graphs
     PAGERANK_TOLERANCE: float = 1e-6
     USE_SEMANTIC_WEIGHTS: bool = False  # Disabled by default
+    MAX_SWEEP_GRID_POINTS: int = 100  # Upper bound on parameter sweep size
+    MAX_BATCH_SCENARIOS: int = 20  # Upper bound on scenarios per batch simulation
+    SIMULATION_BATCH_WORKERS: int = 4  # Link generation processes for batch simulations
+    LINK_GENERATION_WORKERS: int = 4  # Processes sharing a simulation's source pages (1 = sequential)
+    LINK_GENERATION_PARALLEL_MIN_SOURCES: int = 20000  # Below this many source pages, links are generated in-process
+    SIMULATION_MAX_CONCURRENT_JOBS: int = 2  # Simulations running at once, the rest wait in the queue
+    SIMULATION_TIME_BUDGET_SECONDS: float = 1800.0  # Default run time limit per simulation (0 = unlimited)
+    SIMULATION_CACHE_ENABLED: bool = True  # Identical simulations reuse the stored results
+    SEMANTIC_INDEX_IVF_MIN_PAGES: int = 20000  # Below this, semantic neighbours are searched exactly
+    SEMANTIC_INDEX_PROBES: int = 8  # Inverted lists scanned first per semantic query
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,93 @@
+import numpy as np
+from typing import Iterable, List, Tuple
+
+KEY_DTYPE = np.int64
+_TO_MASK = np.int64(0xFFFFFFFF)
+
+
+def encode_edges(from_ids, to_ids) -> np.ndarray:
+    """Edge keys from << 32 | to (page ids are non-negative 32-bit integers)"""
+    from_ids = np.asarray(from_ids, dtype=KEY_DTYPE)
+    to_ids = np.asarray(to_ids, dtype=KEY_DTYPE)
+    return (from_ids << 32) | (to_ids & _TO_MASK)
+
+
+def decode_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    keys = np.asarray(keys, dtype=KEY_DTYPE)
+    return keys >> 32, keys & _TO_MASK
+
+
+def links_to_columns(links) -> Tuple[np.ndarray, np.ndarray]:
+    """(from_ids, to_ids) columns of a list of (from, to) pairs or an (m, 2) array"""
+    pairs = np.asarray(links if len(links) else np.empty((0, 2)), dtype=KEY_DTYPE).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def columns_to_links(from_ids: np.ndarray, to_ids: np.ndarray) -> List[Tuple[int, int]]:
+    """(from, to) tuples of edge columns, in order"""
+    return list(zip(np.asarray(from_ids).tolist(), np.asarray(to_ids).tolist()))
+
+
+def first_occurrences(keys: np.ndarray) -> np.ndarray:
+    """Mask keeping the first occurrence of each key, in the original order"""
+    keep = np.zeros(len(keys), dtype=bool)
+    if len(keys):
+        keep[np.unique(keys, return_index=True)[1]] = True
+    return keep
+
+
+class EdgeSet:
+    """
+    Set of directed edges as a sorted array of int64 keys.
+
+    Compact (8 bytes per edge instead of a tuple in a hash set) and
+    queried with np.searchsorted, so membership of many edges at once is
+    one vectorized call.
+    """
+
+    def __init__(self, keys: np.ndarray = None, is_sorted_unique: bool = False):
+        keys = np.empty(0, dtype=KEY_DTYPE) if keys is None else np.asarray(keys, dtype=KEY_DTYPE)
+        self.keys = keys if is_sorted_unique else np.unique(keys)
+
+    @classmethod
+    def from_links(cls, links) -> "EdgeSet":
+        return cls(encode_edges(*links_to_columns(links)))
+
+    @classmethod
+    def from_arrays(cls, from_ids, to_ids) -> "EdgeSet":
+        return cls(encode_edges(from_ids, to_ids))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, link: Tuple[int, int]) -> bool:
+        key = (int(link[0]) << 32) | (int(link[1]) & 0xFFFFFFFF)
+        position = np.searchsorted(self.keys, key)
+        return bool(position < len(self.keys) and self.keys[position] == key)
+
+    def contains_keys(self, keys: np.ndarray) -> np.ndarray:
+        """Membership mask of edge keys"""
+        keys = np.asarray(keys, dtype=KEY_DTYPE)
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return self.keys[positions] == keys
+
+    def contains(self, from_ids, to_ids) -> np.ndarray:
+        """Membership mask of the edges (from_ids[i], to_ids[i])"""
+        return self.contains_keys(encode_edges(from_ids, to_ids))
+
+    def union(self, other: "EdgeSet") -> "EdgeSet":
+        return EdgeSet(np.union1d(self.keys, other.keys), is_sorted_unique=True)
+
+    def difference(self, other: "EdgeSet") -> "EdgeSet":
+        return EdgeSet(self.keys[~other.contains_keys(self.keys)], is_sorted_unique=True)
+
+    def to_array(self) -> np.ndarray:
+        """(m, 2) array of (from, to) pairs, sorted"""
+        from_ids, to_ids = decode_keys(self.keys)
+        return np.column_stack((from_ids, to_ids))
+
+    def to_links(self) -> List[Tuple[int, int]]:
+        from_ids, to_ids = decode_keys(self.keys)
+        return list(zip(from_ids.tolist(), to_ids.tolist()))
@@ -0,0 +1,225 @@
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.edge_set import EdgeSet, decode_keys
+from app.core.url_matcher import UrlMatcher, get_url_matcher
+
+
+def _group_by_code(codes: np.ndarray, n_codes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions grouped by code (stable) and the bounds of each group"""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(n_codes + 1))
+    return order, bounds
+
+
+def _attribute(page: Any, name: str, default=None):
+    """Attribute of an ORM page or key of a page dict (batch workers use dicts)"""
+    if isinstance(page, dict):
+        value = page.get(name, default)
+    else:
+        value = getattr(page, name, default)
+    return default if value is None else value
+
+
+class PageIndex:
+    """
+    Columnar view of a project's pages, built once per simulation.
+
+    Rows follow the order of the pages given. Types and categories are
+    interned to int32 codes with one posting list (sorted row indices)
+    per code, so rules and selectors filter with masks and array slicing
+    instead of comparing strings on ORM objects.
+    """
+
+    def __init__(self, pages: Sequence[Any]):
+        self.pages = pages
+        self.n_pages = len(pages)
+        self.ids = np.fromiter((_attribute(page, 'id') for page in pages), dtype=np.int32, count=self.n_pages)
+        self.pagerank = np.fromiter(
+            (_attribute(page, 'current_pagerank', 0.0) for page in pages), dtype=np.float64, count=self.n_pages
+        )
+        self.type_names, self.type_codes = self._intern(_attribute(page, 'type', '') for page in pages)
+        self.category_names, self.category_codes = self._intern(_attribute(page, 'category', '') for page in pages)
+        self.type_postings = self._postings(self.type_codes, len(self.type_names))
+        self.category_postings = self._postings(self.category_codes, len(self.category_names))
+        self._id_order: Optional[np.ndarray] = None
+        self._url_matcher: Optional[UrlMatcher] = None
+        # CSR adjacency of the last edge set asked for (see adjacency)
+        self._adjacency: Optional[Tuple[EdgeSet, Tuple[np.ndarray, np.ndarray]]] = None
+        # Optional page embeddings (see attach_semantic)
+        self.semantic = None
+        self.semantic_rows: Optional[np.ndarray] = None
+        self.rows_of_semantic: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _intern(values: Iterable[str]):
+        codes_by_name: Dict[str, int] = {}
+        codes = [codes_by_name.setdefault(value, len(codes_by_name)) for value in values]
+        return list(codes_by_name), np.asarray(codes, dtype=np.int32)
+
+    @staticmethod
+    def _postings(codes: np.ndarray, n_codes: int) -> List[np.ndarray]:
+        """Sorted row indices of every code (one stable argsort, then split)"""
+        order, bounds = _group_by_code(codes, n_codes)
+        return [order[bounds[code]:bounds[code + 1]] for code in range(n_codes)]
+
+    def _codes_matching(self, names: List[str], filter_values: List[str]) -> List[int]:
+        """Codes whose name is in the filter (case-insensitive)"""
+        wanted = {value.lower() for value in filter_values}
+        return [code for code, name in enumerate(names) if name.lower() in wanted]
+
+    def filter_rows(self,
+                    types_filter: List[str] = None,
+                    categories_filter: List[str] = None) -> np.ndarray:
+        """Rows matching the type and category filters (empty filter = all), in page order"""
+        mask = np.ones(self.n_pages, dtype=bool)
+        if types_filter:
+            mask &= self._posting_mask(self.type_postings, self._codes_matching(self.type_names, types_filter))
+        if categories_filter:
+            mask &= self._posting_mask(self.category_postings, self._codes_matching(self.category_names, categories_filter))
+        return np.flatnonzero(mask)
+
+    def _posting_mask(self, postings: List[np.ndarray], codes: List[int]) -> np.ndarray:
+        mask = np.zeros(self.n_pages, dtype=bool)
+        for code in codes:
+            mask[postings[code]] = True
+        return mask
+
+    def page_ids(self, rows) -> List[int]:
+        return self.ids[rows].tolist()
+
+    def rows_of_ids(self, page_ids: np.ndarray) -> np.ndarray:
+        """Rows of many page ids at once (-1 for ids not in the index)"""
+        page_ids = np.asarray(page_ids, dtype=np.int64)
+        if self._id_order is None:
+            self._id_order = np.argsort(self.ids, kind='stable')
+        if self.n_pages == 0:
+            return np.full(len(page_ids), -1, dtype=np.int64)
+        sorted_ids = self.ids[self._id_order]
+        positions = np.minimum(np.searchsorted(sorted_ids, page_ids), self.n_pages - 1)
+        return np.where(sorted_ids[positions] == page_ids, self._id_order[positions], -1)
+
+    def rows_matching_urls(self, patterns: List[str]) -> np.ndarray:
+        """Rows whose URL equals or contains one of the patterns, in page order"""
+        if self._url_matcher is None:
+            # Page dicts (batch workers) have no pages version, so keep the matcher per index
+            self._url_matcher = get_url_matcher(self.pages)
+        return self._url_matcher.rows_containing(patterns)
+
+    def adjacency(self, edges: EdgeSet) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Target rows of each source row in CSR form: the targets of row r
+        are targets[bounds[r]:bounds[r + 1]], sorted. Edges to or from
+        pages outside the index are ignored. The arrays of the last edge
+        set are kept, so rules sharing one EdgeSet build them once.
+        """
+        if self._adjacency is not None and self._adjacency[0] is edges:
+            return self._adjacency[1]
+        self._adjacency = (edges, self._build_adjacency(edges))
+        return self._adjacency[1]
+
+    def _build_adjacency(self, edges: EdgeSet) -> Tuple[np.ndarray, np.ndarray]:
+        from_ids, to_ids = decode_keys(edges.keys)
+        from_rows = self.rows_of_ids(from_ids)
+        to_rows = self.rows_of_ids(to_ids)
+        known = (from_rows >= 0) & (to_rows >= 0)
+        from_rows, to_rows = from_rows[known], to_rows[known]
+        if not np.all(self.ids[1:] > self.ids[:-1]):
+            order = np.lexsort((to_rows, from_rows))
+            from_rows, to_rows = from_rows[order], to_rows[order]
+        # else rows follow the ids, so the sorted keys are already in (from, to) row order
+        bounds = np.searchsorted(from_rows, np.arange(self.n_pages + 1))
+        return bounds, to_rows
+
+    def attach_semantic(self, semantic) -> None:
+        """
+        Use a SemanticIndex for the semantic selector. semantic_rows maps
+        each page row to its embedding row (-1 without embedding) and
+        rows_of_semantic maps embedding rows back to page rows (-1 for
+        pages not in this index).
+        """
+        self.rows_of_semantic = self.rows_of_ids(semantic.page_ids)
+        self.semantic_rows = np.full(self.n_pages, -1, dtype=np.int64)
+        known = self.rows_of_semantic >= 0
+        self.semantic_rows[self.rows_of_semantic[known]] = np.flatnonzero(known)
+        self.semantic = semantic
+
+    def candidates(self, rows: np.ndarray) -> "CandidatePool":
+        return CandidatePool(self, rows)
+
+
+class _Concatenation(Sequence):
+    """Read-only view of two arrays one after the other (no copy)"""
+
+    def __init__(self, head: np.ndarray, tail: np.ndarray):
+        self.head = head
+        self.tail = tail
+
+    def __len__(self) -> int:
+        return len(self.head) + len(self.tail)
+
+    def __getitem__(self, position: int):
+        if position < len(self.head):
+            return self.head[position]
+        return self.tail[position - len(self.head)]
+
+
+class CandidatePool:
+    """
+    Target rows of one rule application, shared by all its source pages.
+
+    Lookups that depend only on the candidates (category buckets,
+    PageRank order, embedding rows) are built once, on first use, so that a selection is
+    a draw from a view of the right bucket instead of a scan or a sort of
+    every candidate.
+    """
+
+    def __init__(self, index: PageIndex, rows: np.ndarray):
+        self.index = index
+        self.rows = rows
+        self._category_rows: Optional[np.ndarray] = None
+        self._category_bounds: Optional[np.ndarray] = None
+        self._pagerank_orders: Dict[bool, np.ndarray] = {}
+        self._semantic_candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _category_buckets(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._category_rows is None:
+            order, self._category_bounds = _group_by_code(
+                self.index.category_codes[self.rows], len(self.index.category_names)
+            )
+            self._category_rows = self.rows[order]
+        return self._category_rows, self._category_bounds
+
+    def same_category(self, row: int) -> np.ndarray:
+        """Candidates in the category of a row, in page order (a view)"""
+        rows, bounds = self._category_buckets()
+        code = self.index.category_codes[row]
+        return rows[bounds[code]:bounds[code + 1]]
+
+    def other_categories(self, row: int) -> Sequence[int]:
+        """Candidates outside the category of a row, grouped by category (a view)"""
+        rows, bounds = self._category_buckets()
+        code = self.index.category_codes[row]
+        return _Concatenation(rows[:bounds[code]], rows[bounds[code + 1]:])
+
+    def pagerank_order(self, descending: bool = True) -> np.ndarray:
+        """Candidates by current PageRank (stable, so ties keep the page order)"""
+        order = self._pagerank_orders.get(descending)
+        if order is None:
+            pagerank = self.index.pagerank[self.rows]
+            order = self.rows[np.argsort(-pagerank if descending else pagerank, kind='stable')]
+            self._pagerank_orders[descending] = order
+        return order
+
+    def semantic_candidates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Candidates as a mask over the embedding rows and as embedding rows"""
+        if self._semantic_candidates is None:
+            semantic_rows = self.index.semantic_rows[self.rows]
+            semantic_rows = semantic_rows[semantic_rows >= 0]
+            mask = np.zeros(self.index.semantic.n_pages, dtype=bool)
+            mask[semantic_rows] = True
+            self._semantic_candidates = (mask, np.flatnonzero(mask))
+        return self._semantic_candidates
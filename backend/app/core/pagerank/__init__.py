@@ -1,4 +1,13 @@
 from app.core.pagerank.calculator import PageRankCalculator
 from app.core.pagerank.networkx_impl import NetworkXPageRankCalculator
+from app.core.pagerank.graph import CompiledGraph, compile_graph
+from app.core.pagerank.diagnostics import GraphDiagnostics, diagnose_graph
 
-__all__ = ["PageRankCalculator", "NetworkXPageRankCalculator"]
\ No newline at end of file
+__all__ = [
+    "PageRankCalculator",
+    "NetworkXPageRankCalculator",
+    "CompiledGraph",
+    "compile_graph",
+    "GraphDiagnostics",
+    "diagnose_graph"
+]
\ No newline at end of file
@@ -7,6 +7,10 @@ from scipy import sparse
 from scipy.sparse.linalg import norm
 
 from app.core.pagerank.calculator import PageRankCalculator
+from app.core.pagerank.graph import links_to_index_pairs, link_weight_array
+from app.core.cancellation import CancellationToken
+from app.core.progress import ProgressReporter
+from app.core.url_matcher import get_url_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +46,10 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         self.max_iter = max_iter
         self.performance_threshold = performance_threshold_minutes * 60  # seconds
         
+        # Details of the last calculate() call (iterations, residual, converged, stopped)
+        self.last_run_stats: Dict[str, Any] = {}
+        self.baseline_stats: Dict[str, Any] = {}
+        
     async def calculate(self, 
                        pages: List[Any], 
                        links: List[Tuple[int, int]],
@@ -55,6 +63,9 @@ class AdvancedPageRankCalculator(PageRankCalculator):
                        eta_protect: float = 0.05,    # Protection budget
                        eta_boost: float = 0.03,      # Boost budget
                        alpha_cap: Dict[str, float] = None,  # {url: outflow_cap}
+                       nstart: Dict[int, float] = None,     # Warm start {page_id: score}
+                       cancel_token: CancellationToken = None,
+                       progress: ProgressReporter = None,
                        **kwargs) -> Dict[int, float]:
         """
         Calculate PageRank with advanced Protect & Boost features.
@@ -67,6 +78,10 @@ class AdvancedPageRankCalculator(PageRankCalculator):
             eta_protect: Budget allocation for protection (0-1)
             eta_boost: Budget allocation for boost (0-1)
             alpha_cap: {url: cap_factor} - outflow caps (0-1)
+            nstart: Optional starting vector for the baseline solve
+            cancel_token: Stops the solver loops with the best-so-far vector;
+                see last_run_stats for iterations, residual and stop reason
+            progress: Receives per-iteration L1 residuals of both solves
         """
         # Use provided params or defaults
         damping = damping or self.damping
@@ -98,15 +113,20 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         page_data = self._prepare_page_data(pages, protected_pages, boosted_pages, alpha_cap)
         
         # Get baseline PageRank for reference
-        baseline_pr = await self._calculate_baseline_pagerank(page_data, links, damping, link_weights)
+        baseline_pr = await self._calculate_baseline_pagerank(page_data, links, damping, link_weights, nstart, cancel_token, progress)
         
         # Run advanced algorithm
         if use_fast_mode:
             result = await self._calculate_fast(page_data, links, baseline_pr, damping, 
-                                              eta_protect, eta_boost, tolerance, max_iter)
+                                              eta_protect, eta_boost, tolerance, max_iter, cancel_token, progress)
         else:
             result = await self._calculate_exact(page_data, links, baseline_pr, damping,
-                                               eta_protect, eta_boost, tolerance, max_iter)
+                                               eta_protect, eta_boost, tolerance, max_iter, cancel_token, progress)
+        
+        # A stop during the baseline solve makes the whole result partial
+        if self.baseline_stats.get("stopped") and not self.last_run_stats.get("stopped"):
+            self.last_run_stats["stopped"] = self.baseline_stats["stopped"]
+        self.last_run_stats["baseline"] = self.baseline_stats
         
         total_time = time.time() - start_time
         logger.info(f"🏁 Advanced PageRank completed: {total_time:.2f}s")
@@ -127,8 +147,6 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         """Convert input data to working format"""
         page_data = {
             'pages': pages,
-            'id_to_url': {},
-            'url_to_id': {},
             'protected_ids': set(),
             'boosted_ids': set(), 
             'floor_values': {},
@@ -136,36 +154,25 @@ class AdvancedPageRankCalculator(PageRankCalculator):
             'outflow_caps': {}
         }
         
-        # Build mappings
-        for page in pages:
-            page_id = page.id if hasattr(page, 'id') else page['id']
-            page_url = page.url if hasattr(page, 'url') else page['url']
-            
-            page_data['id_to_url'][page_id] = page_url
-            page_data['url_to_id'][page_url] = page_id
+        # Exact URL -> page id lookups, shared with the rules of the project
+        url_matcher = get_url_matcher(pages)
         
         # Process protected pages
         if protected_pages:
-            for url, floor_factor in protected_pages.items():
-                if url in page_data['url_to_id']:
-                    page_id = page_data['url_to_id'][url]
-                    page_data['protected_ids'].add(page_id)
-                    page_data['floor_values'][page_id] = floor_factor
+            for url, page_id in url_matcher.resolve(protected_pages).items():
+                page_data['protected_ids'].add(page_id)
+                page_data['floor_values'][page_id] = protected_pages[url]
         
         # Process boosted pages  
         if boosted_pages:
-            for url, target_factor in boosted_pages.items():
-                if url in page_data['url_to_id']:
-                    page_id = page_data['url_to_id'][url]
-                    page_data['boosted_ids'].add(page_id)
-                    page_data['target_values'][page_id] = target_factor
+            for url, page_id in url_matcher.resolve(boosted_pages).items():
+                page_data['boosted_ids'].add(page_id)
+                page_data['target_values'][page_id] = boosted_pages[url]
         
         # Process outflow caps
         if alpha_cap:
-            for url, cap_factor in alpha_cap.items():
-                if url in page_data['url_to_id']:
-                    page_id = page_data['url_to_id'][url]
-                    page_data['outflow_caps'][page_id] = cap_factor
+            for url, page_id in url_matcher.resolve(alpha_cap).items():
+                page_data['outflow_caps'][page_id] = alpha_cap[url]
         
         logger.info(f"📊 Page data: {len(page_data['protected_ids'])} protected, "
                    f"{len(page_data['boosted_ids'])} boosted, "
@@ -173,7 +180,7 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         
         return page_data
     
-    async def _calculate_baseline_pagerank(self, page_data, links, damping, link_weights):
+    async def _calculate_baseline_pagerank(self, page_data, links, damping, link_weights, nstart=None, cancel_token=None, progress=None):
         """Calculate baseline PageRank for reference"""
         # Use standard NetworkX calculation as baseline
         from app.core.pagerank.networkx_impl import NetworkXPageRankCalculator
@@ -181,21 +188,23 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         baseline_calc = NetworkXPageRankCalculator()
         baseline_pr = await baseline_calc.calculate(
             page_data['pages'], links, damping=damping, 
-            tolerance=self.tolerance, link_weights=link_weights
+            tolerance=self.tolerance, link_weights=link_weights,
+            nstart=nstart, cancel_token=cancel_token, progress=progress
         )
+        self.baseline_stats = baseline_calc.last_run_stats
         
         logger.info("✅ Baseline PageRank calculated")
         return baseline_pr
     
     async def _calculate_exact(self, page_data, links, baseline_pr, damping, 
-                              eta_protect, eta_boost, tolerance, max_iter):
+                              eta_protect, eta_boost, tolerance, max_iter, cancel_token=None, progress=None):
         """Exact algorithm with full mathematical rigor"""
         logger.info("🎯 Running exact Protect & Boost algorithm")
         
         # TODO: Implement exact algorithm
         # For now, delegate to fast mode
         return await self._calculate_fast(page_data, links, baseline_pr, damping,
-                                        eta_protect, eta_boost, tolerance, max_iter)
+                                        eta_protect, eta_boost, tolerance, max_iter, cancel_token, progress)
     
     def _water_filling_projection(self, p: np.ndarray, floors: np.ndarray, 
                                   ceilings: np.ndarray = None) -> np.ndarray:
@@ -276,17 +285,9 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         page_ids = [page.id if hasattr(page, 'id') else page['id'] for page in page_data['pages']]
         id_to_idx = {page_id: idx for idx, page_id in enumerate(page_ids)}
         
-        # Build adjacency matrix
-        rows, cols, weights = [], [], []
-        for from_id, to_id in links:
-            if from_id in id_to_idx and to_id in id_to_idx:
-                from_idx = id_to_idx[from_id]
-                to_idx = id_to_idx[to_id]
-                weight = link_weights.get((from_id, to_id), 1.0) if link_weights else 1.0
-                
-                rows.append(from_idx)
-                cols.append(to_idx)
-                weights.append(weight)
+        # Build adjacency matrix (links as tuples or an (m, 2) edge array)
+        rows, cols, valid = links_to_index_pairs(page_ids, links, return_valid=True)
+        weights = link_weight_array(links, link_weights)[valid]
         
         # Create sparse adjacency matrix
         A = sparse.csr_matrix((weights, (rows, cols)), shape=(n_pages, n_pages))
@@ -380,7 +381,7 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         return v_final, protect_budget_used, boost_budget_used
 
     async def _calculate_fast(self, page_data, links, baseline_pr, damping,
-                             eta_protect, eta_boost, tolerance, max_iter):
+                             eta_protect, eta_boost, tolerance, max_iter, cancel_token=None, progress=None):
         """Fast approximation algorithm with conditional teleportation"""
         logger.info("⚡ Running fast Protect & Boost algorithm with conditional teleportation")
         
@@ -416,6 +417,12 @@ class AdvancedPageRankCalculator(PageRankCalculator):
         # Main iteration loop
         total_protect_used = 0.0
         total_boost_used = 0.0
+        diff = None
+        converged = False
+        stopped = None
+        iteration = -1
+        if progress is not None:
+            progress.start_solve("protect_boost", tolerance)
         
         for iteration in range(max_iter):
             p_old = p.copy()
@@ -435,6 +442,17 @@ class AdvancedPageRankCalculator(PageRankCalculator):
             total_protect_used = protect_used
             total_boost_used = boost_used
             
+            if progress is not None:
+                progress.iteration(iteration, float(np.abs(p - p_old).sum()))
+            
+            # Stop with the best-so-far vector when cancelled or out of time
+            if cancel_token is not None:
+                stopped = cancel_token.reason
+                if stopped:
+                    diff = float(np.abs(p - p_old).sum())
+                    logger.warning(f"⏹️  Protect & Boost stopped ({stopped}) at iteration {iteration}: L1_diff={diff:.8f}")
+                    break
+            
             # Check convergence
             if iteration % 10 == 0:
                 diff = np.linalg.norm(p - p_old, ord=1)
@@ -444,12 +462,20 @@ class AdvancedPageRankCalculator(PageRankCalculator):
                 
                 if diff < tolerance:
                     logger.info(f"✅ Converged after {iteration} iterations")
+                    converged = True
                     break
                 
                 # Brief async yield for large iterations
                 if iteration % 100 == 0:
                     await asyncio.sleep(0.001)
         
+        self.last_run_stats = {
+            "iterations": iteration + 1,
+            "residual": float(diff) if diff is not None else None,
+            "converged": converged,
+            "stopped": stopped
+        }
+        
         # Convert back to dict format
         result = {page_ids[i]: p[i] for i in range(n_pages)}
         
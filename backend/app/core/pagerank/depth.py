@@ -0,0 +1,82 @@
+import numpy as np
+import logging
+from typing import List, Optional, Any
+from urllib.parse import urlparse
+from scipy.sparse.csgraph import shortest_path
+
+from app.core.pagerank.graph import CompiledGraph
+
+logger = logging.getLogger(__name__)
+
+# Stored for pages that cannot be reached from the homepage
+UNREACHABLE_DEPTH = -1
+
+
+def find_root_index(pages: List[Any]) -> Optional[int]:
+    """
+    Locate the homepage in a page list.
+
+    Prefers a URL whose path is empty or "/", otherwise falls back to the
+    shortest URL of the project.
+    """
+    best_idx = None
+    best_len = None
+
+    for idx, page in enumerate(pages):
+        url = page['url'] if isinstance(page, dict) else page.url
+        if not url:
+            continue
+
+        if urlparse(url).path in ('', '/'):
+            return idx
+
+        if best_len is None or len(url) < best_len:
+            best_idx = idx
+            best_len = len(url)
+
+    return best_idx
+
+
+def compute_click_depth(graph: CompiledGraph, root_idx: Optional[int]) -> np.ndarray:
+    """
+    Compute click depth from the root page with an unweighted BFS.
+
+    Args:
+        graph: Compiled link graph
+        root_idx: Index of the homepage in the graph
+
+    Returns:
+        int16 array aligned to graph.page_ids, UNREACHABLE_DEPTH for pages
+        with no path from the root
+    """
+    depths = np.full(graph.n_pages, UNREACHABLE_DEPTH, dtype=np.int16)
+    if root_idx is None or graph.n_pages == 0:
+        return depths
+
+    distances = shortest_path(
+        graph.adjacency, method='D', directed=True,
+        unweighted=True, indices=root_idx
+    )
+
+    reachable = np.isfinite(distances)
+    depths[reachable] = distances[reachable].astype(np.int16)
+
+    logger.info(f"📏 Click depth: {int(reachable.sum()):,}/{graph.n_pages:,} pages reachable, "
+                f"max depth {int(depths.max())}")
+
+    return depths
+
+
+def summarize_depth_change(current: np.ndarray, new: np.ndarray) -> dict:
+    """Summarize click-depth changes between two aligned depth vectors"""
+    current_reachable = current != UNREACHABLE_DEPTH
+    new_reachable = new != UNREACHABLE_DEPTH
+    both = current_reachable & new_reachable
+
+    return {
+        "average_click_depth_before": float(current[current_reachable].mean()) if current_reachable.any() else None,
+        "average_click_depth_after": float(new[new_reachable].mean()) if new_reachable.any() else None,
+        "pages_with_reduced_depth": int(np.sum(new[both] < current[both])),
+        "pages_newly_reachable": int(np.sum(new_reachable & ~current_reachable)),
+        "unreachable_pages_after": int(np.sum(~new_reachable))
+    }
@@ -0,0 +1,111 @@
+import numpy as np
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+from scipy.sparse.csgraph import connected_components
+
+from app.core.pagerank.graph import CompiledGraph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SinkTrap:
+    """Strongly connected component with no link leaving it"""
+    members: np.ndarray      # graph indices of the pages in the trap
+    pagerank_mass: float     # PageRank absorbed by the trap
+
+
+@dataclass
+class GraphDiagnostics:
+    """Structural problems detected on a compiled graph (indices into graph.page_ids)"""
+    orphans: np.ndarray                  # no inlinks
+    dead_ends: np.ndarray                # no outlinks
+    sink_traps: List[SinkTrap] = field(default_factory=list)
+    n_components: int = 0
+    largest_component_size: int = 0
+    orphan_mass: float = 0.0
+    dead_end_mass: float = 0.0
+
+    @property
+    def trap_mass(self) -> float:
+        return float(sum(trap.pagerank_mass for trap in self.sink_traps))
+
+
+def diagnose_graph(graph: CompiledGraph,
+                   pagerank: np.ndarray,
+                   root_idx: Optional[int] = None,
+                   max_trap_size: int = 50) -> GraphDiagnostics:
+    """
+    Flag orphans, dead ends and sink traps in O(n + m).
+
+    Args:
+        graph: Compiled link graph
+        pagerank: PageRank vector aligned to graph.page_ids
+        root_idx: Homepage index, never reported as an orphan
+        max_trap_size: Largest SCC still considered a trap (the giant
+            component of a site is not a trap even if it has no exit)
+
+    Returns:
+        GraphDiagnostics with traps sorted by absorbed PageRank
+    """
+    n = graph.n_pages
+    pagerank = np.asarray(pagerank, dtype=np.float64)
+
+    in_degree = graph.in_degree()
+    out_degree = graph.out_degree()
+
+    orphan_mask = in_degree == 0
+    if root_idx is not None:
+        orphan_mask[root_idx] = False
+    orphans = np.flatnonzero(orphan_mask)
+    dead_ends = np.flatnonzero(out_degree == 0)
+
+    if n == 0:
+        return GraphDiagnostics(orphans=orphans, dead_ends=dead_ends)
+
+    n_components, labels = connected_components(
+        graph.adjacency, directed=True, connection='strong'
+    )
+    sizes = np.bincount(labels, minlength=n_components)
+
+    # A component is a sink if none of its edges leave it
+    sources = np.repeat(np.arange(n), out_degree)
+    targets = graph.adjacency.indices
+    leaving = labels[sources] != labels[targets]
+    has_exit = np.zeros(n_components, dtype=bool)
+    has_exit[labels[sources[leaving]]] = True
+
+    # Single-page sinks are already reported as dead ends
+    trap_components = np.flatnonzero(~has_exit & (sizes >= 2) & (sizes <= max_trap_size))
+    component_mass = np.bincount(labels, weights=pagerank, minlength=n_components)
+
+    sink_traps = []
+    if len(trap_components):
+        is_trap = np.zeros(n_components, dtype=bool)
+        is_trap[trap_components] = True
+        trap_pages = np.flatnonzero(is_trap[labels])
+        trap_pages = trap_pages[np.argsort(labels[trap_pages], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(labels[trap_pages])) + 1
+
+        for members in np.split(trap_pages, boundaries):
+            sink_traps.append(SinkTrap(
+                members=members,
+                pagerank_mass=float(component_mass[labels[members[0]]])
+            ))
+        sink_traps.sort(key=lambda trap: trap.pagerank_mass, reverse=True)
+
+    diagnostics = GraphDiagnostics(
+        orphans=orphans,
+        dead_ends=dead_ends,
+        sink_traps=sink_traps,
+        n_components=int(n_components),
+        largest_component_size=int(sizes.max()),
+        orphan_mass=float(pagerank[orphans].sum()),
+        dead_end_mass=float(pagerank[dead_ends].sum())
+    )
+
+    logger.info(f"🩺 Graph diagnostics: {len(orphans)} orphans, {len(dead_ends)} dead ends, "
+                f"{len(sink_traps)} sink traps ({diagnostics.trap_mass:.4f} PageRank trapped)")
+
+    return diagnostics
@@ -0,0 +1,154 @@
+import numpy as np
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Optional, Any
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def get_page_id(page: Any) -> int:
+    """Get page ID from an ORM page object or a page dict"""
+    return page['id'] if isinstance(page, dict) else page.id
+
+
+def links_to_index_pairs(page_ids: np.ndarray,
+                         links: Any,
+                         return_valid: bool = False) -> Tuple[np.ndarray, ...]:
+    """
+    Map (from_id, to_id) links onto row/column indices of page_ids.
+
+    Links pointing to unknown page IDs are dropped. Accepts a list of tuples
+    or an (m, 2) integer array. With return_valid, also returns the mask of
+    the links kept (to align per-link values such as weights).
+    """
+    if len(links) == 0 or len(page_ids) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return (empty, empty, np.zeros(len(links), dtype=bool)) if return_valid else (empty, empty)
+
+    edges = np.asarray(links, dtype=np.int64).reshape(-1, 2)
+    page_ids = np.asarray(page_ids, dtype=np.int64)
+
+    # Sorted lookup: page_ids are not necessarily sorted
+    order = np.argsort(page_ids, kind='stable')
+    sorted_ids = page_ids[order]
+
+    def lookup(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pos = np.searchsorted(sorted_ids, ids)
+        pos = np.minimum(pos, len(sorted_ids) - 1)
+        found = sorted_ids[pos] == ids
+        return order[pos], found
+
+    rows, rows_found = lookup(edges[:, 0])
+    cols, cols_found = lookup(edges[:, 1])
+    valid = rows_found & cols_found
+
+    if return_valid:
+        return rows[valid], cols[valid], valid
+    return rows[valid], cols[valid]
+
+
+def link_weight_array(links: Any, link_weights: Any = None) -> np.ndarray:
+    """
+    Weight of every link, aligned with links.
+
+    link_weights is either a dict keyed by (from_id, to_id) (missing links
+    weigh 1.0) or an array already aligned with links.
+    """
+    if link_weights is None or (isinstance(link_weights, dict) and not link_weights):
+        return np.ones(len(links), dtype=np.float64)
+    if isinstance(link_weights, dict):
+        # Dict keys are Python (from_id, to_id) tuples
+        pairs = zip(links[:, 0].tolist(), links[:, 1].tolist()) if isinstance(links, np.ndarray) else links
+        return np.fromiter((link_weights.get((from_id, to_id), 1.0) for from_id, to_id in pairs), dtype=np.float64, count=len(links))
+    return np.asarray(link_weights, dtype=np.float64)
+
+
+@dataclass
+class CompiledGraph:
+    """
+    CSR view of a link graph aligned to a page index.
+
+    Row i of the adjacency matrix holds the outlinks of page_ids[i].
+    Weights are binary: duplicate links collapse to a single edge.
+    """
+    page_ids: np.ndarray           # index -> page id (int64)
+    id_to_idx: Dict[int, int]      # page id -> index
+    adjacency: sparse.csr_matrix   # (n, n) binary adjacency, rows = sources
+
+    @property
+    def n_pages(self) -> int:
+        return self.adjacency.shape[0]
+
+    @property
+    def n_links(self) -> int:
+        return self.adjacency.nnz
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.adjacency.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.adjacency.indices, minlength=self.n_pages)
+
+    def index_of(self, page_id: int) -> Optional[int]:
+        return self.id_to_idx.get(page_id)
+
+    def with_links(self, links: Any) -> "CompiledGraph":
+        """Return a new graph over the same page index with extra links added"""
+        rows, cols = links_to_index_pairs(self.page_ids, links)
+        if len(rows) == 0:
+            return self
+
+        extra = _binary_csr(rows, cols, self.n_pages)
+        combined = self.adjacency + extra
+        combined.data[:] = 1.0
+        return CompiledGraph(self.page_ids, self.id_to_idx, combined)
+
+    def without_links(self, links: Any) -> "CompiledGraph":
+        """Return a new graph over the same page index with the given links removed"""
+        rows, cols = links_to_index_pairs(self.page_ids, links)
+        if len(rows) == 0:
+            return self
+
+        # Mask over the CSR entries, matched on row * n + col
+        n = self.n_pages
+        entry_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.adjacency.indptr))
+        entry_keys = entry_rows * n + self.adjacency.indices
+        keep = ~np.isin(entry_keys, rows * n + cols)
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(entry_rows[keep], minlength=n))))
+        pruned = sparse.csr_matrix(
+            (self.adjacency.data[keep], self.adjacency.indices[keep], indptr), shape=(n, n)
+        )
+        return CompiledGraph(self.page_ids, self.id_to_idx, pruned)
+
+
+def _binary_csr(rows: np.ndarray, cols: np.ndarray, n: int) -> sparse.csr_matrix:
+    """Build a binary CSR matrix, collapsing duplicate edges"""
+    data = np.ones(len(rows), dtype=np.float64)
+    A = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+    A.sum_duplicates()
+    A.data[:] = 1.0
+    return A
+
+
+def compile_graph(pages: List[Any], links: Any) -> CompiledGraph:
+    """
+    Compile pages and (from_id, to_id) links into a CompiledGraph.
+
+    Args:
+        pages: List of page objects or dicts with an 'id' field
+        links: List of (from_page_id, to_page_id) tuples or an (m, 2) array
+
+    Returns:
+        CompiledGraph indexed in the order of `pages`
+    """
+    page_ids = np.fromiter((get_page_id(page) for page in pages),
+                           dtype=np.int64, count=len(pages))
+    id_to_idx = {page_id: idx for idx, page_id in enumerate(page_ids.tolist())}
+
+    rows, cols = links_to_index_pairs(page_ids, links)
+    adjacency = _binary_csr(rows, cols, len(page_ids))
+
+    logger.info(f"🧱 Compiled graph: {len(page_ids):,} pages, {adjacency.nnz:,} links")
+
+    return CompiledGraph(page_ids, id_to_idx, adjacency)
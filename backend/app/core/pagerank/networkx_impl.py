@@ -5,6 +5,9 @@ import time
 import asyncio
 from typing import Dict, List, Tuple
 from app.core.pagerank.calculator import PageRankCalculator
+from app.core.pagerank.graph import links_to_index_pairs, link_weight_array
+from app.core.cancellation import CancellationToken
+from app.core.progress import ProgressReporter
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +20,20 @@ class NetworkXPageRankCalculator(PageRankCalculator):
                        damping: float = 0.85,
                        max_iter: int = 100,  # Optimized default
                        tolerance: float = 1e-4,  # Relaxed tolerance
-                       link_weights: Dict[Tuple[int, int], float] = None) -> Dict[int, float]:
-        """Optimized PageRank calculation for large datasets with chunked processing"""
+                       link_weights: Dict[Tuple[int, int], float] = None,
+                       nstart: Dict[int, float] = None,
+                       cancel_token: CancellationToken = None,
+                       progress: ProgressReporter = None) -> Dict[int, float]:
+        """
+        Optimized PageRank calculation for large datasets with chunked processing
+        
+        nstart optionally warm-starts the iteration from a previous solution
+        (e.g. the previous point of a parameter sweep). When cancel_token
+        stops, the sparse solver returns its best-so-far vector; run details
+        are kept in last_run_stats. progress receives per-iteration L1
+        residuals from the sparse solver.
+        """
+        self.last_run_stats = {"iterations": None, "residual": None, "converged": None, "stopped": None}
         
         start_time = time.time()
         num_pages = len(pages)
@@ -29,24 +44,30 @@ class NetworkXPageRankCalculator(PageRankCalculator):
         
         # Determine strategy based on size
         if num_pages > 50000 or num_links > 500000:
-            return await self._calculate_large_dataset(pages, links, damping, max_iter, tolerance, link_weights)
+            return await self._calculate_large_dataset(pages, links, damping, max_iter, tolerance, link_weights, nstart, cancel_token, progress)
         else:
-            return await self._calculate_standard(pages, links, damping, max_iter, tolerance, link_weights)
+            return await self._calculate_standard(pages, links, damping, max_iter, tolerance, link_weights, nstart)
     
-    async def _calculate_large_dataset(self, pages, links, damping, max_iter, tolerance, link_weights):
+    async def _calculate_large_dataset(self, pages, links, damping, max_iter, tolerance, link_weights, nstart=None, cancel_token=None, progress=None):
         """Optimized calculation for very large datasets"""
         
         logger.info("🔧 Using large dataset optimization strategy")
         
         # Use sparse matrix approach for memory efficiency
-        return await self._calculate_with_sparse_matrix(pages, links, damping, max_iter, tolerance, link_weights)
+        return await self._calculate_with_sparse_matrix(pages, links, damping, max_iter, tolerance, link_weights, nstart, cancel_token, progress)
     
-    async def _calculate_standard(self, pages, links, damping, max_iter, tolerance, link_weights):
+    async def _calculate_standard(self, pages, links, damping, max_iter, tolerance, link_weights, nstart=None):
         """Standard NetworkX calculation with optimizations"""
         
         start_time = time.time()
         page_ids = [page['id'] if isinstance(page, dict) else page.id for page in pages]
         
+        if isinstance(links, np.ndarray):
+            # Edge arrays (bulk rules): NetworkX works on (from_id, to_id) tuples
+            if link_weights is not None and not isinstance(link_weights, dict):
+                link_weights = dict(zip(map(tuple, links.tolist()), np.asarray(link_weights).tolist()))
+            links = list(map(tuple, links.tolist()))
+        
         logger.info("📈 Building graph structure...")
         G = nx.DiGraph()
         G.add_nodes_from(page_ids)
@@ -85,7 +106,7 @@ class NetworkXPageRankCalculator(PageRankCalculator):
                 alpha=damping,
                 max_iter=max_iter,
                 tol=tolerance,
-                nstart=None,  # Let NetworkX optimize starting values
+                nstart=nstart,  # Warm start if provided, uniform otherwise
                 weight='weight' if link_weights else None
             )
             
@@ -110,36 +131,26 @@ class NetworkXPageRankCalculator(PageRankCalculator):
         
         return pagerank_scores
     
-    async def _calculate_with_sparse_matrix(self, pages, links, damping, max_iter, tolerance, link_weights):
+    async def _calculate_with_sparse_matrix(self, pages, links, damping, max_iter, tolerance, link_weights, nstart=None, cancel_token=None, progress=None):
         """Memory-efficient calculation using sparse matrices for huge datasets"""
         
         logger.info("🔧 Using sparse matrix implementation for memory efficiency")
         
         try:
             from scipy import sparse
-            from scipy.sparse.linalg import norm
         except ImportError:
             logger.warning("⚠️  SciPy not available, falling back to standard method")
-            return await self._calculate_standard(pages, links, damping, max_iter, tolerance)
+            return await self._calculate_standard(pages, links, damping, max_iter, tolerance, link_weights, nstart)
         
         start_time = time.time()
         page_ids = [page['id'] if isinstance(page, dict) else page.id for page in pages]
         n = len(page_ids)
         
-        # Create mapping from page_id to index
-        id_to_idx = {page_id: idx for idx, page_id in enumerate(page_ids)}
-        
-        # Build sparse adjacency matrix
+        # Build sparse adjacency matrix (duplicate links add up their weights)
         logger.info("🏗️  Building sparse adjacency matrix...")
         
-        rows, cols, weights = [], [], []
-        for from_id, to_id in links:
-            if from_id in id_to_idx and to_id in id_to_idx:
-                rows.append(id_to_idx[from_id])
-                cols.append(id_to_idx[to_id])
-                # Use provided weight or default to 1.0
-                weight = link_weights.get((from_id, to_id), 1.0) if link_weights else 1.0
-                weights.append(weight)
+        rows, cols, valid = links_to_index_pairs(page_ids, links, return_valid=True)
+        weights = link_weight_array(links, link_weights)[valid]
         
         # Create sparse matrix with weights
         A = sparse.csr_matrix((weights, (rows, cols)), shape=(n, n))
@@ -157,8 +168,18 @@ class NetworkXPageRankCalculator(PageRankCalculator):
         # Power iteration
         logger.info("🔄 Running power iteration...")
         
-        v = np.ones(n) / n  # Initial uniform distribution
+        if nstart:
+            # Warm start from a previous solution
+            v = np.array([nstart.get(page_id, 1.0 / n) for page_id in page_ids])
+            v = v / v.sum()
+        else:
+            v = np.ones(n) / n  # Initial uniform distribution
         teleport = (1 - damping) / n
+        diff = None
+        converged = False
+        stopped = None
+        if progress is not None:
+            progress.start_solve("pagerank", tolerance)
         
         for iteration in range(max_iter):
             v_old = v.copy()
@@ -166,18 +187,37 @@ class NetworkXPageRankCalculator(PageRankCalculator):
             # PageRank update: v = damping * M @ v + teleport
             v = damping * M.dot(v) + teleport
             
+            if progress is not None:
+                progress.iteration(iteration, float(np.abs(v - v_old).sum()))
+            
+            # Stop with the best-so-far vector when cancelled or out of time
+            if cancel_token is not None:
+                stopped = cancel_token.reason
+                if stopped:
+                    diff = float(np.abs(v - v_old).sum())
+                    logger.warning(f"⏹️  Power iteration stopped ({stopped}) at iteration {iteration}: residual = {diff:.8f}")
+                    break
+            
             # Check convergence
             if iteration % 10 == 0:  # Check every 10 iterations
-                diff = norm(v - v_old, ord=1)
+                diff = float(np.abs(v - v_old).sum())
                 logger.info(f"   🔄 Iteration {iteration}: convergence = {diff:.8f}")
                 
                 if diff < tolerance:
                     logger.info(f"✅ Converged after {iteration} iterations")
+                    converged = True
                     break
                 
                 # Yield control periodically
                 await asyncio.sleep(0.001)
         
+        self.last_run_stats = {
+            "iterations": iteration + 1 if max_iter else 0,
+            "residual": float(diff) if diff is not None else None,
+            "converged": converged,
+            "stopped": stopped
+        }
+        
         # Convert back to dictionary
         pagerank_scores = {page_ids[i]: v[i] for i in range(n)}
         
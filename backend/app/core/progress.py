@@ -0,0 +1,208 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+# Event types that end a stream
+TERMINAL_EVENTS = {"completed", "failed", "cancelled", "partial"}
+
+
+class ProgressBroker:
+    """
+    Fan-out of progress events from jobs to SSE subscribers.
+
+    Publishers may run in worker threads with their own event loop, so
+    events are handed to each subscriber's loop with call_soon_threadsafe.
+    A bounded history per channel lets late subscribers replay what they
+    missed.
+    """
+
+    def __init__(self, max_channels: int = 100, max_history: int = 500):
+        self.max_channels = max_channels
+        self.max_history = max_history
+        self._history: "OrderedDict[Hashable, Deque[Dict]]" = OrderedDict()
+        self._subscribers: Dict[Hashable, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: Hashable, event_type: str, **data: Any) -> Dict:
+        event = {"type": event_type, "time": time.time(), **data}
+        with self._lock:
+            history = self._history.get(channel)
+            if history is None:
+                history = self._history[channel] = deque(maxlen=self.max_history)
+                while len(self._history) > self.max_channels:
+                    self._history.popitem(last=False)
+            history.append(event)
+            subscribers = list(self._subscribers.get(channel, []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber loop already closed
+                pass
+        return event
+
+    def reset(self, channel: Hashable) -> None:
+        """Forget the history of a channel before a new run starts on it"""
+        with self._lock:
+            self._history.pop(channel, None)
+
+    def subscribe(self, channel: Hashable) -> Tuple[asyncio.Queue, List[Dict]]:
+        """Register the calling loop; returns its queue and the history so far"""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((asyncio.get_running_loop(), queue))
+            history = list(self._history.get(channel, []))
+        return queue, history
+
+    def unsubscribe(self, channel: Hashable, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = [entry for entry in self._subscribers.get(channel, []) if entry[1] is not queue]
+            if subscribers:
+                self._subscribers[channel] = subscribers
+            else:
+                self._subscribers.pop(channel, None)
+
+
+class ProgressReporter:
+    """
+    Phase and iteration events for one job.
+
+    iteration() derives an ETA from the observed convergence rate: with
+    geometric convergence r_k ≈ r_j · ρ^(k-j), the iterations left to reach
+    the tolerance are log(tol / r_k) / log(ρ).
+    """
+
+    def __init__(self,
+                 broker: ProgressBroker,
+                 channel: Hashable,
+                 min_interval: float = 0.1):
+        self.broker = broker
+        self.channel = channel
+        self.min_interval = min_interval
+        self.tolerance: Optional[float] = None
+        self._solve_name: Optional[str] = None
+        self._solve_start = time.time()
+        self._last_emit = 0.0
+        self._previous: Optional[Tuple[int, float]] = None
+        self._converged = False
+        self._phase: Optional[Tuple[str, float]] = None
+        self.timings: Dict[str, float] = {}
+        # Set once a terminal event has been published
+        self.finished = False
+
+    def phase(self, name: str, **data: Any) -> None:
+        self._close_phase()
+        self._phase = (name, time.time())
+        self.broker.publish(self.channel, "phase", phase=name, **data)
+
+    def _close_phase(self) -> None:
+        if self._phase is not None:
+            name, started = self._phase
+            self.timings[name] = self.timings.get(name, 0.0) + time.time() - started
+            self._phase = None
+
+    def start_solve(self, name: str, tolerance: float) -> None:
+        """Reset the convergence tracking for a new iterative solve"""
+        self._solve_name = name
+        self.tolerance = tolerance
+        self._solve_start = time.time()
+        self._previous = None
+        self._last_emit = 0.0
+        self._converged = False
+
+    def iteration(self, iteration: int, residual: float) -> None:
+        now = time.time()
+        rate = None
+        eta = None
+
+        if self._previous is not None and residual > 0:
+            prev_iteration, prev_residual = self._previous
+            steps = iteration - prev_iteration
+            if steps > 0 and prev_residual > 0:
+                rate = (residual / prev_residual) ** (1.0 / steps)
+        self._previous = (iteration, residual)
+
+        if rate is not None and 0 < rate < 1 and self.tolerance:
+            remaining = max(0.0, math.log(self.tolerance / residual) / math.log(rate))
+            seconds_per_iteration = (now - self._solve_start) / (iteration + 1)
+            eta = remaining * seconds_per_iteration
+
+        # Throttle so that fast solves do not flood the stream, but always
+        # report the iteration that first reaches the tolerance
+        crossed = bool(self.tolerance) and residual < self.tolerance and not self._converged
+        if crossed:
+            self._converged = True
+        if now - self._last_emit < self.min_interval and not crossed:
+            return
+        self._last_emit = now
+
+        self.broker.publish(
+            self.channel, "iteration",
+            solve=self._solve_name,
+            iteration=iteration,
+            residual=float(residual),
+            convergence_rate=rate,
+            eta_seconds=eta
+        )
+
+    def finish(self, status: str, **data: Any) -> None:
+        """Terminal event, carrying the time spent in each phase"""
+        self._close_phase()
+        self.finished = True
+        self.broker.publish(self.channel, status, timings=dict(self.timings), **data)
+
+
+def format_sse(event: Dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def sse_events(broker: ProgressBroker,
+                     channel: Hashable,
+                     final_event: Optional[Dict] = None,
+                     keepalive: float = 15.0):
+    """
+    Server-sent events for a channel: replayed history, then live events
+    until a terminal one. final_event is sent when the channel has no
+    history but the job is known to be finished (e.g. after a restart).
+    """
+    queue, history = broker.subscribe(channel)
+    try:
+        if not history and final_event is not None:
+            yield format_sse(final_event)
+            return
+
+        for event in history:
+            yield format_sse(event)
+            if event["type"] in TERMINAL_EVENTS:
+                return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+
+            yield format_sse(event)
+            if event["type"] in TERMINAL_EVENTS:
+                return
+    finally:
+        broker.unsubscribe(channel, queue)
+
+
+# Process-wide broker shared by jobs and the SSE endpoints
+progress_broker = ProgressBroker()
+
+
+def simulation_channel(simulation_id: int) -> Tuple[str, int]:
+    return ("simulation", simulation_id)
+
+
+def pagerank_channel(project_id: int) -> Tuple[str, int]:
+    return ("pagerank", project_id)
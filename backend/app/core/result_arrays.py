@@ -0,0 +1,185 @@
+import base64
+import json
+import zlib
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# On-disk dtypes of the columnar simulation results
+PAGE_ID_DTYPE = np.int64
+SCORE_DTYPE = np.float32
+DEPTH_DTYPE = np.int16
+LINK_DTYPE = np.int32
+
+# Sortable columns; percent change is derived from the new PageRank and the delta
+SORT_KEYS = ("new_pagerank", "pagerank_delta", "percent_change")
+
+
+def encode_array(values: np.ndarray, dtype) -> bytes:
+    """Compress an array as raw little-endian values of a fixed dtype"""
+    return zlib.compress(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes())
+
+
+def decode_array(blob: bytes, dtype) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(blob), dtype=np.dtype(dtype).newbyteorder('<')).astype(dtype)
+
+
+def links_to_array(links) -> np.ndarray:
+    """Edge list as an (m, 2) array of (from_page_id, to_page_id) pairs"""
+    return np.asarray(links, dtype=LINK_DTYPE).reshape(-1, 2)
+
+
+def encode_links(links) -> bytes:
+    return encode_array(links_to_array(links).ravel(), LINK_DTYPE)
+
+
+def decode_links(blob: bytes) -> np.ndarray:
+    return decode_array(blob, LINK_DTYPE).reshape(-1, 2)
+
+
+def encode_cursor(sort_by: str, descending: bool, value: float, page_id: int) -> str:
+    """Opaque pagination cursor: the sort value and page id of the last row returned"""
+    payload = json.dumps([sort_by, descending, repr(float(value)), int(page_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str, descending: bool) -> Tuple[float, int]:
+    try:
+        cursor_sort, cursor_descending, value, page_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value, page_id = float(value), int(page_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort_by or cursor_descending != descending:
+        raise ValueError("Cursor does not match the requested sort")
+    return value, page_id
+
+
+@dataclass
+class ResultArrays:
+    """Per-simulation results as aligned columns (one entry per page)"""
+    page_ids: np.ndarray                     # int64
+    new_pagerank: np.ndarray                 # float32
+    pagerank_delta: np.ndarray               # float32
+    new_click_depth: Optional[np.ndarray]    # int16, -1 = unreachable
+
+    @classmethod
+    def build(cls,
+              page_ids,
+              new_pagerank,
+              pagerank_delta,
+              new_click_depth=None) -> "ResultArrays":
+        return cls(
+            page_ids=np.asarray(page_ids, dtype=PAGE_ID_DTYPE),
+            new_pagerank=np.asarray(new_pagerank, dtype=SCORE_DTYPE),
+            pagerank_delta=np.asarray(pagerank_delta, dtype=SCORE_DTYPE),
+            new_click_depth=None if new_click_depth is None else np.asarray(new_click_depth, dtype=DEPTH_DTYPE)
+        )
+
+    @classmethod
+    def from_results(cls, results: List[Dict]) -> "ResultArrays":
+        """Columns from the legacy list of per-page result dicts"""
+        depths = [result.get("new_click_depth") for result in results]
+        return cls.build(
+            [result["page_id"] for result in results],
+            [result["new_pagerank"] for result in results],
+            [result["pagerank_delta"] for result in results],
+            None if any(depth is None for depth in depths) else depths
+        )
+
+    @property
+    def n_pages(self) -> int:
+        return len(self.page_ids)
+
+    def to_results(self) -> List[Dict]:
+        """Legacy per-page result dicts"""
+        depths = self.new_click_depth.tolist() if self.new_click_depth is not None else [None] * self.n_pages
+        return [
+            {
+                "page_id": page_id,
+                "new_pagerank": new_pr,
+                "pagerank_delta": delta,
+                "new_click_depth": depth
+            }
+            for page_id, new_pr, delta, depth in zip(
+                self.page_ids.tolist(), self.new_pagerank.tolist(),
+                self.pagerank_delta.tolist(), depths
+            )
+        ]
+
+    def baseline_pagerank(self) -> np.ndarray:
+        """PageRank before the simulation, as recorded by the run itself"""
+        return self.new_pagerank.astype(np.float64) - self.pagerank_delta.astype(np.float64)
+
+    def percent_change(self) -> np.ndarray:
+        baseline = self.baseline_pagerank()
+        return np.divide(self.pagerank_delta * 100.0, baseline,
+                         out=np.zeros(self.n_pages), where=baseline > 0)
+
+    def sort_values(self, key: str) -> np.ndarray:
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key}")
+        if key == "percent_change":
+            return self.percent_change()
+        return getattr(self, key).astype(np.float64)
+
+    def page_rows(self,
+                  values: np.ndarray,
+                  limit: int,
+                  descending: bool = True,
+                  mask: np.ndarray = None,
+                  after: Optional[Tuple[float, int]] = None) -> np.ndarray:
+        """
+        Row indices of one page of results ordered by (value, page_id).
+
+        mask restricts the rows (filters), after is the (value, page_id)
+        of the last row of the previous page. Only the rows up to the k-th
+        value are sorted, ties on that value included.
+        """
+        signed = -values if descending else values
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(self.n_pages)
+
+        if after is not None:
+            after_value = -after[0] if descending else after[0]
+            candidate_values = signed[candidates]
+            candidate_ids = self.page_ids[candidates]
+            candidates = candidates[
+                (candidate_values > after_value) |
+                ((candidate_values == after_value) & (candidate_ids > after[1]))
+            ]
+
+        if limit <= 0 or len(candidates) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if limit < len(candidates):
+            threshold = np.partition(signed[candidates], limit - 1)[limit - 1]
+            candidates = candidates[signed[candidates] <= threshold]
+
+        order = np.lexsort((self.page_ids[candidates], signed[candidates]))
+        return candidates[order[:limit]]
+
+    def top_k(self,
+              key: str = "pagerank_delta",
+              k: int = 50,
+              descending: bool = True,
+              values: np.ndarray = None) -> np.ndarray:
+        """
+        Row indices of the k best rows by a column, in order.
+
+        argpartition selects the k rows in O(n) before sorting only those,
+        so a first screen of a large simulation does not sort every page.
+        values overrides the column (e.g. a derived percent change).
+        """
+        if values is None:
+            values = self.sort_values(key)
+
+        n = len(values)
+        k = max(0, min(k, n))
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+
+        signed = -values.astype(np.float64) if descending else values.astype(np.float64)
+        if k < n:
+            candidates = np.argpartition(signed, k - 1)[:k]
+        else:
+            candidates = np.arange(n)
+        return candidates[np.argsort(signed[candidates], kind='stable')]
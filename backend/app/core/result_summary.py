@@ -0,0 +1,70 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+# Percentiles of the PageRank delta reported in the summary
+SUMMARY_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def summarize_deltas(current: np.ndarray, new: np.ndarray) -> Dict:
+    """Counts, extremes and percentiles of the PageRank change (aligned vectors)"""
+    deltas = new - current
+    positive = deltas > 0
+    negative = deltas < 0
+    n_positive = int(positive.sum())
+    n_negative = int(negative.sum())
+    has_pages = len(deltas) > 0
+
+    percent = np.divide(deltas * 100.0, current, out=np.zeros(len(deltas)), where=current > 0)
+
+    return {
+        "pages_with_positive_change": n_positive,
+        "pages_with_negative_change": n_negative,
+        "pages_unchanged": len(deltas) - n_positive - n_negative,
+        "average_delta": float(deltas.mean()) if has_pages else 0,
+        "max_positive_delta": float(deltas[positive].max()) if n_positive else 0,
+        "max_negative_delta": float(deltas[negative].min()) if n_negative else 0,
+        "total_pagerank_redistribution": float(np.abs(deltas).sum()),
+        "delta_percentiles": _percentiles(deltas),
+        "percent_change_percentiles": _percentiles(percent)
+    }
+
+
+def summarize_groups(labels: Sequence[Optional[str]],
+                     current: np.ndarray,
+                     new: np.ndarray,
+                     default_label: str = "") -> Dict[str, Dict]:
+    """Per-label aggregates (page type or category) computed with bincount"""
+    if len(current) == 0:
+        return {}
+
+    names, inverse = np.unique(
+        np.array([label or default_label for label in labels], dtype=object).astype(str),
+        return_inverse=True
+    )
+    deltas = new - current
+    n_groups = len(names)
+
+    pages = np.bincount(inverse, minlength=n_groups)
+    current_total = np.bincount(inverse, weights=current, minlength=n_groups)
+    new_total = np.bincount(inverse, weights=new, minlength=n_groups)
+    positive = np.bincount(inverse, weights=deltas > 0, minlength=n_groups)
+    negative = np.bincount(inverse, weights=deltas < 0, minlength=n_groups)
+
+    return {
+        str(name): {
+            "pages": int(pages[i]),
+            "current_pagerank": float(current_total[i]),
+            "new_pagerank": float(new_total[i]),
+            "total_delta": float(new_total[i] - current_total[i]),
+            "average_delta": float((new_total[i] - current_total[i]) / pages[i]),
+            "pages_with_positive_change": int(positive[i]),
+            "pages_with_negative_change": int(negative[i])
+        }
+        for i, name in enumerate(names.tolist())
+    }
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    if len(values) == 0:
+        return {f"p{q}": 0.0 for q in SUMMARY_PERCENTILES}
+    return {f"p{q}": float(value) for q, value in zip(SUMMARY_PERCENTILES, np.percentile(values, SUMMARY_PERCENTILES))}
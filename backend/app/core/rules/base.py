@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+import numpy as np
 from typing import List, Tuple, Dict, Any
+from app.core.edge_set import EdgeSet, links_to_columns
+from app.core.url_matcher import get_url_matcher
 
 @dataclass
 class RuleConfig:
@@ -36,6 +39,17 @@ class BaseRule(ABC):
         """
         pass
     
+    def generate_edges(self, 
+                      pages: List[Any], 
+                      existing_links: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        New links as (from_page_ids, to_page_ids) arrays, in generation order.
+        
+        Bulk rules (menu, footer) override this to build their page x target
+        links with NumPy instead of one tuple per link.
+        """
+        return links_to_columns(self.generate_links(pages, existing_links))
+    
     @abstractmethod
     def get_description(self) -> str:
         """Get human-readable description of this rule"""
@@ -59,18 +73,35 @@ class BaseRule(ABC):
         
         return filtered_pages
     
-    def _get_existing_links_set(self, existing_links: List[Tuple[int, int]]) -> set:
-        """Convert existing links to a set for fast lookup"""
-        return set(existing_links)
+    def _find_pages_by_url(self, pages: List[Any], target_urls: List[str]) -> List[int]:
+        """Ids of the pages whose URL equals or contains one of the target URLs, in page order"""
+        if not target_urls:
+            return []
+        return get_url_matcher(pages).ids_containing(target_urls)
+    
+    def _cross_edges(self, source_ids, target_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """Every source -> target link except self-links, grouped by source"""
+        source_ids = np.asarray(source_ids, dtype=np.int64)
+        target_ids = np.asarray(target_ids, dtype=np.int64)
+        from_ids = np.repeat(source_ids, len(target_ids))
+        to_ids = np.tile(target_ids, len(source_ids))
+        not_self = from_ids != to_ids
+        return from_ids[not_self], to_ids[not_self]
+    
+    def _get_existing_links_set(self, existing_links: List[Tuple[int, int]]) -> EdgeSet:
+        """Convert existing links to an edge set for fast lookup"""
+        return EdgeSet.from_links(existing_links)
     
     def _remove_existing_links(self, 
                               new_links: List[Tuple[int, int]], 
-                              existing_links_set: set) -> List[Tuple[int, int]]:
+                              existing_links_set: EdgeSet) -> List[Tuple[int, int]]:
         """Remove links that already exist"""
-        if not self.config.exclude_existing:
+        if not self.config.exclude_existing or not new_links:
             return new_links
         
-        return [link for link in new_links if link not in existing_links_set]
+        # One vectorized membership test for all the new links
+        is_existing = existing_links_set.contains(*links_to_columns(new_links))
+        return [link for link, existing in zip(new_links, is_existing.tolist()) if not existing]
     
     def get_link_weight_multiplier(self) -> float:
         """
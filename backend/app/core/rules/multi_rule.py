@@ -1,161 +1,367 @@
 import random
 import logging
-from typing import List, Tuple, Any, Dict
+import numpy as np
+from typing import List, Tuple, Any, Dict, Optional, Union
 from app.core.rules.base import BaseRule
 from app.core.selectors import CategorySelector, SemanticSelector, RandomSelector, PageRankSelector
+from app.core.cancellation import CancellationToken
+from app.core.page_index import PageIndex
+from app.core.edge_set import EdgeSet, columns_to_links, decode_keys, encode_edges, first_occurrences
+from app.core.semantic_index import SemanticIndex
 
 logger = logging.getLogger(__name__)
 
+# Graph shared by the link generation workers of a batch or of a partitioned
+# simulation (set once per process)
+_worker_index: Optional[PageIndex] = None
+_worker_existing_links: Optional[EdgeSet] = None
+_worker_rule: Optional["MultiRule"] = None
+
+# Source pages per partition when a rule is split across processes
+PARTITION_SOURCES = 2000
+
+def init_link_worker(pages: List[Dict],
+                     existing_links: Union[List[Tuple[int, int]], EdgeSet],
+                     semantic_index: Optional[SemanticIndex] = None) -> None:
+    """Process pool initializer: receive the project graph (and embedding index) once per worker"""
+    global _worker_index, _worker_existing_links, _worker_rule
+    _worker_index = PageIndex(pages)
+    if semantic_index is not None:
+        _worker_index.attach_semantic(semantic_index)
+    _worker_existing_links = existing_links if isinstance(existing_links, EdgeSet) else EdgeSet.from_links(existing_links)
+    _worker_rule = None
+
+def generate_links_in_worker(rules_config: List[Dict], seed: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Process pool task: generate one scenario's links on the shared graph"""
+    return MultiRule(rules_config, seed=seed).generate_links(_worker_index, _worker_existing_links)
+
+def select_partition_in_worker(rules_config: List[Dict],
+                               seed: int,
+                               rule_index: int,
+                               start: int,
+                               stop: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Process pool task: run one rule on a slice of its source pages"""
+    global _worker_rule
+    # Tasks of the same simulation reuse the rule and its candidate pools
+    if _worker_rule is None or _worker_rule.rules_config != rules_config or _worker_rule.seed != seed:
+        _worker_rule = MultiRule(rules_config, seed=seed)
+    return _worker_rule.select_partition(_worker_index, _worker_existing_links, rule_index, start, stop)
+
 class MultiRule(BaseRule):
     """Rule that applies multiple linking strategies cumulatively"""
     
-    def __init__(self, rules_config: List[Dict]):
+    def __init__(self,
+                 rules_config: List[Dict],
+                 seed: Optional[int] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        # Shared generator: a fixed seed reproduces the same links
+        self.seed = seed
+        # Checked once per source page; raises SimulationCancelled when stopped
+        self.cancel_token = cancel_token
+        self.rng = random.Random(seed)
+        rng = self.rng
+        
         # Create selector instances
         self.selectors = {
-            'category': CategorySelector(),
-            'semantic': SemanticSelector(), 
-            'random': RandomSelector(),
-            'pagerank_high': PageRankSelector(prefer_high_pagerank=True),
-            'pagerank_low': PageRankSelector(prefer_high_pagerank=False)
+            'category': CategorySelector(rng),
+            'semantic': SemanticSelector(rng), 
+            'random': RandomSelector(rng),
+            'pagerank_high': PageRankSelector(prefer_high_pagerank=True, rng=rng),
+            'pagerank_low': PageRankSelector(prefer_high_pagerank=False, rng=rng)
         }
         
         self.rules_config = rules_config
+        # Source rows and candidate pool of each rule, per page index
+        self._rule_candidates: Dict[int, Tuple[PageIndex, Dict, np.ndarray, Any]] = {}
         
         # Create dummy config for base class compatibility
         super().__init__({'rules': rules_config})
     
     def generate_links(self, 
-                      pages: List[Any], 
-                      existing_links: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+                      pages: Union[List[Any], PageIndex], 
+                      existing_links: Union[List[Tuple[int, int]], EdgeSet]) -> List[Tuple[int, int]]:
         """Generate links by applying all rules cumulatively"""
+        return self.merge_selections(existing_links, self.select_links(pages, existing_links))
+    
+    def select_links(self, 
+                     pages: Union[List[Any], PageIndex], 
+                     existing_links: Union[List[Tuple[int, int]], EdgeSet]) -> List[Tuple[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """
+        Selections of every adding rule, as (rule_index, (keys, ranks, is_reverse)).
+        
+        The selections are not deduplicated against each other yet (see
+        merge_selections). A selector's first k picks do not depend on
+        links_per_page, so the selections at a large links_per_page hold
+        those of every smaller one as their rank < k entries.
+        pages may be a PageIndex and existing_links an EdgeSet already
+        built for the simulation.
+        """
+        index = pages if isinstance(pages, PageIndex) else PageIndex(pages)
         
-        logger.info(f"🚀 MultiRule.generate_links called with {len(pages)} pages, {len(existing_links)} existing links")
+        logger.info(f"🚀 MultiRule.generate_links called with {index.n_pages} pages, {len(existing_links)} existing links")
         logger.info(f"📋 Rules config: {self.rules_config}")
         
-        all_new_links = []
-        existing_links_set = self._get_existing_links_set(existing_links)
+        existing_links_set = existing_links if isinstance(existing_links, EdgeSet) else self._get_existing_links_set(existing_links)
+        # Targets already linked from each source are skipped by the selectors.
+        # Links added by earlier rules are only filtered when merging, so that
+        # a rule's picks (and thus the rank prefixes) do not depend on them
+        existing_targets = index.adjacency(existing_links_set)
         
         # Apply each rule in sequence
+        selections = []
         for i, rule_config in enumerate(self.rules_config):
+            if self._is_removal(rule_config):
+                # Removal rules add nothing (see removed_links)
+                continue
             logger.info(f"🔄 Applying rule {i+1}/{len(self.rules_config)}: {rule_config}")
-            rule_links = self._apply_single_rule(pages, existing_links_set, rule_config)
-            logger.info(f"   ✨ Rule {i+1} generated {len(rule_links)} links")
+            selections.append((i, self._apply_single_rule(index, existing_targets, rule_config, rule_index=i)))
+        
+        return selections
+    
+    def partitions(self, pages: Union[List[Any], PageIndex]) -> List[Tuple[int, int, int]]:
+        """
+        (rule_index, start, stop) slices of each adding rule's source pages.
+        
+        Partitions only depend on the rules and the pages, and every source
+        page reseeds the generator from the simulation seed, so running them
+        in any order or process and concatenating them in this order gives
+        the sequential selections.
+        """
+        index = pages if isinstance(pages, PageIndex) else PageIndex(pages)
+        tasks = []
+        for i, rule_config in enumerate(self.rules_config):
+            if self._is_removal(rule_config):
+                continue
+            n_sources = len(self._candidates_of_rule(index, i, rule_config)[0])
+            tasks.extend((i, start, min(start + PARTITION_SOURCES, n_sources))
+                         for start in range(0, n_sources, PARTITION_SOURCES))
+        return tasks
+    
+    def select_partition(self, 
+                         pages: Union[List[Any], PageIndex], 
+                         existing_links: Union[List[Tuple[int, int]], EdgeSet],
+                         rule_index: int,
+                         start: int,
+                         stop: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Selections of one rule for its source pages start:stop (see _apply_single_rule)"""
+        index = pages if isinstance(pages, PageIndex) else PageIndex(pages)
+        existing_links_set = existing_links if isinstance(existing_links, EdgeSet) else self._get_existing_links_set(existing_links)
+        return self._apply_single_rule(index, index.adjacency(existing_links_set), self.rules_config[rule_index],
+                                       rule_index=rule_index, partition=(start, stop))
+    
+    @staticmethod
+    def join_partitions(tasks: List[Tuple[int, int, int]],
+                        results: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> List[Tuple[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """Selections of every rule (see select_links) from the partition results of tasks (as listed by partitions)"""
+        by_rule: Dict[int, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+        for (rule_index, _, _), result in zip(tasks, results):
+            by_rule.setdefault(rule_index, []).append(result)
+        return [
+            (rule_index, tuple(np.concatenate(column) for column in zip(*parts)))
+            for rule_index, parts in sorted(by_rule.items())
+        ]
+    
+    def merge_selections(self, 
+                         existing_links: Union[List[Tuple[int, int]], EdgeSet],
+                         selections: List[Tuple[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]],
+                         links_per_page: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        New links of the rules' selections, applied in rule order.
+        
+        With links_per_page, only the first links_per_page picks of every
+        source are kept before deduplicating, which gives the links of the
+        same rules run with that links_per_page under the same seed.
+        """
+        existing_links_set = existing_links if isinstance(existing_links, EdgeSet) else self._get_existing_links_set(existing_links)
+        new_keys = []
+        
+        for i, (keys, ranks, is_reverse) in selections:
+            if links_per_page is not None:
+                # Reverse links share the rank of their forward link, so pairs stay together
+                prefix = ranks < links_per_page
+                keys, is_reverse = keys[prefix], is_reverse[prefix]
             
-            # Add new links to our set to avoid duplicates in subsequent rules
-            for link in rule_links:
-                if link not in existing_links_set:
-                    all_new_links.append(link)
-                    existing_links_set.add(link)
+            # Keep links that are new (a reverse link only with its forward
+            # link), first occurrence first, then add them to the set so that
+            # later rules do not duplicate them
+            is_new = ~existing_links_set.contains_keys(keys)
+            if len(keys):
+                forward_is_new = np.concatenate(([True], is_new[:-1]))
+                is_new &= ~is_reverse | forward_is_new
+            keep = np.flatnonzero(is_new)
+            keep = keep[first_occurrences(keys[keep])]
+            logger.info(f"   ✨ Rule {i+1} generated {len(keep)} links")
+            
+            new_keys.append(keys[keep])
+            existing_links_set = existing_links_set.union(EdgeSet(keys[keep]))
+        
+        from_ids, to_ids = decode_keys(np.concatenate(new_keys) if new_keys else np.empty(0, dtype=np.int64))
+        all_new_links = columns_to_links(from_ids, to_ids)
         
         logger.info(f"🏁 Total new links generated: {len(all_new_links)}")
         return all_new_links
     
-    def _apply_single_rule(self, 
-                          pages: List[Any], 
-                          existing_links_set: set, 
-                          rule_config: Dict) -> List[Tuple[int, int]]:
-        """Apply a single rule configuration"""
+    @property
+    def has_removals(self) -> bool:
+        return any(self._is_removal(rule_config) for rule_config in self.rules_config)
+    
+    @staticmethod
+    def _is_removal(rule_config: Dict) -> bool:
+        return rule_config.get('action') == 'remove'
+    
+    def removed_links(self, 
+                      pages: Union[List[Any], PageIndex], 
+                      existing_links: Union[List[Tuple[int, int]], EdgeSet]) -> EdgeSet:
+        """
+        Existing links deleted by the removal rules (action 'remove').
         
+        A removal rule deletes every existing link from its source pages
+        to its target pages (both directions when bidirectional). Each
+        rule is a boolean mask over the entries of the CSR adjacency, so
+        removing a menu item from every page is a few vector operations.
+        Links added by the other rules are never existing links, so
+        removals and additions do not overlap.
+        """
+        if not self.has_removals:
+            return EdgeSet()
+        
+        index = pages if isinstance(pages, PageIndex) else PageIndex(pages)
+        existing_links_set = existing_links if isinstance(existing_links, EdgeSet) else self._get_existing_links_set(existing_links)
+        bounds, target_rows = index.adjacency(existing_links_set)
+        source_rows = np.repeat(np.arange(index.n_pages), np.diff(bounds))
+        
+        removed = np.zeros(len(target_rows), dtype=bool)
+        for i, rule_config in enumerate(self.rules_config):
+            if not self._is_removal(rule_config):
+                continue
+            logger.info(f"🗑️  Applying removal rule {i+1}/{len(self.rules_config)}: {rule_config}")
+            rule_sources, rule_targets = self._rule_rows(index, rule_config)
+            is_source = np.zeros(index.n_pages, dtype=bool)
+            is_source[rule_sources] = True
+            is_target = np.zeros(index.n_pages, dtype=bool)
+            is_target[rule_targets] = True
+            
+            matched = is_source[source_rows] & is_target[target_rows]
+            if rule_config.get('bidirectional', False):
+                matched |= is_target[source_rows] & is_source[target_rows]
+            logger.info(f"   🗑️  Rule {i+1} removes {int((matched & ~removed).sum())} links")
+            removed |= matched
+        
+        return EdgeSet.from_arrays(index.ids[source_rows[removed]], index.ids[target_rows[removed]])
+    
+    def _rule_rows(self, index: PageIndex, rule_config: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Source and target rows of a rule (type, category and URL filters)"""
         logger.info(f"   🔍 Filtering pages for rule:")
         logger.info(f"      Source types: {rule_config.get('source_types', [])}")
         logger.info(f"      Target types: {rule_config.get('target_types', [])}")
         
-        # Filter source pages
-        source_pages = self._filter_pages_by_criteria(
-            pages,
+        # Filter source pages (rows of the page index)
+        source_rows = index.filter_rows(
             types_filter=rule_config.get('source_types', []),
             categories_filter=rule_config.get('source_categories', [])
         )
-        logger.info(f"      📤 Source pages found: {len(source_pages)}")
+        logger.info(f"      📤 Source pages found: {len(source_rows)}")
         
         # Filter target pages  
-        target_pages = self._filter_pages_by_criteria(
-            pages,
+        target_rows = index.filter_rows(
             types_filter=rule_config.get('target_types', []),
             categories_filter=rule_config.get('target_categories', [])
         )
-        logger.info(f"      📥 Target pages found: {len(target_pages)}")
+        if rule_config.get('target_urls'):
+            # Targets named by URL (menu or footer items), equal or contained
+            target_rows = np.intersect1d(target_rows, index.rows_matching_urls(rule_config['target_urls']))
+        logger.info(f"      📥 Target pages found: {len(target_rows)}")
+        
+        return source_rows, target_rows
+    
+    def _candidates_of_rule(self, 
+                            index: PageIndex,
+                            rule_index: int,
+                            rule_config: Dict) -> Tuple[np.ndarray, Any]:
+        """Source rows and candidate pool of a rule, built once per page index"""
+        cached = self._rule_candidates.get(rule_index)
+        if cached is None or cached[0] is not index or cached[1] is not rule_config:
+            source_rows, target_rows = self._rule_rows(index, rule_config)
+            cached = self._rule_candidates[rule_index] = (index, rule_config, source_rows, index.candidates(target_rows))
+        return cached[2], cached[3]
+    
+    def _apply_single_rule(self, 
+                          index: PageIndex, 
+                          existing_targets: Tuple[np.ndarray, np.ndarray],
+                          rule_config: Dict,
+                          rule_index: int = 0,
+                          partition: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply a single rule configuration.
+        
+        Returns the edge keys of the selected links in selection order, their
+        ranks, and a mask of the reverse links of bidirectional rules (each
+        right after its forward link). Links already present are not
+        filtered here. partition restricts the rule to a (start, stop)
+        slice of its source pages.
+        """
+        
+        source_rows, candidates = self._candidates_of_rule(index, rule_index, rule_config)
+        if partition is not None:
+            source_rows = source_rows[partition[0]:partition[1]]
         
         # Get selector
         selection_method = rule_config.get('selection_method', 'category')
         selector = self.selectors.get(selection_method, self.selectors['category'])
+        if isinstance(selector, PageRankSelector) and rule_config.get('pagerank_top_n'):
+            selector = PageRankSelector(
+                prefer_high_pagerank=selector.prefer_high_pagerank,
+                rng=self.rng,
+                top_n=rule_config['pagerank_top_n']
+            )
         
         # Configuration
         links_per_page = rule_config.get('links_per_page', 3)
         bidirectional = rule_config.get('bidirectional', False)
         avoid_self_links = rule_config.get('avoid_self_links', True)
         
-        new_links = []
+        page_ids = index.ids.tolist()
+        target_bounds, existing_target_rows = existing_targets
+        from_rows, to_rows, ranks = [], [], []
         
-        for source_page in source_pages:
-            source_id = self._get_page_id(source_page)
+        for source_row in source_rows.tolist():
+            if self.cancel_token is not None:
+                self.cancel_token.raise_if_stopped()
+            
+            source_id = page_ids[source_row]
             
-            # Filter out self-links if required
-            available_targets = target_pages
+            # Rows the selector must skip; the candidates are shared by all sources
+            excluded = set(existing_target_rows[target_bounds[source_row]:target_bounds[source_row + 1]].tolist())
             if avoid_self_links:
-                available_targets = [
-                    page for page in target_pages 
-                    if self._get_page_id(page) != source_id
-                ]
+                excluded.add(source_row)
+            
+            # Reseed per source page so its picks do not depend on how many
+            # random draws earlier pages consumed (i.e. on links_per_page)
+            if self.seed is not None:
+                self.rng.seed(f"{self.seed}:{rule_index}:{source_id}")
             
             # Use selector to choose targets
-            selected_targets = selector.select_targets(
-                source_page, available_targets, links_per_page
+            selected_rows = selector.select_targets(
+                index, source_row, candidates, links_per_page, excluded
             )
             
-            # Create links
-            for target_page in selected_targets:
-                target_id = self._get_page_id(target_page)
-                link = (source_id, target_id)
-                
-                if link not in existing_links_set:
-                    new_links.append(link)
-                    
-                    # Add bidirectional link if configured
-                    if bidirectional:
-                        reverse_link = (target_id, source_id)
-                        if reverse_link not in existing_links_set:
-                            new_links.append(reverse_link)
-        
-        return new_links
-    
-    def _filter_pages_by_criteria(self, 
-                                 pages: List[Any], 
-                                 types_filter: List[str], 
-                                 categories_filter: List[str]) -> List[Any]:
-        """Filter pages by type and category criteria"""
-        
-        filtered = pages
-        
-        # Filter by types if specified (case-insensitive)
-        if types_filter:
-            types_filter_lower = [t.lower() for t in types_filter]
-            filtered = [
-                page for page in filtered
-                if self._get_page_type(page).lower() in types_filter_lower
-            ]
-        
-        # Filter by categories if specified (case-insensitive)
-        if categories_filter:
-            categories_filter_lower = [c.lower() for c in categories_filter]
-            filtered = [
-                page for page in filtered
-                if self._get_page_category(page).lower() in categories_filter_lower
-            ]
-        
-        return filtered
-    
-    def _get_page_id(self, page: Any) -> int:
-        """Get page ID from page object"""
-        return getattr(page, 'id', None) or page.get('id')
-    
-    def _get_page_type(self, page: Any) -> str:
-        """Get page type from page object"""
-        return getattr(page, 'type', None) or page.get('type', '')
-    
-    def _get_page_category(self, page: Any) -> str:
-        """Get page category from page object"""
-        return getattr(page, 'category', None) or page.get('category', '')
+            from_rows.extend([source_row] * len(selected_rows))
+            to_rows.extend(selected_rows)
+            ranks.extend(range(len(selected_rows)))
+        
+        # Create links (forward, then its reverse if bidirectional)
+        from_ids = index.ids[np.asarray(from_rows, dtype=np.int64)]
+        to_ids = index.ids[np.asarray(to_rows, dtype=np.int64)]
+        ranks = np.asarray(ranks, dtype=np.int64)
+        if not bidirectional:
+            return encode_edges(from_ids, to_ids), ranks, np.zeros(len(ranks), dtype=bool)
+        
+        keys = np.empty(2 * len(ranks), dtype=np.int64)
+        keys[0::2] = encode_edges(from_ids, to_ids)
+        keys[1::2] = encode_edges(to_ids, from_ids)
+        is_reverse = np.zeros(len(keys), dtype=bool)
+        is_reverse[1::2] = True
+        return keys, np.repeat(ranks, 2), is_reverse
     
     def get_description(self) -> str:
         return f"Applique {len(self.rules_config)} règles de maillage cumulatives"
\ No newline at end of file
@@ -1,4 +1,6 @@
+import numpy as np
 from typing import List, Tuple, Any, Dict
+from app.core.edge_set import columns_to_links, links_to_columns
 from app.core.rules.base import BaseRule
 from app.core.rules.registry import register_rule
 
@@ -10,62 +12,36 @@ class FooterModificationRule(BaseRule):
                       pages: List[Any], 
                       existing_links: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """Generate new footer link structure"""
+        return columns_to_links(*self.generate_edges(pages, existing_links))
+    
+    def generate_edges(self, 
+                      pages: List[Any], 
+                      existing_links: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Footer links as edge arrays: one link from every source page to each target page"""
         
         # Get configuration
         action = self.config.source_filter.get('action', 'add')  # 'add' or 'remove'
         target_urls = self.config.source_filter.get('target_urls', [])
         source_page_types = self.config.source_filter.get('source_types', ['product', 'category'])
         
-        if not target_urls:
-            return []
-        
         # Find target pages by URL (support both full URLs and URL paths)
-        target_page_ids = []
-        for page in pages:
-            page_url = page.url if hasattr(page, 'url') else page.get('url', '')
-            
-            # Check for exact match or if any target URL is contained in the page URL
-            for target_url in target_urls:
-                if target_url == page_url or target_url in page_url:
-                    target_page_ids.append(page.id if hasattr(page, 'id') else page['id'])
-                    break  # Found a match, no need to check other target URLs
+        target_page_ids = self._find_pages_by_url(pages, target_urls)
         
-        if not target_page_ids:
-            return []
+        if action not in ('add', 'remove') or not target_page_ids:
+            return links_to_columns([])
         
         # Filter source pages (footer links are usually from content pages)
         # Support case-insensitive matching for page types
-        source_page_types_lower = [t.lower() for t in source_page_types]
-        source_pages = []
+        source_page_types_lower = {t.lower() for t in source_page_types}
+        source_page_ids = []
         for page in pages:
             page_type = page.type if hasattr(page, 'type') else page.get('type', 'other')
             if page_type.lower() in source_page_types_lower:
-                source_pages.append(page)
-        
-        new_links = []
-        
-        if action == 'add':
-            # Add footer links: selected page types link to target pages
-            for page in source_pages:
-                source_id = page.id if hasattr(page, 'id') else page['id']
-                
-                for target_id in target_page_ids:
-                    # Don't link to self
-                    if source_id != target_id:
-                        link = (source_id, target_id)
-                        new_links.append(link)
-                        
-        elif action == 'remove':
-            # Remove footer links
-            for page in source_pages:
-                source_id = page.id if hasattr(page, 'id') else page['id']
-                
-                for target_id in target_page_ids:
-                    if source_id != target_id:
-                        link = (source_id, target_id)
-                        new_links.append(link)
+                source_page_ids.append(page.id if hasattr(page, 'id') else page['id'])
         
-        return new_links
+        # Selected page types link to the target pages, except to themselves.
+        # With action 'remove' the same links are the ones to remove
+        return self._cross_edges(source_page_ids, target_page_ids)
     
     def get_description(self) -> str:
         action = self.config.source_filter.get('action', 'add')
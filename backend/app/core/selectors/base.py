@@ -1,18 +1,55 @@
+import random
+from itertools import islice
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import Any, Container, Iterator, List, Sequence
+from app.core.page_index import CandidatePool, PageIndex
 
 class BaseSelector(ABC):
     """Base class for target page selection strategies"""
     
+    def __init__(self, rng: random.Random = None):
+        # Seeded generator so that a simulation seed reproduces the same links
+        self.rng = rng or random.Random()
+    
+    def sample(self, population: Sequence[Any], k: int, excluded: Container[Any] = frozenset()) -> List[Any]:
+        """
+        Draw k distinct items with a lazy Fisher-Yates shuffle.
+        
+        Unlike random.sample, the first j picks do not depend on k, so a
+        larger k extends a smaller one under the same generator state.
+        Excluded items are rejected as they are drawn, so the population
+        is shared between sources instead of being filtered for each one.
+        """
+        return list(islice(self.shuffled(population, excluded), k))
+    
+    def shuffled(self, population: Sequence[Any], excluded: Container[Any] = frozenset()) -> Iterator[Any]:
+        """Items of the population in random order, drawn one at a time (see sample)"""
+        n = len(population)
+        swaps = {}
+        for i in range(n):
+            j = i + self.rng.randrange(n - i)
+            item = population[swaps.get(j, j)]
+            swaps[j] = swaps.get(i, i)
+            if item not in excluded:
+                yield item
+    
     @abstractmethod
     def select_targets(self, 
-                      source_page: Any, 
-                      candidate_pages: List[Any], 
-                      max_targets: int) -> List[Any]:
-        """Select target pages for linking from the source page"""
+                      index: PageIndex,
+                      source_row: int, 
+                      candidates: CandidatePool, 
+                      max_targets: int,
+                      excluded: Container[int] = frozenset()) -> List[int]:
+        """
+        Select target rows of the page index for linking from the source row, best first.
+        
+        candidates is shared by every source of a rule and must not be
+        modified; rows in excluded (the source itself, its existing link
+        targets) are skipped during the selection.
+        """
         pass
     
     @abstractmethod
     def get_description(self) -> str:
         """Return description of this selection method"""
-        pass
\ No newline at end of file
+        pass
@@ -1,29 +1,25 @@
-import random
-from typing import List, Any
+from typing import Container, List
+from app.core.page_index import CandidatePool, PageIndex
 from .base import BaseSelector
 
 class CategorySelector(BaseSelector):
     """Select pages from the same category"""
     
     def select_targets(self, 
-                      source_page: Any, 
-                      candidate_pages: List[Any], 
-                      max_targets: int) -> List[Any]:
+                      index: PageIndex,
+                      source_row: int, 
+                      candidates: CandidatePool, 
+                      max_targets: int,
+                      excluded: Container[int] = frozenset()) -> List[int]:
         """Select pages from the same category as source page"""
         
-        source_category = getattr(source_page, 'category', None) or getattr(source_page, 'get', lambda x: None)('category')
-        
-        # Filter candidates to same category
-        same_category_pages = [
-            page for page in candidate_pages 
-            if (getattr(page, 'category', None) or getattr(page, 'get', lambda x: None)('category')) == source_category
-        ]
+        # Bucket of the source category, built once per rule
+        same_category_rows = candidates.same_category(source_row)
         
         # Randomly select up to max_targets
-        if len(same_category_pages) <= max_targets:
-            return same_category_pages
-        else:
-            return random.sample(same_category_pages, max_targets)
+        # Always sample so the selection order is random: the first k of a
+        # selection are then a valid selection of size k
+        return self.sample(same_category_rows, max_targets, excluded)
     
     def get_description(self) -> str:
-        return "Sélectionne des pages de la même catégorie"
\ No newline at end of file
+        return "Sélectionne des pages de la même catégorie"
@@ -1,27 +1,45 @@
-from typing import List, Any
+from typing import Container, List, Optional
+from app.core.page_index import CandidatePool, PageIndex
 from .base import BaseSelector
 
 class PageRankSelector(BaseSelector):
     """Select pages based on their current PageRank"""
     
-    def __init__(self, prefer_high_pagerank: bool = True):
+    def __init__(self, prefer_high_pagerank: bool = True, rng=None, top_n: Optional[int] = None):
+        super().__init__(rng)
         self.prefer_high_pagerank = prefer_high_pagerank
+        # When set, targets are drawn among the top_n pages instead of always
+        # being the first ones, so that sources do not all link to the same pages
+        self.top_n = top_n
     
     def select_targets(self, 
-                      source_page: Any, 
-                      candidate_pages: List[Any], 
-                      max_targets: int) -> List[Any]:
+                      index: PageIndex,
+                      source_row: int, 
+                      candidates: CandidatePool, 
+                      max_targets: int,
+                      excluded: Container[int] = frozenset()) -> List[int]:
         """Select pages based on their current PageRank"""
         
-        # Sort by PageRank
-        sorted_pages = sorted(
-            candidate_pages,
-            key=lambda page: getattr(page, 'current_pagerank', 0) or getattr(page, 'get', lambda x: 0)('current_pagerank', 0),
-            reverse=self.prefer_high_pagerank
-        )
+        # Sorted once per rule, shared by every source
+        ordered_rows = candidates.pagerank_order(descending=self.prefer_high_pagerank)
         
-        return sorted_pages[:max_targets]
+        targets = []
+        start = 0
+        if self.top_n:
+            # Every top_n page comes first (in random order) even when
+            # max_targets exceeds top_n, so the first k picks do not depend on max_targets
+            targets = [int(row) for row in self.sample(ordered_rows[:self.top_n], max_targets, excluded)]
+            start = self.top_n
+        
+        # Take the next best pages, skipping excluded ones
+        for row in ordered_rows[start:]:
+            if len(targets) >= max_targets:
+                break
+            if row not in excluded:
+                targets.append(int(row))
+        
+        return targets
     
     def get_description(self) -> str:
         direction = "fort" if self.prefer_high_pagerank else "faible"
-        return f"Sélectionne des pages avec PageRank {direction}"
\ No newline at end of file
+        return f"Sélectionne des pages avec PageRank {direction}"
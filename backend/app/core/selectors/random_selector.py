@@ -1,20 +1,21 @@
-import random
-from typing import List, Any
+from typing import Container, List
+from app.core.page_index import CandidatePool, PageIndex
 from .base import BaseSelector
 
 class RandomSelector(BaseSelector):
     """Select pages randomly"""
     
     def select_targets(self, 
-                      source_page: Any, 
-                      candidate_pages: List[Any], 
-                      max_targets: int) -> List[Any]:
+                      index: PageIndex,
+                      source_row: int, 
+                      candidates: CandidatePool, 
+                      max_targets: int,
+                      excluded: Container[int] = frozenset()) -> List[int]:
         """Select pages randomly from all candidates"""
         
-        if len(candidate_pages) <= max_targets:
-            return candidate_pages
-        else:
-            return random.sample(candidate_pages, max_targets)
+        # Always sample so the selection order is random: the first k of a
+        # selection are then a valid selection of size k
+        return self.sample(candidates.rows, max_targets, excluded)
     
     def get_description(self) -> str:
-        return "Sélectionne des pages aléatoirement"
\ No newline at end of file
+        return "Sélectionne des pages aléatoirement"
@@ -1,43 +1,49 @@
-import random
-from typing import List, Any
+from typing import Container, List
+from app.core.page_index import CandidatePool, PageIndex
 from .base import BaseSelector
 
 class SemanticSelector(BaseSelector):
-    """Select pages based on semantic similarity (placeholder implementation)"""
+    """Select the pages whose embeddings are closest to the source page"""
     
     def select_targets(self, 
-                      source_page: Any, 
-                      candidate_pages: List[Any], 
-                      max_targets: int) -> List[Any]:
+                      index: PageIndex,
+                      source_row: int, 
+                      candidates: CandidatePool, 
+                      max_targets: int,
+                      excluded: Container[int] = frozenset()) -> List[int]:
         """Select pages based on semantic similarity"""
         
-        # TODO: Implement real semantic similarity
-        # For now, fall back to category-based selection with some randomness
-        source_category = getattr(source_page, 'category', None) or getattr(source_page, 'get', lambda x: None)('category')
+        if index.semantic is not None and index.semantic_rows[source_row] >= 0:
+            # Nearest neighbours among the candidates that have an embedding
+            candidate_mask, candidate_rows = candidates.semantic_candidates()
+            rows_of_semantic = index.rows_of_semantic
+            neighbours = index.semantic.search(
+                int(index.semantic_rows[source_row]), max_targets,
+                candidate_mask, candidate_rows,
+                accept=lambda semantic_row: int(rows_of_semantic[semantic_row]) not in excluded
+            )
+            return [int(rows_of_semantic[semantic_row]) for semantic_row in neighbours]
         
+        # Without embeddings, fall back to category-based selection with some randomness
         # Prefer same category but also include some random ones
-        same_category_pages = [
-            page for page in candidate_pages 
-            if (getattr(page, 'category', None) or getattr(page, 'get', lambda x: None)('category')) == source_category
-        ]
+        same_category_rows = candidates.same_category(source_row)
+        other_rows = candidates.other_categories(source_row)
         
-        other_pages = [
-            page for page in candidate_pages 
-            if (getattr(page, 'category', None) or getattr(page, 'get', lambda x: None)('category')) != source_category
-        ]
-        
-        # Mix: 70% same category, 30% others
+        # Mix: 70% same category, 30% others, interleaved in a fixed order so
+        # that the first k picks hold int(0.7 * k) same-category pages for any k
+        same_category = self.shuffled(same_category_rows, excluded)
+        others = self.shuffled(other_rows, excluded)
         targets = []
-        same_cat_count = min(len(same_category_pages), int(max_targets * 0.7))
-        other_count = min(len(other_pages), max_targets - same_cat_count)
-        
-        if same_cat_count > 0:
-            targets.extend(random.sample(same_category_pages, same_cat_count))
-        
-        if other_count > 0:
-            targets.extend(random.sample(other_pages, other_count))
+        for i in range(max_targets):
+            preferred, fallback = (same_category, others) if (7 * (i + 1)) // 10 > (7 * i) // 10 else (others, same_category)
+            row = next(preferred, None)
+            if row is None:
+                row = next(fallback, None)
+            if row is None:
+                break
+            targets.append(row)
         
         return targets
     
     def get_description(self) -> str:
-        return "Sélectionne des pages par proximité sémantique (mix catégorie + aléatoire)"
\ No newline at end of file
+        return "Sélectionne les pages les plus proches sémantiquement (embeddings, sinon mix catégorie + aléatoire)"
\ No newline at end of file
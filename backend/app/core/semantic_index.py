@@ -0,0 +1,216 @@
+import hashlib
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.result_arrays import PAGE_ID_DTYPE, encode_array, decode_array
+
+# Vectors are stored as float16 (half the size, enough for cosine ranking)
+VECTOR_DTYPE = np.float16
+LIST_DTYPE = np.int32
+
+# Rows scored per matmul block in exact search and list assignment
+BLOCK_ROWS = 8192
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length rows (zero rows stay zero) so that a dot product is a cosine"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def embeddings_fingerprint(content_hashes: Iterable[Tuple[int, str]]) -> str:
+    """Identity of a set of page embeddings: the pages and the hash of their content"""
+    material = "\n".join(f"{page_id}:{content_hash}" for page_id, content_hash in sorted(content_hashes))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (highest cosine) of every vector, by blocks"""
+    assignments = np.empty(len(vectors), dtype=LIST_DTYPE)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = vectors[start:start + BLOCK_ROWS]
+        assignments[start:start + BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(vectors: np.ndarray,
+                     n_lists: int,
+                     iterations: int = 10,
+                     sample_size: int = 50000,
+                     seed: int = 0) -> np.ndarray:
+    """Unit centroids of n_lists clusters, trained on a sample of the vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = ~sums.any(axis=1)
+        # Empty clusters keep their previous centroid
+        sums[empty] = centroids[empty]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class SemanticIndex:
+    """
+    Nearest-neighbour index over normalized page embeddings.
+
+    Small sets are searched exactly with blocked matrix products. Above
+    ivf_min_pages, vectors are grouped into inverted lists around
+    spherical k-means centroids (IVF): a query scores the centroids, then
+    only the vectors of the closest lists, widening the probe until
+    enough accepted neighbours are found. Rows are stored list by list,
+    so a list is a contiguous slice scored without gathering vectors.
+    """
+
+    def __init__(self,
+                 page_ids: np.ndarray,
+                 vectors: np.ndarray,
+                 centroids: Optional[np.ndarray] = None,
+                 list_bounds: Optional[np.ndarray] = None,
+                 fingerprint: str = "",
+                 n_probe: int = 8):
+        self.page_ids = np.asarray(page_ids, dtype=PAGE_ID_DTYPE)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.centroids = centroids
+        self.list_bounds = list_bounds
+        self.fingerprint = fingerprint
+        self.n_probe = n_probe
+
+    @classmethod
+    def build(cls,
+              page_ids,
+              vectors,
+              fingerprint: str = "",
+              ivf_min_pages: int = 20000,
+              n_probe: int = 8,
+              seed: int = 0) -> "SemanticIndex":
+        vectors = normalize_rows(vectors)
+        if len(vectors) < ivf_min_pages:
+            return cls(page_ids, vectors, fingerprint=fingerprint, n_probe=n_probe)
+
+        # About sqrt(n) lists keeps both the centroid scan and the lists short
+        n_lists = max(1, int(np.sqrt(len(vectors))))
+        centroids = spherical_kmeans(vectors, n_lists, seed=seed)
+        assignments = _assign(vectors, centroids)
+        order = np.argsort(assignments, kind='stable')
+        list_bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1)).astype(LIST_DTYPE)
+        return cls(np.asarray(page_ids)[order], vectors[order], centroids, list_bounds, fingerprint, n_probe)
+
+    @property
+    def n_pages(self) -> int:
+        return len(self.page_ids)
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.centroids is not None
+
+    def search(self,
+               query_row: int,
+               k: int,
+               candidate_mask: np.ndarray,
+               candidate_rows: np.ndarray,
+               accept: Callable[[int], bool] = lambda row: True) -> List[int]:
+        """
+        Rows of the k vectors most similar to the query row, best first.
+
+        candidate_mask (boolean, over the rows of the index) and
+        candidate_rows describe the same candidates, computed once per
+        rule; accept filters rows further (e.g. rows already linked).
+        """
+        if k <= 0:
+            return []
+        query = self.vectors[query_row]
+
+        if not self.is_ivf:
+            return self._best(candidate_rows, query, k, accept)
+
+        list_order = np.argsort(-(self.centroids @ query), kind='stable')
+        found_rows = np.empty(0, dtype=np.int64)
+        found_scores = np.empty(0, dtype=np.float32)
+        found: List[int] = []
+        probed = 0
+        n_probe = self.n_probe
+        while len(found) < k and probed < len(list_order):
+            lists = list_order[probed:probed + n_probe]
+            probed += len(lists)
+            # Score the probed lists (contiguous slices), keep their candidates
+            rows = np.concatenate([found_rows] + [
+                np.arange(self.list_bounds[l], self.list_bounds[l + 1]) for l in lists
+            ])
+            scores = np.concatenate([found_scores] + [
+                self.vectors[self.list_bounds[l]:self.list_bounds[l + 1]] @ query for l in lists
+            ])
+            keep = candidate_mask[rows]
+            found_rows, found_scores = rows[keep], scores[keep]
+            # Neighbours of the lists probed so far; widen the probe when short
+            found = self._top(found_rows, found_scores, k, accept)
+            n_probe *= 2
+        return found
+
+    def _best(self, rows: np.ndarray, query: np.ndarray, k: int, accept: Callable[[int], bool]) -> List[int]:
+        if len(rows) == 0:
+            return []
+        scores = np.concatenate([
+            self.vectors[rows[start:start + BLOCK_ROWS]] @ query
+            for start in range(0, len(rows), BLOCK_ROWS)
+        ])
+        return self._top(rows, scores, k, accept)
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, k: int, accept: Callable[[int], bool]) -> List[int]:
+        if len(rows) == 0:
+            return []
+
+        # Sort a shortlist first; rejected rows (already linked, self) are
+        # few, so the full sort is only needed when they fill the shortlist
+        shortlist = k + 32
+        if shortlist < len(rows):
+            top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            best = self._accepted(rows[top], scores[top], k, accept)
+            if len(best) == k:
+                return best
+        return self._accepted(rows, scores, k, accept)
+
+    @staticmethod
+    def _accepted(rows: np.ndarray, scores: np.ndarray, k: int, accept: Callable[[int], bool]) -> List[int]:
+        """First k accepted rows by decreasing score (ties by row)"""
+        best = []
+        for row in rows[np.lexsort((rows, -scores))].tolist():
+            if accept(row):
+                best.append(row)
+                if len(best) == k:
+                    break
+        return best
+
+    def to_record(self) -> Dict:
+        """Compressed columns for storage"""
+        return {
+            "fingerprint": self.fingerprint,
+            "n_pages": self.n_pages,
+            "dimension": self.vectors.shape[1] if self.vectors.ndim == 2 else 0,
+            "page_ids": encode_array(self.page_ids, PAGE_ID_DTYPE),
+            "vectors": encode_array(self.vectors.ravel(), VECTOR_DTYPE),
+            "centroids": encode_array(self.centroids.ravel(), VECTOR_DTYPE) if self.is_ivf else None,
+            "list_bounds": encode_array(self.list_bounds, LIST_DTYPE) if self.is_ivf else None
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict, n_probe: int = 8) -> "SemanticIndex":
+        dimension = record["dimension"]
+        centroids = None
+        if record.get("centroids") is not None:
+            # Centroids are renormalized after the float16 round trip
+            centroids = normalize_rows(decode_array(record["centroids"], VECTOR_DTYPE).reshape(-1, dimension))
+        return cls(
+            decode_array(record["page_ids"], PAGE_ID_DTYPE),
+            decode_array(record["vectors"], VECTOR_DTYPE).reshape(-1, dimension).astype(np.float32),
+            centroids,
+            decode_array(record["list_bounds"], LIST_DTYPE) if record.get("list_bounds") is not None else None,
+            record["fingerprint"],
+            n_probe
+        )
@@ -0,0 +1,93 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Bumped when link generation or solving changes in a way that makes stored results stale
+CACHE_FORMAT_VERSION = 2
+
+
+def _canonical_rule(rule: Dict) -> Dict:
+    """
+    Rule with its type/category filters in a fixed order (they are used as
+    sets). Unset optional settings are dropped so that adding one does not
+    change the key of earlier requests.
+    """
+    return {
+        key: sorted(value) if isinstance(value, list) else value
+        for key, value in rule.items()
+        if value is not None
+    }
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def canonical_payload(rules_config: List[Dict],
+                      page_boosts: List[Dict] = None,
+                      protected_pages: List[Dict] = None) -> Dict:
+    """
+    Simulation inputs that determine its results, in canonical form.
+
+    Rules are applied cumulatively so their order is kept; boosts and
+    protections are keyed by URL so they are sorted.
+    """
+    return {
+        "rules": [_canonical_rule(rule) for rule in rules_config],
+        "page_boosts": sorted((page_boosts or []), key=_canonical_json),
+        "protected_pages": sorted((protected_pages or []), key=_canonical_json)
+    }
+
+
+def payload_seed(payload: Dict) -> int:
+    """Default seed derived from the payload, so that identical requests generate identical links"""
+    digest = hashlib.sha256(_canonical_json(payload).encode()).digest()
+    return int.from_bytes(digest[:4], "big") & 0x7FFFFFFF
+
+
+def simulation_cache_key(project_id: int,
+                         links_version: int,
+                         payload: Dict,
+                         seed: int,
+                         pages_version: int = 0,
+                         embeddings_fingerprint: Optional[str] = None) -> str:
+    """
+    Content address of a simulation run: same key, same results.
+
+    The graph enters through the project's links and pages versions (page
+    types, categories and baseline PageRank feed the rules and the deltas);
+    semantic rules also depend on the embeddings, named by their fingerprint.
+    """
+    material = {
+        "format": CACHE_FORMAT_VERSION,
+        "project_id": project_id,
+        "links_version": links_version or 0,
+        "pages_version": pages_version or 0,
+        "embeddings": embeddings_fingerprint,
+        "seed": seed,
+        "payload": payload,
+        "solver": {
+            "damping": settings.PAGERANK_DAMPING,
+            "max_iter": settings.PAGERANK_MAX_ITER,
+            "tolerance": settings.PAGERANK_TOLERANCE,
+            "semantic_weights": settings.USE_SEMANTIC_WEIGHTS
+        }
+    }
+    return hashlib.sha256(_canonical_json(material).encode()).hexdigest()
+
+
+def resolve_seed_and_key(project: Any,
+                         rules_config: List[Dict],
+                         page_boosts: List[Dict] = None,
+                         protected_pages: List[Dict] = None,
+                         seed: Optional[int] = None,
+                         embeddings_fingerprint: Optional[str] = None) -> Tuple[int, str]:
+    """Seed to run with (payload-derived when not given) and the run's cache key"""
+    payload = canonical_payload(rules_config, page_boosts, protected_pages)
+    if seed is None:
+        seed = payload_seed(payload)
+    return seed, simulation_cache_key(project.id, project.links_version, payload, seed,
+                                      pages_version=project.pages_version,
+                                      embeddings_fingerprint=embeddings_fingerprint)
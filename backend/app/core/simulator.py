@@ -1,9 +1,24 @@
 from typing import Dict, List, Tuple, Any
+import asyncio
+import numpy as np
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
 from app.core.pagerank.calculator import PageRankCalculator
 from app.core.pagerank.advanced_impl import AdvancedPageRankCalculator
+from app.core.pagerank.graph import compile_graph
+from app.core.pagerank.depth import find_root_index, compute_click_depth, summarize_depth_change
 from app.core.rules.engine import RuleEngine
-from app.core.rules.multi_rule import MultiRule
+from app.core.rules.multi_rule import MultiRule, init_link_worker, generate_links_in_worker, select_partition_in_worker
+from app.core.page_index import PageIndex
+from app.core.edge_set import EdgeSet, columns_to_links, links_to_columns
+from app.core.url_matcher import get_url_matcher
+from app.core.cancellation import CancellationToken, SimulationCancelled, cancellation_registry
+from app.core.progress import ProgressReporter, progress_broker, simulation_channel
+from app.core.result_arrays import ResultArrays, encode_cursor, decode_cursor
+from app.core.result_summary import summarize_deltas, summarize_groups
+from app.core.comparison import compare_results
+from app.core.simulation_cache import canonical_payload, payload_seed
 from app.repositories.base import PageRepository, LinkRepository, SimulationRepository
 from app.services.semantic_service import SemanticService
 from app.core.config import settings
@@ -23,6 +38,7 @@ class PageRankSimulator:
         self.simulation_repo = simulation_repo
         self.pagerank_calculator = pagerank_calculator
         self.rule_engine = RuleEngine()
+        self.last_solver_stats: Dict = {}
     
     async def run_simulation(self, 
                            project_id: int, 
@@ -55,34 +71,34 @@ class PageRankSimulator:
             # Calculate current PageRank if not already calculated
             await self._ensure_current_pagerank(pages, existing_links)
             
-            # Apply rule to generate new links
+            # Apply rule to generate new links, as edge arrays (bulk rules such
+            # as menus emit one link per page and target)
             rule = self.rule_engine.create_rule(rule_name, rule_config)
-            new_links = self.rule_engine.apply_rule(rule, pages, existing_links)
+            new_from, new_to = rule.generate_edges(pages, existing_links)
+            existing_from, existing_to = links_to_columns(existing_links)
+            existing_set = EdgeSet.from_arrays(existing_from, existing_to)
             
             # Handle link removal for menu/footer modifications
             if hasattr(rule, 'is_removal_rule') and rule.is_removal_rule():
                 # Remove specified links instead of adding them
-                links_to_remove = set(new_links)
-                all_links = [link for link in existing_links if link not in links_to_remove]
-                new_links = []  # No new links, only removals
+                kept = ~EdgeSet.from_arrays(new_from, new_to).contains(existing_from, existing_to)
+                all_from, all_to = existing_from[kept], existing_to[kept]
+                new_from, new_to = new_from[:0], new_to[:0]  # No new links, only removals
             else:
                 # Normal behavior: add new links
-                all_links = existing_links + new_links
-            
-            # Create link weights based on position
-            position_weights = {}
-            if hasattr(rule, 'get_link_weight_multiplier'):
-                position_weight = rule.get_link_weight_multiplier()
-                # Apply position weight to new links only
-                for link in new_links:
-                    position_weights[link] = position_weight
-                # Existing links keep default weight of 1.0
-                for link in existing_links:
-                    position_weights[link] = 1.0
-            else:
-                # Default position weights for all links
-                for link in all_links:
-                    position_weights[link] = 1.0
+                all_from = np.concatenate((existing_from, new_from))
+                all_to = np.concatenate((existing_to, new_to))
+            all_links = np.column_stack((all_from, all_to))
+            new_links = np.column_stack((new_from, new_to))
+            
+            # Link weights based on position, aligned with all_links: new links
+            # take the rule's weight, existing links (and new links that
+            # duplicate them) keep the default weight of 1.0
+            position_weights = np.ones(len(all_links))
+            if len(new_links) and hasattr(rule, 'get_link_weight_multiplier'):
+                position_weights[len(all_links) - len(new_links):] = np.where(
+                    existing_set.contains(new_from, new_to), 1.0, rule.get_link_weight_multiplier()
+                )
             
             # Apply semantic analysis by default (realistic PageRank)
             final_weights = position_weights
@@ -90,6 +106,8 @@ class PageRankSimulator:
                 logger.info("Calculating semantic weights for realistic PageRank simulation...")
                 semantic_service = SemanticService(self.page_repo)
                 
+                # Semantic weights are looked up per (from, to) link
+                all_links = columns_to_links(all_from, all_to)
                 similarity_threshold = rule_config.get('semantic_threshold', 0.4)
                 semantic_weights = await semantic_service.calculate_semantic_weights(
                     pages, all_links, similarity_threshold
@@ -97,7 +115,7 @@ class PageRankSimulator:
                 
                 # Combine position and semantic weights (50/50) - Default Google-like behavior
                 final_weights = semantic_service.combine_weights(
-                    position_weights, semantic_weights
+                    dict(zip(all_links, position_weights.tolist())), semantic_weights
                 )
                 logger.info(f"Applied semantic relevance to {len([w for w in semantic_weights.values() if w > 0])} relevant links")
             else:
@@ -111,27 +129,20 @@ class PageRankSimulator:
                 link_weights=final_weights
             )
             
-            # Prepare results
-            results = []
-            for page in pages:
-                page_id = page.id
-                current_pr = page.current_pagerank
-                new_pr = new_pagerank.get(page_id, current_pr)
-                delta = new_pr - current_pr
-                
-                results.append({
-                    "page_id": page_id,
-                    "new_pagerank": new_pr,
-                    "pagerank_delta": delta
-                })
+            # Prepare results as aligned vectors
+            page_ids, current_vector = self._page_vectors(pages)
+            new_vector = self._align_pagerank(new_pagerank, page_ids, current_vector)
             
             # Save results
-            await self.simulation_repo.save_results(simulation.id, results)
+            await self.simulation_repo.save_result_arrays(
+                simulation.id, ResultArrays.build(page_ids, new_vector, new_vector - current_vector)
+            )
+            await self.simulation_repo.save_links(simulation.id, new_links)
             await self.simulation_repo.update_status(simulation.id, "completed")
             
             # Prepare summary
             summary = self._create_simulation_summary(
-                pages, results, new_links, rule.get_description()
+                pages, current_vector, new_vector, new_links, rule.get_description()
             )
             
             return {
@@ -150,43 +161,95 @@ class PageRankSimulator:
         needs_calculation = any(page.current_pagerank == 0.0 for page in pages)
         
         if needs_calculation:
+            start_time = time.time()
             current_pagerank = await self.pagerank_calculator.calculate(
                 pages, links,
                 damping=settings.PAGERANK_DAMPING,
                 max_iter=settings.PAGERANK_MAX_ITER,
                 tolerance=settings.PAGERANK_TOLERANCE
             )
+            calculation_time = time.time() - start_time
             
-            # Update pages with calculated PageRank
+            # Update pages with calculated PageRank, persisted in one transaction
+            updates = []
             for page in pages:
                 if page.current_pagerank == 0.0:
                     new_pr = current_pagerank.get(page.id, 1.0 / len(pages))
-                    await self.page_repo.update_pagerank(page.id, new_pr)
+                    updates.append({'page_id': page.id, 'pagerank': new_pr})
                     page.current_pagerank = new_pr
+            
+            persist_start = time.time()
+            # Missing baselines are a function of the links: cached results stay valid
+            await self.page_repo.bulk_update_pagerank(updates, bump_version=False)
+            logger.info(f"📈 Baseline PageRank for {len(updates)} pages: "
+                        f"computed in {calculation_time:.2f}s, saved in {time.time() - persist_start:.2f}s")
+    
+    async def _ensure_click_depth(self, pages: List[Any], depths) -> None:
+        """Persist baseline click depths for pages whose stored value is stale"""
+        updates = []
+        for idx, page in enumerate(pages):
+            depth = int(depths[idx])
+            if page.click_depth != depth:
+                updates.append({'page_id': page.id, 'click_depth': depth})
+                page.click_depth = depth
+        
+        if updates:
+            logger.info(f"📏 Updating baseline click depth for {len(updates)} pages")
+            await self.page_repo.bulk_update_click_depth(updates)
     
     def _create_simulation_summary(self, 
                                   pages: List[Any], 
-                                  results: List[Dict],
+                                  current_vector: np.ndarray,
+                                  new_vector: np.ndarray,
                                   new_links: List[Tuple[int, int]],
-                                  rule_description: str) -> Dict:
-        """Create a summary of simulation results"""
-        
-        deltas = [r["pagerank_delta"] for r in results]
-        positive_changes = [d for d in deltas if d > 0]
-        negative_changes = [d for d in deltas if d < 0]
+                                  rule_description: str,
+                                  depth_summary: Dict = None,
+                                  by_group: bool = True,
+                                  removed_links: int = 0) -> Dict:
+        """Create a summary of simulation results from the aligned PageRank vectors"""
         
-        return {
+        summary = {
             "rule_description": rule_description,
             "total_pages": len(pages),
             "new_links_added": len(new_links),
-            "pages_with_positive_change": len(positive_changes),
-            "pages_with_negative_change": len(negative_changes),
-            "pages_unchanged": len(deltas) - len(positive_changes) - len(negative_changes),
-            "average_delta": sum(deltas) / len(deltas) if deltas else 0,
-            "max_positive_delta": max(positive_changes) if positive_changes else 0,
-            "max_negative_delta": min(negative_changes) if negative_changes else 0,
-            "total_pagerank_redistribution": sum(abs(d) for d in deltas)
+            "links_removed": removed_links,
+            **summarize_deltas(current_vector, new_vector)
         }
+        
+        if by_group:
+            summary["by_type"] = summarize_groups(
+                [page.type for page in pages], current_vector, new_vector, default_label="other"
+            )
+            summary["by_category"] = summarize_groups(
+                [page.category for page in pages], current_vector, new_vector
+            )
+        
+        if depth_summary:
+            summary.update(depth_summary)
+        
+        return summary
+    
+    @staticmethod
+    def _page_vectors(pages: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Page ids and current PageRank as aligned vectors"""
+        page_ids = np.fromiter((page.id for page in pages), dtype=np.int64, count=len(pages))
+        current = np.fromiter((page.current_pagerank for page in pages), dtype=np.float64, count=len(pages))
+        return page_ids, current
+    
+    @staticmethod
+    def _align_pagerank(pagerank: Dict[int, float], page_ids: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """Solver output aligned on page_ids (pages it did not score keep their current value)"""
+        return np.fromiter(
+            (pagerank.get(page_id, current_pr) for page_id, current_pr in zip(page_ids.tolist(), current.tolist())),
+            dtype=np.float64, count=len(page_ids)
+        )
+    
+    @staticmethod
+    def _click_depth_delta(current_depth, new_depth):
+        """Depth change, None when either side is unknown or unreachable"""
+        if current_depth is None or new_depth is None or current_depth < 0 or new_depth < 0:
+            return None
+        return new_depth - current_depth
     
     async def get_simulation_results(self, simulation_id: int) -> Dict:
         """Get detailed results for a simulation"""
@@ -199,20 +262,14 @@ class PageRankSimulator:
         page_lookup = {page.id: page for page in pages}
         
         # Format results with page details
+        arrays = await self.simulation_repo.get_result_arrays(simulation_id)
         detailed_results = []
-        for result in simulation.results:
-            page = page_lookup.get(result.page_id)
+        page_ids = arrays.page_ids.tolist() if arrays is not None else []
+        percent_changes = arrays.percent_change() if arrays is not None else None
+        for row, page_id in enumerate(page_ids):
+            page = page_lookup.get(page_id)
             if page:
-                detailed_results.append({
-                    "page_id": result.page_id,
-                    "url": page.url,
-                    "type": page.type,
-                    "category": page.category,
-                    "current_pagerank": page.current_pagerank,
-                    "new_pagerank": result.new_pagerank,
-                    "pagerank_delta": result.pagerank_delta,
-                    "percent_change": (result.pagerank_delta / page.current_pagerank * 100) if page.current_pagerank > 0 else 0
-                })
+                detailed_results.append(self._result_row(page, arrays, row, percent_changes[row]))
         
         # Convert old format rules_config to new format if needed
         rules_data = simulation.rules_config
@@ -236,13 +293,13 @@ class PageRankSimulator:
         else:
             # Fallback for unknown format
             rules = []
-
+        
         # Handle page_boosts (ensure it exists and is valid)
         page_boosts = getattr(simulation, 'page_boosts', []) or []
         
         # Handle protected_pages (ensure it exists and is valid)
         protected_pages = getattr(simulation, 'protected_pages', []) or []
-
+        
         return {
             "simulation": {
                 "id": simulation.id,
@@ -252,28 +309,200 @@ class PageRankSimulator:
                 "rules": rules,
                 "page_boosts": page_boosts,
                 "protected_pages": protected_pages,
+                "solver_stats": getattr(simulation, 'solver_stats', None),
+                "seed": getattr(simulation, 'seed', None),
+                "cache_source_id": getattr(simulation, 'cache_source_id', None),
                 "created_at": simulation.created_at
             },
             "results": detailed_results
         }
     
+    async def get_results_page(self,
+                               simulation_id: int,
+                               sort_by: str = "pagerank_delta",
+                               descending: bool = True,
+                               limit: int = 100,
+                               page_type: str = None,
+                               category: str = None,
+                               url_contains: str = None,
+                               cursor: str = None) -> Dict:
+        """
+        One page of a simulation's results, sorted and filtered.
+        
+        Sorting and cursor paging run on the result arrays; filters are
+        resolved to page ids by an indexed query, and only the returned
+        pages are loaded.
+        """
+        simulation = await self.simulation_repo.get_by_id(simulation_id)
+        if not simulation:
+            raise LookupError("Simulation not found")
+        
+        empty = {"simulation_id": simulation_id, "sort_by": sort_by,
+                 "order": "desc" if descending else "asc", "total": 0,
+                 "results": [], "next_cursor": None}
+        arrays = await self.simulation_repo.get_result_arrays(simulation_id)
+        if arrays is None:
+            return empty
+        
+        values = arrays.sort_values(sort_by)
+        after = decode_cursor(cursor, sort_by, descending) if cursor else None
+        
+        mask = None
+        if page_type is not None or category is not None or url_contains:
+            matching_ids = await self.page_repo.get_ids_matching(
+                simulation.project_id, page_type=page_type, category=category, url_contains=url_contains
+            )
+            mask = np.isin(arrays.page_ids, np.asarray(matching_ids, dtype=arrays.page_ids.dtype))
+        total = int(mask.sum()) if mask is not None else arrays.n_pages
+        
+        rows = arrays.page_rows(values, limit, descending, mask=mask, after=after)
+        page_lookup = {page.id: page for page in await self.page_repo.get_by_ids(arrays.page_ids[rows].tolist())}
+        
+        # Reported from the same arrays as the sort key, so rows and cursors agree
+        percent_changes = values if sort_by == "percent_change" else arrays.percent_change()
+        results = []
+        for row in rows.tolist():
+            page = page_lookup.get(int(arrays.page_ids[row]))
+            if page is not None:
+                results.append(self._result_row(page, arrays, row, percent_changes[row]))
+        
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort_by, descending, values[last], arrays.page_ids[last])
+        
+        return {**empty, "total": total, "results": results, "next_cursor": next_cursor}
+    
+    async def get_top_results(self,
+                              simulation_id: int,
+                              sort_by: str = "pagerank_delta",
+                              k: int = 50,
+                              descending: bool = True) -> Dict:
+        """Top-k pages of a simulation, selected on the result arrays"""
+        try:
+            page = await self.get_results_page(simulation_id, sort_by, descending, limit=k)
+        except LookupError as e:
+            raise ValueError(str(e))
+        return {key: page[key] for key in ("simulation_id", "sort_by", "total", "results")}
+    
+    async def compare_simulations(self,
+                                  simulation_id_a: int,
+                                  simulation_id_b: int,
+                                  top_n: int = 1000,
+                                  limit: int = 50) -> Dict:
+        """Compare two simulations of the same project on their stored result arrays"""
+        simulation_a = await self.simulation_repo.get_by_id(simulation_id_a)
+        simulation_b = await self.simulation_repo.get_by_id(simulation_id_b)
+        if not simulation_a or not simulation_b:
+            raise LookupError("Simulation not found")
+        if simulation_a.project_id != simulation_b.project_id:
+            raise ValueError("Simulations belong to different projects")
+        
+        arrays_a = await self.simulation_repo.get_result_arrays(simulation_id_a)
+        arrays_b = await self.simulation_repo.get_result_arrays(simulation_id_b)
+        for simulation, arrays in ((simulation_a, arrays_a), (simulation_b, arrays_b)):
+            if arrays is None:
+                raise ValueError(f"Simulation {simulation.id} has no results")
+        
+        # Categories aligned on the page ids of A
+        category_by_id = dict(await self.page_repo.get_categories(simulation_a.project_id))
+        categories = [category_by_id.get(page_id) for page_id in arrays_a.page_ids.tolist()]
+        
+        comparison = compare_results(arrays_a, arrays_b, categories=categories, top_n=top_n, limit=limit)
+        
+        # Page details for the listed pages only
+        listed_ids = {row["page_id"] for key in ("largest_differences", "divergent_pages") for row in comparison[key]}
+        page_lookup = {page.id: page for page in await self.page_repo.get_by_ids(list(listed_ids))}
+        for key in ("largest_differences", "divergent_pages"):
+            for row in comparison[key]:
+                page = page_lookup.get(row["page_id"])
+                row.update({"url": page.url if page else None,
+                            "type": page.type if page else None,
+                            "category": page.category if page else None})
+        
+        return {
+            "simulation_a": simulation_id_a,
+            "simulation_b": simulation_id_b,
+            "project_id": simulation_a.project_id,
+            **comparison
+        }
+    
+    def _result_row(self, page: Any, arrays: ResultArrays, row: int, percent_change: float) -> Dict:
+        """
+        Detailed result of one page from a row of the result arrays.
+        
+        percent_change comes from ResultArrays.percent_change (the run's
+        own baseline), the value results are sorted on.
+        """
+        delta = float(arrays.pagerank_delta[row])
+        new_depth = int(arrays.new_click_depth[row]) if arrays.new_click_depth is not None else None
+        return {
+            "page_id": page.id,
+            "url": page.url,
+            "type": page.type,
+            "category": page.category,
+            "current_pagerank": page.current_pagerank,
+            "new_pagerank": float(arrays.new_pagerank[row]),
+            "pagerank_delta": delta,
+            "percent_change": float(percent_change),
+            "current_click_depth": page.click_depth,
+            "new_click_depth": new_depth,
+            "click_depth_delta": self._click_depth_delta(page.click_depth, new_depth)
+        }
+    
     async def run_multi_rule_simulation(self, 
                                        project_id: int, 
                                        simulation_name: str,
                                        rules_config: List[Dict],
                                        page_boosts: List[Dict] = None,
-                                       protected_pages: List[Dict] = None) -> Dict:
+                                       protected_pages: List[Dict] = None,
+                                       time_budget: float = None,
+                                       seed: int = None,
+                                       cache_key: str = None) -> Dict:
         """Run a simulation with multiple rules applied cumulatively"""
         
+        # The seed is recorded so that the generated links can be reproduced
+        if seed is None:
+            seed = payload_seed(canonical_payload(rules_config, page_boosts, protected_pages))
+        
         # Create simulation record with multiple rules, page boosts, and protected pages
         simulation = await self.simulation_repo.create(
-            project_id, simulation_name, rules_config, page_boosts, protected_pages
+            project_id, simulation_name, rules_config, page_boosts, protected_pages,
+            seed=seed, cache_key=cache_key
         )
         
+        return await self.execute_multi_rule_simulation(
+            simulation.id, project_id, rules_config, page_boosts, protected_pages,
+            time_budget=time_budget, seed=seed
+        )
+    
+    async def execute_multi_rule_simulation(self,
+                                            simulation_id: int,
+                                            project_id: int,
+                                            rules_config: List[Dict],
+                                            page_boosts: List[Dict] = None,
+                                            protected_pages: List[Dict] = None,
+                                            time_budget: float = None,
+                                            seed: int = None) -> Dict:
+        """
+        Run an already created simulation record (used inline and by the job queue).
+        
+        The run can be stopped through cancellation_registry or by its time
+        budget. A stop before the solve ends as "cancelled" without results;
+        a stop during the solve keeps the best-so-far vector as "partial".
+        """
+        token = cancellation_registry.register(
+            simulation_id, time_budget or settings.SIMULATION_TIME_BUDGET_SECONDS
+        )
+        token.start()
+        progress = ProgressReporter(progress_broker, simulation_channel(simulation_id))
+        
         try:
-            await self.simulation_repo.update_status(simulation.id, "running")
+            token.raise_if_stopped()
+            await self.simulation_repo.update_status(simulation_id, "running")
             
             # Load current pages and links
+            progress.phase("loading")
             pages = await self.page_repo.get_by_project(project_id)
             links = await self.link_repo.get_by_project(project_id)
             
@@ -286,22 +515,41 @@ class PageRankSimulator:
             # Ensure all pages have current PageRank
             await self._ensure_current_pagerank(pages, existing_links)
             
+            # Baseline click depth from the homepage
+            baseline_graph = compile_graph(pages, existing_links)
+            root_idx = find_root_index(pages)
+            current_depths = compute_click_depth(baseline_graph, root_idx)
+            await self._ensure_click_depth(pages, current_depths)
+            
             # Create multi-rule and apply it
-            multi_rule = MultiRule(rules_config)
-            new_links = multi_rule.generate_links(pages, existing_links)
+            token.raise_if_stopped()
+            progress.phase("link_generation", total_pages=len(pages), existing_links=len(existing_links))
+            page_index = await self._build_page_index(project_id, pages, [rules_config])
+            existing_edges = EdgeSet.from_links(existing_links)
+            multi_rule = MultiRule(rules_config, seed=seed, cancel_token=token)
+            selections = await self._select_links(page_index, existing_edges, multi_rule, token)
+            new_links = multi_rule.merge_selections(existing_edges, selections)
+            removed_links = multi_rule.removed_links(page_index, existing_edges)
             
             # DEBUG: Log link generation results
             logger.info(f"🔗 Link generation results:")
             logger.info(f"   📊 Existing links: {len(existing_links)}")
             logger.info(f"   ✨ New links generated: {len(new_links)}")
+            logger.info(f"   🗑️  Links removed: {len(removed_links)}")
             logger.info(f"   📝 Rules applied: {len(rules_config)}")
-            if len(new_links) == 0:
+            if len(new_links) == 0 and len(removed_links) == 0:
                 logger.warning(f"⚠️  NO NEW LINKS GENERATED! This will result in identical PageRank")
             
-            # Combine existing and new links
-            all_links = existing_links + new_links
+            # Combine existing and new links, without the removed ones
+            all_links = self._simulated_links(existing_links, new_links, removed_links)
+            
+            # Click depth on the modified graph
+            new_depths = compute_click_depth(
+                baseline_graph.without_links(removed_links.to_array()).with_links(new_links), root_idx
+            )
             
             # Calculate semantic weights if enabled
+            progress.phase("weights", new_links=len(new_links))
             semantic_weights = {}
             final_weights = None
             
@@ -314,98 +562,520 @@ class PageRankSimulator:
             else:
                 logger.info("Using legacy uniform weights (academic mode - ignoring semantic relevance)")
             
-            # Use Advanced PageRank calculator with Protect & Boost functionality
-            advanced_calculator = AdvancedPageRankCalculator(
-                damping=settings.PAGERANK_DAMPING,
-                tolerance=settings.PAGERANK_TOLERANCE,
-                max_iter=settings.PAGERANK_MAX_ITER
-            )
+            # Convert boosts and protections to the advanced calculator format
+            boosted_pages = self._convert_page_boosts(page_boosts)
+            protected_pages_dict = self._convert_protected_pages(protected_pages, pages)
             
-            # Convert page_boosts to the new format (boost_factor -> target_factor)
-            boosted_pages = {}
-            if page_boosts:
-                logger.info(f"Converting {len(page_boosts)} page boosts to advanced format")
-                for boost in page_boosts:
-                    url = boost.get('url')
-                    boost_factor = boost.get('boost_factor', 1.0)
-                    # Convert boost_factor to target_factor (boost wants to reach X times baseline)
-                    boosted_pages[url] = boost_factor
-            
-            # Convert protected_pages to the format expected by AdvancedPageRankCalculator
-            protected_pages_dict = {}
-            if protected_pages:
-                logger.info(f"Converting {len(protected_pages)} protected pages to advanced format")
-                # Create URL to page mapping for quick lookup
-                url_to_page = {page.url: page for page in pages}
-                
-                for protect in protected_pages:
-                    url = protect.get('url')
-                    protection_factor = protect.get('protection_factor', 0.05)
-                    
-                    # Handle automatic protection (negative values mean percentage loss limit)
-                    if protection_factor < 0:
-                        # protection_factor = -0.02 means "don't lose more than 2%"
-                        loss_limit = abs(protection_factor)
-                        page = url_to_page.get(url)
-                        
-                        if page and page.current_pagerank > 0:
-                            # Calculate minimum threshold: current_pagerank * (1 - loss_limit)
-                            min_threshold = page.current_pagerank * (1 - loss_limit)
-                            protected_pages_dict[url] = min_threshold
-                            logger.info(f"Auto-protect {url}: current={page.current_pagerank:.4f}, min={min_threshold:.4f} (-{loss_limit*100:.1f}%)")
-                        else:
-                            logger.warning(f"Cannot auto-protect {url}: page not found or zero PageRank")
-                    else:
-                        # Manual protection with absolute threshold
-                        protected_pages_dict[url] = protection_factor
-            
-            # Calculate PageRank with advanced features
-            new_pagerank = await advanced_calculator.calculate(
-                pages, all_links,
-                damping=settings.PAGERANK_DAMPING,
-                max_iter=settings.PAGERANK_MAX_ITER,
-                tolerance=settings.PAGERANK_TOLERANCE,
+            # Calculate PageRank with Protect & Boost functionality
+            token.raise_if_stopped()
+            progress.phase("solve", total_links=len(all_links))
+            new_pagerank = await self._solve_advanced(
+                pages, all_links, boosted_pages, protected_pages_dict,
                 link_weights=final_weights,
-                # Advanced parameters
-                protected_pages=protected_pages_dict,
-                boosted_pages=boosted_pages,
-                eta_protect=0.05,  # Default protection budget
-                eta_boost=0.08     # Default boost budget
+                cancel_token=token,
+                progress=progress
             )
+            solver_stats = self.last_solver_stats
+            status = "partial" if solver_stats.get("stopped") else "completed"
             
-            # Prepare results
-            results = []
-            for page in pages:
-                page_id = page.id
-                current_pr = page.current_pagerank
-                new_pr = new_pagerank.get(page_id, current_pr)
-                delta = new_pr - current_pr
-                
-                results.append({
-                    "page_id": page_id,
-                    "new_pagerank": new_pr,
-                    "pagerank_delta": delta
-                })
-            
-            # Save results
-            await self.simulation_repo.save_results(simulation.id, results)
-            await self.simulation_repo.update_status(simulation.id, "completed")
+            # Prepare results as aligned vectors
+            page_ids, current_vector = self._page_vectors(pages)
+            new_vector = self._align_pagerank(new_pagerank, page_ids, current_vector)
             
             # Prepare summary
             summary = self._create_simulation_summary(
-                pages, results, new_links, multi_rule.get_description()
+                pages, current_vector, new_vector, new_links, multi_rule.get_description(),
+                depth_summary=summarize_depth_change(current_depths, new_depths),
+                removed_links=len(removed_links)
+            )
+            
+            # Save results
+            progress.phase("persist", results=len(pages))
+            await self.simulation_repo.save_result_arrays(
+                simulation_id, ResultArrays.build(page_ids, new_vector, new_vector - current_vector, new_depths)
             )
+            await self.simulation_repo.save_links(simulation_id, new_links)
+            await self.simulation_repo.save_solver_stats(simulation_id, solver_stats)
+            await self.simulation_repo.save_summary(simulation_id, summary)
+            await self.simulation_repo.update_status(simulation_id, status)
+            
+            progress.finish(status, solver_stats=solver_stats, new_links=len(new_links))
             
             return {
-                "simulation_id": simulation.id,
-                "status": "completed",
+                "simulation_id": simulation_id,
+                "status": status,
                 "summary": summary,
-                "new_links_count": len(new_links)
+                "new_links_count": len(new_links),
+                "solver_stats": solver_stats
+            }
+            
+        except SimulationCancelled as e:
+            logger.warning(f"⏹️  Simulation {simulation_id} stopped before solving: {e.reason}")
+            await self.simulation_repo.save_solver_stats(simulation_id, {"stopped": e.reason})
+            await self.simulation_repo.update_status(simulation_id, "cancelled")
+            progress.finish("cancelled", reason=e.reason)
+            return {
+                "simulation_id": simulation_id,
+                "status": "cancelled",
+                "summary": None,
+                "new_links_count": 0,
+                "solver_stats": {"stopped": e.reason}
             }
             
         except Exception as e:
-            await self.simulation_repo.update_status(simulation.id, "failed")
+            await self.simulation_repo.update_status(simulation_id, "failed")
+            progress.finish("failed", error=str(e))
             raise ValueError(f"Multi-rule simulation failed: {str(e)}")
+        
+        finally:
+            cancellation_registry.release(simulation_id)
+    
+    @staticmethod
+    def _simulated_links(existing_links: List[Tuple[int, int]],
+                         new_links: List[Tuple[int, int]],
+                         removed_links: EdgeSet) -> Any:
+        """
+        Links of the simulated graph: the existing links, without the
+        removed ones (a vectorized mask, as an (m, 2) edge array), plus
+        the new links.
+        """
+        if len(removed_links) == 0:
+            return existing_links + new_links
+        existing_from, existing_to = links_to_columns(existing_links)
+        new_from, new_to = links_to_columns(new_links)
+        kept = ~removed_links.contains(existing_from, existing_to)
+        return np.column_stack((
+            np.concatenate((existing_from[kept], new_from)),
+            np.concatenate((existing_to[kept], new_to))
+        ))
+    
+    def _convert_page_boosts(self, page_boosts: List[Dict]) -> Dict[str, float]:
+        """Convert page_boosts to {url: target_factor} (boost wants to reach X times baseline)"""
+        boosted_pages = {}
+        if page_boosts:
+            logger.info(f"Converting {len(page_boosts)} page boosts to advanced format")
+            for boost in page_boosts:
+                boosted_pages[boost.get('url')] = boost.get('boost_factor', 1.0)
+        return boosted_pages
+    
+    def _convert_protected_pages(self, protected_pages: List[Dict], pages: List[Any]) -> Dict[str, float]:
+        """Convert protected_pages to the format expected by AdvancedPageRankCalculator"""
+        protected_pages_dict = {}
+        if not protected_pages:
+            return protected_pages_dict
+        
+        logger.info(f"Converting {len(protected_pages)} protected pages to advanced format")
+        # Exact URL lookups, shared with the rules of the project
+        row_of_url = get_url_matcher(pages).row_of_url
+        
+        for protect in protected_pages:
+            url = protect.get('url')
+            protection_factor = protect.get('protection_factor', 0.05)
+            
+            # Handle automatic protection (negative values mean percentage loss limit)
+            if protection_factor < 0:
+                # protection_factor = -0.02 means "don't lose more than 2%"
+                loss_limit = abs(protection_factor)
+                row = row_of_url.get(url)
+                page = pages[row] if row is not None else None
+                
+                if page and page.current_pagerank > 0:
+                    # Calculate minimum threshold: current_pagerank * (1 - loss_limit)
+                    min_threshold = page.current_pagerank * (1 - loss_limit)
+                    protected_pages_dict[url] = min_threshold
+                    logger.info(f"Auto-protect {url}: current={page.current_pagerank:.4f}, min={min_threshold:.4f} (-{loss_limit*100:.1f}%)")
+                else:
+                    logger.warning(f"Cannot auto-protect {url}: page not found or zero PageRank")
+            else:
+                # Manual protection with absolute threshold
+                protected_pages_dict[url] = protection_factor
+        
+        return protected_pages_dict
+    
+    async def _solve_advanced(self,
+                              pages: List[Any],
+                              all_links: List[Tuple[int, int]],
+                              boosted_pages: Dict[str, float],
+                              protected_pages_dict: Dict[str, float],
+                              link_weights: Dict = None,
+                              damping: float = None,
+                              eta_protect: float = 0.05,  # Default protection budget
+                              eta_boost: float = 0.08,    # Default boost budget
+                              nstart: Dict[int, float] = None,
+                              cancel_token: CancellationToken = None,
+                              progress: ProgressReporter = None) -> Dict[int, float]:
+        """Solve PageRank on the simulated graph with Protect & Boost functionality"""
+        damping = damping or settings.PAGERANK_DAMPING
+        
+        advanced_calculator = AdvancedPageRankCalculator(
+            damping=damping,
+            tolerance=settings.PAGERANK_TOLERANCE,
+            max_iter=settings.PAGERANK_MAX_ITER
+        )
+        
+        new_pagerank = await advanced_calculator.calculate(
+            pages, all_links,
+            damping=damping,
+            max_iter=settings.PAGERANK_MAX_ITER,
+            tolerance=settings.PAGERANK_TOLERANCE,
+            link_weights=link_weights,
+            # Advanced parameters
+            protected_pages=protected_pages_dict,
+            boosted_pages=boosted_pages,
+            eta_protect=eta_protect,
+            eta_boost=eta_boost,
+            nstart=nstart,
+            cancel_token=cancel_token,
+            progress=progress
+        )
+        
+        # Iterations, residual and stop reason of the solve
+        self.last_solver_stats = advanced_calculator.last_run_stats
+        return new_pagerank
+    
+    async def run_parameter_sweep(self,
+                                  project_id: int,
+                                  rules_config: List[Dict],
+                                  page_boosts: List[Dict] = None,
+                                  protected_pages: List[Dict] = None,
+                                  links_per_page_values: List[int] = None,
+                                  damping_values: List[float] = None,
+                                  eta_boost_values: List[float] = None,
+                                  eta_protect_values: List[float] = None,
+                                  seed: int = 42) -> Dict:
+        """
+        Solve a grid of links_per_page / damping / budget values in one job.
+        
+        The graph is loaded once and targets are selected once at the largest
+        links_per_page: under a fixed seed the picks for a smaller k are the
+        first k picks of every source, which are then deduplicated across
+        rules for that k alone. Each solve is warm-started from the
+        previous grid point. Nothing is persisted; the result is a table of
+        summary metrics per grid point.
+        """
+        start_time = time.time()
+        
+        links_per_page_values = sorted(set(links_per_page_values or [3]))
+        damping_values = damping_values or [settings.PAGERANK_DAMPING]
+        eta_boost_values = eta_boost_values or [0.08]
+        eta_protect_values = eta_protect_values or [0.05]
+        
+        grid_size = len(links_per_page_values) * len(damping_values) * len(eta_boost_values) * len(eta_protect_values)
+        if grid_size > settings.MAX_SWEEP_GRID_POINTS:
+            raise ValueError(f"Sweep has {grid_size} grid points. Maximum allowed: {settings.MAX_SWEEP_GRID_POINTS}")
+        
+        # Load current pages and links once
+        pages = await self.page_repo.get_by_project(project_id)
+        links = await self.link_repo.get_by_project(project_id)
+        
+        if not pages:
+            raise ValueError("No pages found for this project")
+        
+        existing_links = [(link.from_page_id, link.to_page_id) for link in links]
+        await self._ensure_current_pagerank(pages, existing_links)
+        
+        baseline_graph = compile_graph(pages, existing_links)
+        root_idx = find_root_index(pages)
+        current_depths = compute_click_depth(baseline_graph, root_idx)
+        
+        boosted_pages = self._convert_page_boosts(page_boosts)
+        protected_pages_dict = self._convert_protected_pages(protected_pages, pages)
+        
+        # Select targets once at the largest k, smaller k are rank prefixes
+        k_max = links_per_page_values[-1]
+        page_index = await self._build_page_index(project_id, pages, [rules_config])
+        existing_edges = EdgeSet.from_links(existing_links)
+        multi_rule = MultiRule([{**rule, 'links_per_page': k_max} for rule in rules_config], seed=seed)
+        selections = await self._select_links(page_index, existing_edges, multi_rule)
+        # Approximate (IVF) semantic search widens its probe with k, so its
+        # first picks can change with k: select again for each k
+        select_per_k = (page_index.semantic is not None and page_index.semantic.is_ivf
+                        and any(rule.get('selection_method') == 'semantic' for rule in rules_config))
+        # Removals do not depend on links_per_page
+        removed_links = multi_rule.removed_links(page_index, existing_edges)
+        pruned_graph = baseline_graph.without_links(removed_links.to_array())
+        generation_time = time.time() - start_time
+        
+        logger.info(f"🧪 Parameter sweep: {grid_size} grid points, "
+                    f"{sum(len(keys) for _, (keys, _, _) in selections)} links selected at k={k_max}")
+        
+        page_ids, current_vector = self._page_vectors(pages)
+        grid = []
+        previous_solution = None
+        
+        for links_per_page in links_per_page_values:
+            if select_per_k and links_per_page < k_max:
+                rule_k = MultiRule([{**rule, 'links_per_page': links_per_page} for rule in rules_config], seed=seed)
+                new_links = rule_k.merge_selections(existing_edges, await self._select_links(page_index, existing_edges, rule_k))
+            else:
+                # Deduplicating the prefixes (not prefixing the deduplicated k_max
+                # links) keeps each point equal to a single simulation at that k
+                new_links = multi_rule.merge_selections(existing_edges, selections, links_per_page=links_per_page)
+            all_links = self._simulated_links(existing_links, new_links, removed_links)
+            new_depths = compute_click_depth(pruned_graph.with_links(new_links), root_idx)
+            depth_summary = summarize_depth_change(current_depths, new_depths)
+            
+            for damping in damping_values:
+                for eta_boost in eta_boost_values:
+                    for eta_protect in eta_protect_values:
+                        point_start = time.time()
+                        
+                        new_pagerank = await self._solve_advanced(
+                            pages, all_links, boosted_pages, protected_pages_dict,
+                            damping=damping, eta_protect=eta_protect, eta_boost=eta_boost,
+                            nstart=previous_solution
+                        )
+                        previous_solution = new_pagerank
+                        
+                        summary = self._create_simulation_summary(
+                            pages, current_vector,
+                            self._align_pagerank(new_pagerank, page_ids, current_vector),
+                            new_links, multi_rule.get_description(),
+                            depth_summary=depth_summary,
+                            by_group=False,
+                            removed_links=len(removed_links)
+                        )
+                        summary.pop("rule_description")
+                        summary.pop("total_pages")
+                        
+                        grid.append({
+                            "links_per_page": links_per_page,
+                            "damping": damping,
+                            "eta_boost": eta_boost,
+                            "eta_protect": eta_protect,
+                            **{key: float(value) if isinstance(value, float) else value for key, value in summary.items()},
+                            "solve_time": time.time() - point_start
+                        })
+        
+        total_time = time.time() - start_time
+        logger.info(f"🏁 Parameter sweep completed: {grid_size} points in {total_time:.2f}s")
+        
+        return {
+            "project_id": project_id,
+            "seed": seed,
+            "total_pages": len(pages),
+            "rule_description": multi_rule.get_description(),
+            "grid_points": grid_size,
+            "link_generation_time": generation_time,
+            "total_time": total_time,
+            "results": grid
+        }
+    
+    async def run_batch_simulation(self,
+                                   project_id: int,
+                                   scenarios: List[Dict]) -> Dict:
+        """
+        Run several rule sets against one load of the project graph.
+        
+        Each scenario is a dict with name, rules_config, page_boosts,
+        protected_pages and an optional seed. Links are generated in worker processes, the
+        solves run sequentially warm-started from the baseline PageRank,
+        and all simulations and their results are saved in one transaction.
+        A failing scenario is recorded as failed without aborting the batch.
+        """
+        start_time = time.time()
+        
+        # Load current pages and links once
+        pages = await self.page_repo.get_by_project(project_id)
+        links = await self.link_repo.get_by_project(project_id)
+        
+        if not pages:
+            raise ValueError("No pages found for this project")
+        
+        existing_links = [(link.from_page_id, link.to_page_id) for link in links]
+        await self._ensure_current_pagerank(pages, existing_links)
+        
+        baseline_graph = compile_graph(pages, existing_links)
+        root_idx = find_root_index(pages)
+        current_depths = compute_click_depth(baseline_graph, root_idx)
+        await self._ensure_click_depth(pages, current_depths)
+        load_time = time.time() - start_time
+        
+        # Generate every scenario's links in parallel
+        scenarios = [
+            {**scenario, "seed": scenario["seed"] if scenario.get("seed") is not None else payload_seed(
+                canonical_payload(scenario["rules_config"], scenario.get("page_boosts"), scenario.get("protected_pages"))
+            )}
+            for scenario in scenarios
+        ]
+        generation_start = time.time()
+        page_index = await self._build_page_index(
+            project_id, pages, [scenario["rules_config"] for scenario in scenarios]
+        )
+        generated = await self._generate_batch_links(page_index, existing_links, scenarios)
+        # Removals are vector masks over the shared adjacency, cheap enough in this process
+        existing_edges = EdgeSet.from_links(existing_links)
+        removals = []
+        for scenario in scenarios:
+            try:
+                removals.append(MultiRule(scenario["rules_config"]).removed_links(page_index, existing_edges))
+            except Exception as e:
+                removals.append(e)
+        generation_time = time.time() - generation_start
+        
+        baseline_pagerank = {page.id: page.current_pagerank for page in pages}
+        page_ids, current_vector = self._page_vectors(pages)
+        records = []
+        summaries = []
+        
+        for scenario, new_links, removed_links in zip(scenarios, generated, removals):
+            scenario_start = time.time()
+            record = {
+                "name": scenario["name"],
+                "rules_config": scenario["rules_config"],
+                "page_boosts": scenario.get("page_boosts") or [],
+                "protected_pages": scenario.get("protected_pages") or [],
+                "seed": scenario["seed"],
+                "arrays": None,
+                "links": None
+            }
+            
+            try:
+                for outcome in (new_links, removed_links):
+                    if isinstance(outcome, Exception):
+                        raise outcome
+                
+                new_depths = compute_click_depth(
+                    baseline_graph.without_links(removed_links.to_array()).with_links(new_links), root_idx
+                )
+                
+                final_weights = None
+                if settings.USE_SEMANTIC_WEIGHTS and hasattr(self, 'semantic_service') and self.semantic_service:
+                    semantic_weights = await self.semantic_service.calculate_semantic_weights(new_links, pages)
+                    final_weights = self._merge_link_weights({}, semantic_weights)
+                
+                new_pagerank = await self._solve_advanced(
+                    pages, self._simulated_links(existing_links, new_links, removed_links),
+                    self._convert_page_boosts(record["page_boosts"]),
+                    self._convert_protected_pages(record["protected_pages"], pages),
+                    link_weights=final_weights,
+                    nstart=baseline_pagerank
+                )
+                
+                new_vector = self._align_pagerank(new_pagerank, page_ids, current_vector)
+                
+                record["arrays"] = ResultArrays.build(page_ids, new_vector, new_vector - current_vector, new_depths)
+                record["links"] = new_links
+                record["status"] = "completed"
+                summary = self._create_simulation_summary(
+                    pages, current_vector, new_vector, new_links,
+                    MultiRule(scenario["rules_config"]).get_description(),
+                    depth_summary=summarize_depth_change(current_depths, new_depths),
+                    removed_links=len(removed_links)
+                )
+                record["summary"] = summary
+                summaries.append({"status": "completed", "summary": summary,
+                                  "new_links_count": len(new_links), "error": None})
+            except Exception as e:
+                logger.error(f"❌ Batch scenario '{scenario['name']}' failed: {e}")
+                record["status"] = "failed"
+                summaries.append({"status": "failed", "summary": None,
+                                  "new_links_count": 0, "error": str(e)})
+            
+            summaries[-1]["computation_time"] = time.time() - scenario_start
+            records.append(record)
+        
+        # Persist all scenarios in one transaction
+        persist_start = time.time()
+        simulations = await self.simulation_repo.create_batch(project_id, records)
+        persist_time = time.time() - persist_start
+        
+        total_time = time.time() - start_time
+        logger.info(f"🏁 Batch simulation completed: {len(scenarios)} scenarios in {total_time:.2f}s "
+                    f"(load {load_time:.2f}s, links {generation_time:.2f}s, save {persist_time:.2f}s)")
+        
+        return {
+            "project_id": project_id,
+            "total_pages": len(pages),
+            "scenarios": [
+                {"simulation_id": simulation.id, "name": simulation.name, **summary}
+                for simulation, summary in zip(simulations, summaries)
+            ],
+            "timings": {
+                "load_time": load_time,
+                "link_generation_time": generation_time,
+                "persist_time": persist_time,
+                "total_time": total_time
+            }
+        }
+    
+    async def _generate_batch_links(self,
+                                    index: PageIndex,
+                                    existing_links: List[Tuple[int, int]],
+                                    scenarios: List[Dict]) -> List[Any]:
+        """Generate links for each scenario, in worker processes when worthwhile"""
+        workers = min(settings.SIMULATION_BATCH_WORKERS, len(scenarios))
+        
+        if workers <= 1:
+            results = []
+            existing_edges = EdgeSet.from_links(existing_links)
+            for scenario in scenarios:
+                try:
+                    results.append(MultiRule(scenario["rules_config"], seed=scenario.get("seed"))
+                                   .generate_links(index, existing_edges))
+                except Exception as e:
+                    results.append(e)
+            return results
+        
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=init_link_worker,
+                                 initargs=(self._page_records(index), existing_links, index.semantic)) as executor:
+            futures = [
+                loop.run_in_executor(executor, generate_links_in_worker,
+                                     scenario["rules_config"], scenario.get("seed"))
+                for scenario in scenarios
+            ]
+            return await asyncio.gather(*futures, return_exceptions=True)
+    
+    async def _select_links(self,
+                            index: PageIndex,
+                            existing_edges: EdgeSet,
+                            multi_rule: MultiRule,
+                            token: CancellationToken = None) -> List[Tuple[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """
+        Selections of a seeded rule set (see MultiRule.select_links), split over worker processes for large projects.
+        
+        Each task runs one rule on a fixed slice of its source pages; every
+        source page draws from a generator seeded with the simulation seed,
+        so joining the slices in order gives the selections of the sequential run.
+        """
+        workers = settings.LINK_GENERATION_WORKERS
+        tasks = multi_rule.partitions(index) if multi_rule.seed is not None and workers > 1 else []
+        n_sources = sum(stop - start for _, start, stop in tasks)
+        if len(tasks) <= 1 or n_sources < settings.LINK_GENERATION_PARALLEL_MIN_SOURCES:
+            return multi_rule.select_links(index, existing_edges)
+        
+        logger.info(f"⚡ Link generation: {len(tasks)} partitions of {n_sources} source pages on {workers} processes")
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                       initializer=init_link_worker,
+                                       initargs=(self._page_records(index), existing_edges, index.semantic))
+        try:
+            futures = [
+                loop.run_in_executor(executor, select_partition_in_worker,
+                                     multi_rule.rules_config, multi_rule.seed, *task)
+                for task in tasks
+            ]
+            for finished in asyncio.as_completed(futures):
+                await finished
+                if token is not None:
+                    token.raise_if_stopped()
+            results = [future.result() for future in futures]
+        finally:
+            # Pending partitions are dropped when cancelled or failed
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return multi_rule.join_partitions(tasks, results)
+    
+    @staticmethod
+    def _page_records(index: PageIndex) -> List[Dict]:
+        """Pages of an index for worker processes: plain dicts pickle cheaply and are understood by the selectors"""
+        return [
+            {"id": page.id, "url": page.url, "type": page.type or "",
+             "category": page.category or "", "current_pagerank": page.current_pagerank}
+            for page in index.pages
+        ]
     
     async def preview_multi_rule_links(self, 
                                       pages: List[Any], 
@@ -414,7 +1084,20 @@ class PageRankSimulator:
         """Preview links that would be generated by multiple rules"""
         
         # Create multi-rule and apply it
+        page_index = await self._build_page_index(pages[0].project_id if pages else None, pages, [rules_config])
         multi_rule = MultiRule(rules_config)
-        new_links = multi_rule.generate_links(pages, existing_links)
+        new_links = multi_rule.generate_links(page_index, existing_links)
         
-        return new_links
\ No newline at end of file
+        return new_links
+    
+    async def _build_page_index(self,
+                                project_id: int,
+                                pages: List[Any],
+                                rules_configs: List[List[Dict]]) -> PageIndex:
+        """Page index for link generation, with the embedding index when a rule is semantic"""
+        index = PageIndex(pages)
+        if any(rule.get('selection_method') == 'semantic' for rules in rules_configs for rule in rules):
+            semantic_index = await SemanticService(self.page_repo).get_semantic_index(project_id, pages)
+            if semantic_index is not None:
+                index.attach_semantic(semantic_index)
+        return index
\ No newline at end of file
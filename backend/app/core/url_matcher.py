@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Never part of a URL, so a pattern cannot match across two URLs
+_SEPARATOR = "\n"
+
+
+def _page_value(page: Any, name: str):
+    return page.get(name) if isinstance(page, dict) else getattr(page, name, None)
+
+
+class UrlMatcher:
+    """
+    URL lookups over a project's pages, built once per project.
+
+    Exact URLs resolve through a hash map. Substring patterns (menu and
+    footer target_urls) are searched in one text joining every URL, so a
+    pattern costs a single C-level scan instead of a Python loop over
+    pages; match offsets map back to rows with a binary search over the
+    URL start offsets.
+    """
+
+    def __init__(self, page_ids: Sequence[int], urls: Sequence[str]):
+        self.page_ids = np.asarray(page_ids, dtype=np.int64)
+        self.urls = list(urls)
+        # Duplicate URLs resolve to their last page, like the url -> page dicts did
+        self.row_of_url: Dict[str, int] = {url: row for row, url in enumerate(self.urls)}
+        self._text = _SEPARATOR.join(self.urls)
+        lengths = np.fromiter((len(url) + 1 for url in self.urls), dtype=np.int64, count=len(self.urls))
+        self._starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+    @classmethod
+    def from_pages(cls, pages: Sequence[Any]) -> "UrlMatcher":
+        return cls([_page_value(page, 'id') for page in pages], [_page_value(page, 'url') or '' for page in pages])
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def resolve(self, urls: Iterable[str]) -> Dict[str, int]:
+        """Page id of every URL found exactly (unknown URLs are left out)"""
+        resolved = {}
+        for url in urls:
+            row = self.row_of_url.get(url)
+            if row is not None:
+                resolved[url] = int(self.page_ids[row])
+        return resolved
+
+    def rows_containing(self, patterns: Iterable[str]) -> np.ndarray:
+        """Rows whose URL equals or contains any of the patterns, in page order"""
+        mask = np.zeros(len(self.urls), dtype=bool)
+        for pattern in dict.fromkeys(patterns):
+            if not pattern:
+                # The empty string is contained in every URL
+                mask[:] = True
+                break
+            if _SEPARATOR in pattern:
+                continue
+            mask[self._rows_at(self._find_all(pattern))] = True
+        return np.flatnonzero(mask)
+
+    def ids_containing(self, patterns: Iterable[str]) -> List[int]:
+        return self.page_ids[self.rows_containing(patterns)].tolist()
+
+    def _find_all(self, pattern: str) -> np.ndarray:
+        """Offsets of the pattern in the joined text, skipping to the next URL after each hit"""
+        offsets = []
+        text, find = self._text, self._text.find
+        position = find(pattern)
+        while position != -1:
+            offsets.append(position)
+            # One hit per URL is enough
+            next_url = text.find(_SEPARATOR, position)
+            if next_url == -1:
+                break
+            position = find(pattern, next_url + 1)
+        return np.asarray(offsets, dtype=np.int64)
+
+    def _rows_at(self, offsets: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self._starts, offsets, side='right') - 1
+
+
+# Last matcher of each project, with the pages version it was built for
+_matchers: Dict[Any, Tuple[int, UrlMatcher]] = {}
+_MAX_CACHED_PROJECTS = 8
+
+
+def _pages_version(page: Any) -> Optional[int]:
+    """Project.pages_version of an ORM page (page dicts carry no version)"""
+    if isinstance(page, dict):
+        return page.get('pages_version')
+    return getattr(getattr(page, 'project', None), 'pages_version', None)
+
+
+def get_url_matcher(pages: Sequence[Any],
+                    project_id: Optional[int] = None,
+                    pages_version: Optional[int] = None) -> UrlMatcher:
+    """
+    URL matcher of a project's pages, cached per (project, pages version).
+
+    The page repository bumps Project.pages_version whenever pages are
+    inserted, updated or deleted, so a hit only checks that the page ids
+    come in the same order; the URLs are not read again. Pages without a
+    known version (page dicts, pages outside a project) get a fresh
+    matcher.
+    """
+    if pages and project_id is None:
+        project_id = _page_value(pages[0], 'project_id')
+    if pages and pages_version is None:
+        pages_version = _pages_version(pages[0])
+    if project_id is None or pages_version is None:
+        return UrlMatcher.from_pages(pages)
+
+    # Callers index the returned rows into their own pages, so a cached
+    # matcher is only valid for the same ids in the same order
+    page_ids = np.fromiter((_page_value(page, 'id') for page in pages), dtype=np.int64, count=len(pages))
+    cached = _matchers.get(project_id)
+    if cached is not None and cached[0] == pages_version and np.array_equal(cached[1].page_ids, page_ids):
+        return cached[1]
+
+    matcher = UrlMatcher(page_ids, [_page_value(page, 'url') or '' for page in pages])
+    if project_id not in _matchers and len(_matchers) >= _MAX_CACHED_PROJECTS:
+        _matchers.pop(next(iter(_matchers)))
+    _matchers[project_id] = (pages_version, matcher)
+    return matcher
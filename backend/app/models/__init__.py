@@ -1,7 +1,7 @@
 from app.models.project import Project
-from app.models.page import Page
+from app.models.page import Page, PageEmbeddingIndex
 from app.models.link import Link
-from app.models.simulation import Simulation, SimulationResult
+from app.models.simulation import Simulation, SimulationResult, SimulationResultArrays, SimulationLinks
 from app.models.gsc_data import GSCData
 
-__all__ = ["Project", "Page", "Link", "Simulation", "SimulationResult", "GSCData"]
\ No newline at end of file
+__all__ = ["Project", "Page", "PageEmbeddingIndex", "Link", "Simulation", "SimulationResult", "SimulationResultArrays", "SimulationLinks", "GSCData"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -11,6 +11,8 @@ class Page(Base):
     type = Column(String)  # 'product', 'category', 'blog', 'other'
     category = Column(String)  # For grouping (ex: /electronics/)
     current_pagerank = Column(Float, default=0.0)
+    click_depth = Column(Integer, nullable=True)  # Clicks from the homepage (-1 = unreachable)
+    crawl_depth = Column(Integer, nullable=True)  # Crawl depth reported by Screaming Frog
     title = Column(String)  # Page title for semantic analysis
     extracteur_1 = Column(String)  # Content extracted for semantic analysis
     
@@ -23,4 +25,19 @@ class Page(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('project_id', 'url', name='unique_project_url'),
-    )
\ No newline at end of file
+        Index('ix_pages_project_type', 'project_id', 'type'),  # Result filters
+        Index('ix_pages_project_category', 'project_id', 'category'),
+    )
+
+class PageEmbeddingIndex(Base):
+    """Nearest-neighbour index over a project's cached page embeddings (zlib-compressed arrays)"""
+    __tablename__ = "page_embedding_indexes"
+    
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    fingerprint = Column(String, nullable=False)  # Hash of the (page_id, content_hash) pairs indexed
+    n_pages = Column(Integer, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    page_ids = Column(LargeBinary, nullable=False)  # int64, row order of the vectors
+    vectors = Column(LargeBinary, nullable=False)  # float16, normalized
+    centroids = Column(LargeBinary, nullable=True)  # float16, IVF only
+    list_bounds = Column(LargeBinary, nullable=True)  # int32, first row of each inverted list (rows are stored list by list)
\ No newline at end of file
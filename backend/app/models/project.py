@@ -11,6 +11,8 @@ class Project(Base, TimestampMixin):
     domain = Column(String, nullable=False)
     total_pages = Column(Integer, default=0)
     page_types = Column(String, nullable=True)  # JSON string of available page types
+    links_version = Column(Integer, default=0, nullable=False)  # Bumped on every link-set change
+    pages_version = Column(Integer, default=0, nullable=False)  # Bumped on every page-set or page data change
     
     # Relations
     pages = relationship("Page", back_populates="project", cascade="all, delete-orphan")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from app.models.base import TimestampMixin
@@ -12,11 +12,18 @@ class Simulation(Base, TimestampMixin):
     rules_config = Column(JSON, nullable=False)  # List of LinkingRule configurations
     page_boosts = Column(JSON, default=lambda: [])  # List of PageBoost configurations
     protected_pages = Column(JSON, default=lambda: [])  # List of PageProtect configurations
-    status = Column(String, default="pending")  # pending, running, completed, failed
+    status = Column(String, default="pending")  # pending, running, completed, failed, cancelled, partial
+    solver_stats = Column(JSON, nullable=True)  # iterations, residual, converged, stopped
+    seed = Column(Integer, nullable=True)  # Link generation seed (None for older simulations)
+    cache_key = Column(String, nullable=True, index=True)  # Hash of the inputs, graph version and seed
+    cache_source_id = Column(Integer, ForeignKey("simulations.id"), nullable=True)  # Simulation whose stored results are reused
+    summary = Column(JSON, nullable=True)  # Summary returned when the run completed
     
     # Relations
     project = relationship("Project", back_populates="simulations")
     results = relationship("SimulationResult", back_populates="simulation", cascade="all, delete-orphan")
+    result_arrays = relationship("SimulationResultArrays", uselist=False, cascade="all, delete-orphan")
+    generated_links = relationship("SimulationLinks", uselist=False, cascade="all, delete-orphan")
 
 class SimulationResult(Base):
     __tablename__ = "simulation_results"
@@ -26,7 +33,27 @@ class SimulationResult(Base):
     page_id = Column(Integer, ForeignKey("pages.id"), nullable=False)
     new_pagerank = Column(Float, nullable=False)
     pagerank_delta = Column(Float, nullable=False)  # Difference with original
+    new_click_depth = Column(Integer, nullable=True)  # Click depth with simulated links (-1 = unreachable)
     
     # Relations
     simulation = relationship("Simulation", back_populates="results")
-    page = relationship("Page")
\ No newline at end of file
+    page = relationship("Page")
+
+class SimulationResultArrays(Base):
+    """Columnar results of a simulation: zlib-compressed arrays aligned on page_ids"""
+    __tablename__ = "simulation_result_arrays"
+    
+    simulation_id = Column(Integer, ForeignKey("simulations.id"), primary_key=True)
+    n_pages = Column(Integer, nullable=False)
+    page_ids = Column(LargeBinary, nullable=False)  # int64
+    new_pagerank = Column(LargeBinary, nullable=False)  # float32
+    pagerank_delta = Column(LargeBinary, nullable=False)  # float32
+    new_click_depth = Column(LargeBinary, nullable=True)  # int16 (-1 = unreachable)
+
+class SimulationLinks(Base):
+    """Links generated by a simulation: zlib-compressed int32 (from, to) pairs"""
+    __tablename__ = "simulation_links"
+    
+    simulation_id = Column(Integer, ForeignKey("simulations.id"), primary_key=True)
+    n_links = Column(Integer, nullable=False)
+    links = Column(LargeBinary, nullable=False)
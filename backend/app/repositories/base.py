@@ -33,15 +33,36 @@ class PageRepository(ABC):
     async def update_pagerank(self, page_id: int, pagerank: float) -> None: pass
     
     @abstractmethod
-    async def bulk_update_pagerank(self, updates: List[Dict]) -> None: pass
+    async def bulk_update_pagerank(self, updates: List[Dict], bump_version: bool = True) -> None: pass
+    
+    @abstractmethod
+    async def bulk_update_click_depth(self, updates: List[Dict]) -> None: pass
     
     @abstractmethod
     async def get_by_url(self, project_id: int, url: str) -> Optional[Any]: pass
+    
+    @abstractmethod
+    async def get_by_ids(self, page_ids: List[int]) -> List[Any]: pass
+    
+    @abstractmethod
+    async def get_categories(self, project_id: int) -> List[Any]: pass
+    
+    @abstractmethod
+    async def get_embedding_index(self, project_id: int) -> Optional[Dict]: pass
+    
+    @abstractmethod
+    async def save_embedding_index(self, project_id: int, record: Dict) -> None: pass
+    
+    @abstractmethod
+    async def get_ids_matching(self, project_id: int, page_type: Optional[str] = None, category: Optional[str] = None, url_contains: Optional[str] = None) -> List[int]: pass
 
 class LinkRepository(ABC):
     @abstractmethod
     async def get_by_project(self, project_id: int) -> List[Any]: pass
     
+    @abstractmethod
+    async def get_edges(self, project_id: int) -> Any: pass
+    
     @abstractmethod
     async def bulk_insert(self, links: List[Dict]) -> None: pass
     
@@ -50,7 +71,7 @@ class LinkRepository(ABC):
 
 class SimulationRepository(ABC):
     @abstractmethod
-    async def create(self, project_id: int, name: str, rules_config: List[Dict], page_boosts: List[Dict] = None, protected_pages: List[Dict] = None) -> Any: pass
+    async def create(self, project_id: int, name: str, rules_config: List[Dict], page_boosts: List[Dict] = None, protected_pages: List[Dict] = None, seed: Optional[int] = None, cache_key: Optional[str] = None) -> Any: pass
     
     @abstractmethod
     async def get_by_id(self, simulation_id: int) -> Optional[Any]: pass
@@ -62,4 +83,34 @@ class SimulationRepository(ABC):
     async def update_status(self, simulation_id: int, status: str) -> None: pass
     
     @abstractmethod
-    async def save_results(self, simulation_id: int, results: List[Dict]) -> None: pass
\ No newline at end of file
+    async def save_results(self, simulation_id: int, results: List[Dict]) -> None: pass
+    
+    @abstractmethod
+    async def create_batch(self, project_id: int, simulations: List[Dict]) -> List[Any]: pass
+    
+    @abstractmethod
+    async def fail_unfinished(self) -> int: pass
+    
+    @abstractmethod
+    async def save_solver_stats(self, simulation_id: int, stats: Dict) -> None: pass
+    
+    @abstractmethod
+    async def save_result_arrays(self, simulation_id: int, arrays: Any) -> None: pass
+    
+    @abstractmethod
+    async def get_result_arrays(self, simulation_id: int) -> Optional[Any]: pass
+    
+    @abstractmethod
+    async def save_links(self, simulation_id: int, links: Any) -> None: pass
+    
+    @abstractmethod
+    async def get_links(self, simulation_id: int) -> Optional[Any]: pass
+    
+    @abstractmethod
+    async def save_summary(self, simulation_id: int, summary: Dict) -> None: pass
+    
+    @abstractmethod
+    async def find_cached(self, project_id: int, cache_key: str) -> Optional[Any]: pass
+    
+    @abstractmethod
+    async def create_from_cache(self, source: Any, name: str) -> Any: pass
@@ -1,6 +1,9 @@
 from typing import List, Dict
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.link import Link
+from app.models.project import Project
+from app.core.edge_set import EdgeSet
 from app.repositories.base import LinkRepository
 
 class SQLiteLinkRepository(LinkRepository):
@@ -10,6 +13,11 @@ class SQLiteLinkRepository(LinkRepository):
     async def get_by_project(self, project_id: int) -> List[Link]:
         return self.db.query(Link).filter(Link.project_id == project_id).all()
     
+    async def get_edges(self, project_id: int) -> EdgeSet:
+        """Links of a project as an edge set (column query, no ORM objects)"""
+        rows = self.db.query(Link.from_page_id, Link.to_page_id).filter(Link.project_id == project_id).all()
+        return EdgeSet.from_links(rows)
+    
     async def bulk_insert(self, links: List[Dict]) -> None:
         if not links:
             return
@@ -18,6 +26,7 @@ class SQLiteLinkRepository(LinkRepository):
         try:
             link_objects = [Link(**link_data) for link_data in links]
             self.db.bulk_save_objects(link_objects)
+            self._bump_links_version(links[0]['project_id'])
             self.db.commit()
         except Exception as e:
             self.db.rollback()
@@ -41,7 +50,18 @@ class SQLiteLinkRepository(LinkRepository):
                     continue
             
             print(f"Successfully inserted {successful_inserts} new links out of {len(links)} total")
+            if successful_inserts:
+                self._bump_links_version(links[0]['project_id'])
+                self.db.commit()
     
     async def delete_by_project(self, project_id: int) -> None:
         self.db.query(Link).filter(Link.project_id == project_id).delete()
-        self.db.commit()
\ No newline at end of file
+        self._bump_links_version(project_id)
+        self.db.commit()
+    
+    def _bump_links_version(self, project_id: int) -> None:
+        """Invalidate graph-derived caches keyed on the project's link-set version"""
+        self.db.query(Project).filter(Project.id == project_id).update(
+            {Project.links_version: func.coalesce(Project.links_version, 0) + 1},
+            synchronize_session=False
+        )
\ No newline at end of file
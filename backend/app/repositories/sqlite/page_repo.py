@@ -1,6 +1,9 @@
+import time
 from typing import List, Optional, Dict
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.models.page import Page
+from app.models.page import Page, PageEmbeddingIndex
+from app.models.project import Project
 from app.repositories.base import PageRepository
 
 class SQLitePageRepository(PageRepository):
@@ -8,7 +11,7 @@ class SQLitePageRepository(PageRepository):
         self.db = db
     
     async def get_by_project(self, project_id: int) -> List[Page]:
-        return self.db.query(Page).filter(Page.project_id == project_id).all()
+        return self.db.query(Page).filter(Page.project_id == project_id).order_by(Page.id).all()
     
     async def bulk_insert(self, pages: List[Dict]) -> None:
         if not pages:
@@ -21,10 +24,12 @@ class SQLitePageRepository(PageRepository):
         try:
             page_objects = [Page(**page_data) for page_data in pages]
             self.db.bulk_save_objects(page_objects)
+            self._bump_pages_version(pages[0]['project_id'])
             self.db.commit()
         except Exception as e:
             self.db.rollback()
             # If bulk insert fails due to duplicates, insert one by one with error handling
+            successful_inserts = 0
             for page_data in pages:
                 try:
                     existing = self.db.query(Page).filter(
@@ -36,69 +41,124 @@ class SQLitePageRepository(PageRepository):
                         page = Page(**page_data)
                         self.db.add(page)
                         self.db.commit()
+                        successful_inserts += 1
                 except Exception:
                     self.db.rollback()
                     continue
+            
+            if successful_inserts:
+                self._bump_pages_version(pages[0]['project_id'])
+                self.db.commit()
     
     async def update_pagerank(self, page_id: int, pagerank: float) -> None:
         page = self.db.query(Page).filter(Page.id == page_id).first()
         if page:
             page.current_pagerank = pagerank
+            self._bump_pages_version(page.project_id)
             self.db.commit()
     
-    async def bulk_update_pagerank(self, updates: List[Dict]) -> None:
-        """Bulk update PageRank scores efficiently"""
+    async def bulk_update_pagerank(self, updates: List[Dict], bump_version: bool = True) -> None:
+        """
+        Bulk update PageRank scores ({'page_id', 'pagerank'} dicts) in one transaction.
+        
+        bump_version=False is for scores derived from the current links
+        alone, which are already covered by the links version.
+        """
         if not updates:
             return
         
+        from sqlalchemy import update
+        
         try:
-            # Use raw SQL for efficiency - much faster than ORM
-            from sqlalchemy import text
-            
-            # Prepare batch update
-            batch_size = 500
-            total_updated = 0
-            
-            for i in range(0, len(updates), batch_size):
-                batch = updates[i:i + batch_size]
-                
-                # Create WHEN clauses for batch update
-                when_clauses = []
-                page_ids = []
-                
-                for update in batch:
-                    when_clauses.append(f"WHEN {update['page_id']} THEN {update['pagerank']}")
-                    page_ids.append(str(update['page_id']))
-                
-                # Execute batch update with CASE statement
-                sql = f"""
-                UPDATE pages 
-                SET current_pagerank = CASE id 
-                    {' '.join(when_clauses)}
-                    ELSE current_pagerank 
-                END 
-                WHERE id IN ({','.join(page_ids)})
-                """
-                
-                self.db.execute(text(sql))
-                total_updated += len(batch)
-                
-                print(f"   ✅ Batch updated {total_updated}/{len(updates)} pages")
-            
+            start_time = time.time()
+            # Bulk UPDATE by primary key: a single executemany, one commit
+            self.db.execute(
+                update(Page),
+                [{"id": u['page_id'], "current_pagerank": u['pagerank']} for u in updates]
+            )
+            if bump_version:
+                # Updates come from one project's PageRank calculation
+                project_id = self.db.query(Page.project_id).filter(Page.id == updates[0]['page_id']).scalar()
+                self._bump_pages_version(project_id)
             self.db.commit()
-            print(f"   🎉 Bulk update completed: {total_updated} pages")
+            print(f"   🎉 Bulk update completed: {len(updates)} pages in {time.time() - start_time:.2f}s")
             
         except Exception as e:
             self.db.rollback()
             print(f"   ❌ Bulk update failed: {str(e)}")
             raise
     
+    async def bulk_update_click_depth(self, updates: List[Dict]) -> None:
+        """Bulk update click depths ({'page_id', 'click_depth'} dicts) in one transaction"""
+        if not updates:
+            return
+        
+        from sqlalchemy import update
+        
+        try:
+            # Derived from the links, so pages_version is left unchanged
+            self.db.execute(
+                update(Page),
+                [{"id": u['page_id'], "click_depth": u['click_depth']} for u in updates]
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"   ❌ Click depth update failed: {str(e)}")
+            raise
+    
     async def get_by_url(self, project_id: int, url: str) -> Optional[Page]:
         return self.db.query(Page).filter(
             Page.project_id == project_id,
             Page.url == url
         ).first()
     
+    async def get_by_ids(self, page_ids: List[int]) -> List[Page]:
+        """Pages by id, queried in chunks to stay under SQLite's variable limit"""
+        pages = []
+        for start in range(0, len(page_ids), 500):
+            pages.extend(self.db.query(Page).filter(Page.id.in_(page_ids[start:start + 500])).all())
+        return pages
+    
+    async def get_categories(self, project_id: int) -> List[tuple]:
+        """(page_id, category) pairs of a project (column query, no ORM objects)"""
+        return self.db.query(Page.id, Page.category).filter(Page.project_id == project_id).all()
+    
+    async def get_embedding_index(self, project_id: int) -> Optional[Dict]:
+        """Stored embedding index record of a project (compressed columns), None if absent"""
+        row = self.db.query(PageEmbeddingIndex).filter(PageEmbeddingIndex.project_id == project_id).first()
+        if row is None:
+            return None
+        return {column.name: getattr(row, column.name) for column in PageEmbeddingIndex.__table__.columns}
+    
+    async def save_embedding_index(self, project_id: int, record: Dict) -> None:
+        """Replace the embedding index of a project"""
+        self.db.merge(PageEmbeddingIndex(project_id=project_id, **record))
+        self.db.commit()
+    
+    async def get_ids_matching(self,
+                               project_id: int,
+                               page_type: Optional[str] = None,
+                               category: Optional[str] = None,
+                               url_contains: Optional[str] = None) -> List[int]:
+        """Ids of the project's pages matching the filters (column query, no ORM objects)"""
+        query = self.db.query(Page.id).filter(Page.project_id == project_id)
+        if page_type is not None:
+            query = query.filter(Page.type == page_type)
+        if category is not None:
+            query = query.filter(Page.category == category)
+        if url_contains:
+            query = query.filter(Page.url.contains(url_contains, autoescape=True))
+        return [page_id for (page_id,) in query.all()]
+    
     async def delete_by_project(self, project_id: int) -> None:
         self.db.query(Page).filter(Page.project_id == project_id).delete()
-        self.db.commit()
\ No newline at end of file
+        self._bump_pages_version(project_id)
+        self.db.commit()
+    
+    def _bump_pages_version(self, project_id: int) -> None:
+        """Invalidate caches keyed on the project's page data (simulation results, URL matchers)"""
+        self.db.query(Project).filter(Project.id == project_id).update(
+            {Project.pages_version: func.coalesce(Project.pages_version, 0) + 1},
+            synchronize_session=False
+        )
\ No newline at end of file
@@ -1,19 +1,26 @@
 from typing import List, Optional, Dict
 from sqlalchemy.orm import Session
-from app.models.simulation import Simulation, SimulationResult
+import numpy as np
+from app.models.simulation import Simulation, SimulationResult, SimulationResultArrays, SimulationLinks
+from app.core.result_arrays import (
+    ResultArrays, encode_array, decode_array, encode_links, decode_links,
+    PAGE_ID_DTYPE, SCORE_DTYPE, DEPTH_DTYPE
+)
 from app.repositories.base import SimulationRepository
 
 class SQLiteSimulationRepository(SimulationRepository):
     def __init__(self, db: Session):
         self.db = db
     
-    async def create(self, project_id: int, name: str, rules_config: List[Dict], page_boosts: List[Dict] = None, protected_pages: List[Dict] = None) -> Simulation:
+    async def create(self, project_id: int, name: str, rules_config: List[Dict], page_boosts: List[Dict] = None, protected_pages: List[Dict] = None, seed: Optional[int] = None, cache_key: Optional[str] = None) -> Simulation:
         simulation = Simulation(
             project_id=project_id,
             name=name,
             rules_config=rules_config,
             page_boosts=page_boosts or [],
-            protected_pages=protected_pages or []
+            protected_pages=protected_pages or [],
+            seed=seed,
+            cache_key=cache_key
         )
         self.db.add(simulation)
         self.db.commit()
@@ -32,10 +39,169 @@ class SQLiteSimulationRepository(SimulationRepository):
             simulation.status = status
             self.db.commit()
     
+    async def save_solver_stats(self, simulation_id: int, stats: Dict) -> None:
+        simulation = self.db.query(Simulation).filter(Simulation.id == simulation_id).first()
+        if simulation:
+            simulation.solver_stats = stats
+            self.db.commit()
+    
+    async def save_summary(self, simulation_id: int, summary: Dict) -> None:
+        simulation = self.db.query(Simulation).filter(Simulation.id == simulation_id).first()
+        if simulation:
+            simulation.summary = summary
+            self.db.commit()
+    
+    async def find_cached(self, project_id: int, cache_key: str) -> Optional[Simulation]:
+        """Latest completed simulation that owns results for this cache key"""
+        return self.db.query(Simulation).filter(
+            Simulation.project_id == project_id,
+            Simulation.cache_key == cache_key,
+            Simulation.status == "completed",
+            Simulation.cache_source_id.is_(None)
+        ).order_by(Simulation.id.desc()).first()
+    
+    async def create_from_cache(self, source: Simulation, name: str) -> Simulation:
+        """Completed simulation record that reads its results and links from source"""
+        simulation = Simulation(
+            project_id=source.project_id,
+            name=name,
+            rules_config=source.rules_config,
+            page_boosts=source.page_boosts or [],
+            protected_pages=source.protected_pages or [],
+            status="completed",
+            solver_stats=source.solver_stats,
+            seed=source.seed,
+            cache_key=source.cache_key,
+            cache_source_id=source.id,
+            summary=source.summary
+        )
+        self.db.add(simulation)
+        self.db.commit()
+        self.db.refresh(simulation)
+        return simulation
+    
+    def _result_owner(self, simulation_id: int) -> int:
+        """Id of the simulation whose stored arrays hold this simulation's results"""
+        source_id = self.db.query(Simulation.cache_source_id).filter(
+            Simulation.id == simulation_id
+        ).scalar()
+        return source_id or simulation_id
+    
     async def save_results(self, simulation_id: int, results: List[Dict]) -> None:
         result_objects = [
             SimulationResult(simulation_id=simulation_id, **result_data) 
             for result_data in results
         ]
         self.db.bulk_save_objects(result_objects)
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+    
+    async def create_batch(self, project_id: int, simulations: List[Dict]) -> List[Simulation]:
+        """Create several simulations with their results in a single transaction"""
+        try:
+            records = []
+            for data in simulations:
+                simulation = Simulation(
+                    project_id=project_id,
+                    name=data["name"],
+                    rules_config=data["rules_config"],
+                    page_boosts=data.get("page_boosts") or [],
+                    protected_pages=data.get("protected_pages") or [],
+                    status=data.get("status", "completed"),
+                    seed=data.get("seed"),
+                    summary=data.get("summary")
+                )
+                self.db.add(simulation)
+                records.append(simulation)
+            
+            # Assign simulation ids without committing
+            self.db.flush()
+            
+            for simulation, data in zip(records, simulations):
+                if data.get("arrays") is not None:
+                    self.db.add(self._encode_arrays(simulation.id, data["arrays"]))
+                if data.get("links") is not None:
+                    self.db.add(self._encode_links(simulation.id, data["links"]))
+            
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        for simulation in records:
+            self.db.refresh(simulation)
+        return records
+    
+    async def fail_unfinished(self) -> int:
+        """Mark simulations left pending or running by a previous process as failed"""
+        count = self.db.query(Simulation).filter(
+            Simulation.status.in_(["pending", "running"])
+        ).update({Simulation.status: "failed"}, synchronize_session=False)
+        self.db.commit()
+        return count
+    
+    async def save_result_arrays(self, simulation_id: int, arrays: ResultArrays) -> None:
+        """Store results as one compressed row instead of one row per page"""
+        self.db.merge(self._encode_arrays(simulation_id, arrays))
+        self.db.commit()
+    
+    async def get_result_arrays(self, simulation_id: int) -> Optional[ResultArrays]:
+        """Columnar results, read from legacy per-page rows for older simulations"""
+        simulation_id = self._result_owner(simulation_id)
+        row = self.db.query(SimulationResultArrays).filter(
+            SimulationResultArrays.simulation_id == simulation_id
+        ).first()
+        
+        if row is not None:
+            return ResultArrays(
+                page_ids=decode_array(row.page_ids, PAGE_ID_DTYPE),
+                new_pagerank=decode_array(row.new_pagerank, SCORE_DTYPE),
+                pagerank_delta=decode_array(row.pagerank_delta, SCORE_DTYPE),
+                new_click_depth=decode_array(row.new_click_depth, DEPTH_DTYPE) if row.new_click_depth is not None else None
+            )
+        
+        # Legacy simulations: plain column query, no ORM objects
+        rows = self.db.query(
+            SimulationResult.page_id,
+            SimulationResult.new_pagerank,
+            SimulationResult.pagerank_delta,
+            SimulationResult.new_click_depth
+        ).filter(SimulationResult.simulation_id == simulation_id).all()
+        
+        if not rows:
+            return None
+        
+        page_ids, new_pageranks, deltas, depths = zip(*rows)
+        return ResultArrays.build(
+            page_ids, new_pageranks, deltas,
+            None if any(depth is None for depth in depths) else depths
+        )
+    
+    async def save_links(self, simulation_id: int, links) -> None:
+        """Store the generated links as one compressed int32 pair array"""
+        self.db.merge(self._encode_links(simulation_id, links))
+        self.db.commit()
+    
+    async def get_links(self, simulation_id: int) -> Optional[np.ndarray]:
+        """(m, 2) array of generated (from, to) page ids, None if not stored"""
+        simulation_id = self._result_owner(simulation_id)
+        row = self.db.query(SimulationLinks).filter(
+            SimulationLinks.simulation_id == simulation_id
+        ).first()
+        return decode_links(row.links) if row is not None else None
+    
+    def _encode_links(self, simulation_id: int, links) -> SimulationLinks:
+        return SimulationLinks(
+            simulation_id=simulation_id,
+            n_links=len(links),
+            links=encode_links(links)
+        )
+    
+    def _encode_arrays(self, simulation_id: int, arrays: ResultArrays) -> SimulationResultArrays:
+        return SimulationResultArrays(
+            simulation_id=simulation_id,
+            n_pages=arrays.n_pages,
+            page_ids=encode_array(arrays.page_ids, PAGE_ID_DTYPE),
+            new_pagerank=encode_array(arrays.new_pagerank, SCORE_DTYPE),
+            pagerank_delta=encode_array(arrays.pagerank_delta, SCORE_DTYPE),
+            new_click_depth=encode_array(arrays.new_click_depth, DEPTH_DTYPE) if arrays.new_click_depth is not None else None
+        )
@@ -0,0 +1,198 @@
+import logging
+import time
+import numpy as np
+from typing import Dict, List, Tuple, Any
+from app.repositories.base import ProjectRepository, PageRepository, LinkRepository
+from app.core.pagerank.graph import compile_graph
+from app.core.pagerank.depth import find_root_index
+from app.core.pagerank.diagnostics import diagnose_graph
+from app.core.pagerank.personalized import ReversePushPPR
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class GraphService:
+    """Service layer for structural analysis of a project's link graph"""
+
+    # Per-process report cache: project_id -> (cache key, report).
+    # The key embeds the project's links_version, so any link import invalidates it.
+    _report_cache: Dict[int, Tuple[Tuple, Dict]] = {}
+
+    # Per-process reverse-push index: project_id -> (links_version, page_ids, urls, ReversePushPPR)
+    _ppr_cache: Dict[int, Tuple[int, List[int], List[str], ReversePushPPR]] = {}
+
+    def __init__(self,
+                 project_repo: ProjectRepository,
+                 page_repo: PageRepository,
+                 link_repo: LinkRepository):
+        self.project_repo = project_repo
+        self.page_repo = page_repo
+        self.link_repo = link_repo
+
+    @classmethod
+    def invalidate(cls, project_id: int) -> None:
+        """Drop cached reports for a project (e.g. after PageRank is recalculated)"""
+        cls._report_cache.pop(project_id, None)
+        cls._ppr_cache.pop(project_id, None)
+
+    async def get_diagnostics(self,
+                              project_id: int,
+                              max_trap_size: int = 50,
+                              limit: int = 100) -> Dict:
+        """Get the orphan / dead-end / sink-trap report for a project"""
+
+        project = await self.project_repo.get_by_id(project_id)
+        if not project:
+            raise ValueError("Project not found")
+
+        cache_key = (project.links_version or 0, max_trap_size, limit)
+        cached = self._report_cache.get(project_id)
+        if cached and cached[0] == cache_key:
+            return {**cached[1], "cached": True}
+
+        start_time = time.time()
+
+        pages = await self.page_repo.get_by_project(project_id)
+        links = await self.link_repo.get_by_project(project_id)
+
+        if not pages:
+            raise ValueError("No pages found for this project")
+
+        existing_links = [(link.from_page_id, link.to_page_id) for link in links]
+        graph = compile_graph(pages, existing_links)
+        pagerank = np.array([page.current_pagerank or 0.0 for page in pages])
+
+        diagnostics = diagnose_graph(
+            graph, pagerank,
+            root_idx=find_root_index(pages),
+            max_trap_size=max_trap_size
+        )
+
+        report = {
+            "project_id": project_id,
+            "links_version": project.links_version or 0,
+            "total_pages": graph.n_pages,
+            "total_links": graph.n_links,
+            "strongly_connected_components": diagnostics.n_components,
+            "largest_component_size": diagnostics.largest_component_size,
+            "orphans": {
+                "count": len(diagnostics.orphans),
+                "pagerank_mass": diagnostics.orphan_mass,
+                "pages": self._describe_pages(pages, diagnostics.orphans, limit)
+            },
+            "dead_ends": {
+                "count": len(diagnostics.dead_ends),
+                "pagerank_mass": diagnostics.dead_end_mass,
+                "pages": self._describe_pages(pages, diagnostics.dead_ends, limit)
+            },
+            "sink_traps": {
+                "count": len(diagnostics.sink_traps),
+                "pagerank_mass": diagnostics.trap_mass,
+                "traps": [
+                    {
+                        "size": len(trap.members),
+                        "pagerank_mass": trap.pagerank_mass,
+                        "pages": self._describe_pages(pages, trap.members, limit)
+                    }
+                    for trap in diagnostics.sink_traps[:limit]
+                ]
+            },
+            "computation_time": time.time() - start_time
+        }
+
+        self._report_cache[project_id] = (cache_key, report)
+        return {**report, "cached": False}
+
+    async def get_equity_sources(self,
+                                 project_id: int,
+                                 page_ids: List[int] = None,
+                                 urls: List[str] = None,
+                                 top_k: int = 20,
+                                 epsilon: float = 1e-6) -> Dict:
+        """Top pages feeding PageRank to each target (approximate personalized PageRank)"""
+
+        project = await self.project_repo.get_by_id(project_id)
+        if not project:
+            raise ValueError("Project not found")
+
+        start_time = time.time()
+        links_version = project.links_version or 0
+
+        cached = self._ppr_cache.get(project_id)
+        if cached and cached[0] == links_version:
+            _, all_page_ids, all_urls, ppr = cached
+        else:
+            pages = await self.page_repo.get_by_project(project_id)
+            links = await self.link_repo.get_by_project(project_id)
+            if not pages:
+                raise ValueError("No pages found for this project")
+
+            existing_links = [(link.from_page_id, link.to_page_id) for link in links]
+            graph = compile_graph(pages, existing_links)
+            ppr = ReversePushPPR(graph, damping=settings.PAGERANK_DAMPING)
+            all_page_ids = [page.id for page in pages]
+            all_urls = [page.url for page in pages]
+            self._ppr_cache[project_id] = (links_version, all_page_ids, all_urls, ppr)
+
+        graph = ppr.graph
+        url_to_idx = {url: idx for idx, url in enumerate(all_urls)} if urls else {}
+
+        target_indices = []
+        not_found = []
+        for page_id in page_ids or []:
+            idx = graph.index_of(page_id)
+            if idx is None:
+                not_found.append(page_id)
+            else:
+                target_indices.append(idx)
+        for url in urls or []:
+            idx = url_to_idx.get(url)
+            if idx is None:
+                not_found.append(url)
+            else:
+                target_indices.append(idx)
+
+        if not target_indices:
+            raise ValueError("None of the requested target pages were found in this project")
+
+        n_pages = graph.n_pages
+        results = ppr.batch_contributions(target_indices, r_max=epsilon, top_k=top_k)
+
+        return {
+            "project_id": project_id,
+            "epsilon": epsilon,
+            "targets": [
+                {
+                    "page_id": all_page_ids[res.target_idx],
+                    "url": all_urls[res.target_idx],
+                    "estimated_pagerank": res.total_score / n_pages,
+                    "pages_touched": res.touched,
+                    "pushes": res.pushes,
+                    "sources": [
+                        {
+                            "page_id": all_page_ids[src],
+                            "url": all_urls[src],
+                            "contribution": float(score) / n_pages,
+                            "share": float(score) / res.total_score if res.total_score > 0 else 0.0
+                        }
+                        for src, score in zip(res.sources.tolist(), res.scores)
+                    ]
+                }
+                for res in results
+            ],
+            "not_found": not_found,
+            "computation_time": time.time() - start_time
+        }
+
+    def _describe_pages(self, pages: List[Any], indices: np.ndarray, limit: int) -> List[Dict]:
+        """Page details for the highest-PageRank entries of an index array"""
+        ranked = sorted(indices.tolist(), key=lambda idx: pages[idx].current_pagerank or 0.0, reverse=True)
+        return [
+            {
+                "page_id": pages[idx].id,
+                "url": pages[idx].url,
+                "type": pages[idx].type,
+                "current_pagerank": pages[idx].current_pagerank
+            }
+            for idx in ranked[:limit]
+        ]
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import re
 import html
@@ -5,6 +6,7 @@ from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse, urljoin
 from app.repositories.base import ProjectRepository, PageRepository, LinkRepository
 from app.core.config import settings
+from app.core.edge_set import encode_edges, first_occurrences
 
 class ImportService:
     def __init__(self, 
@@ -228,6 +230,7 @@ class ImportService:
                 "type": page_type,
                 "category": category,
                 "current_pagerank": 0.0,
+                "crawl_depth": self._extract_crawl_depth(row),
                 "extracteur_1": merged_content,
                 "title": title
             }
@@ -240,6 +243,15 @@ class ImportService:
         print(f"Final processing result: {len(pages_data)} unique pages created, {duplicates_skipped} duplicates skipped")
         return pages_data
     
+    def _extract_crawl_depth(self, row: pd.Series) -> Optional[int]:
+        """Extract Screaming Frog crawl depth if the column is present"""
+        if 'crawl_depth' in row.index and pd.notna(row['crawl_depth']):
+            try:
+                return int(row['crawl_depth'])
+            except (TypeError, ValueError):
+                return None
+        return None
+    
     def _classify_page_type(self, url: str) -> str:
         """Classify page type based on URL patterns"""
         url_lower = url.lower()
@@ -279,40 +291,38 @@ class ImportService:
         url_to_id = {page.url: page.id for page in pages}
         
         # Get existing links to avoid duplicates
-        existing_links = await self.link_repo.get_by_project(project_id)
-        existing_links_set = {(link.from_page_id, link.to_page_id) for link in existing_links}
+        existing_links = await self.link_repo.get_edges(project_id)
         
-        links_data = []
-        seen_links = set()
+        source_urls = df['source'] if 'source' in df.columns else df['address']
+        target_urls = df['destination']
         
-        for _, row in df.iterrows():
-            source_url = row['source'] if 'source' in df.columns else row['address']
-            target_url = row['destination']
-            
-            # Skip external links and self-links
-            if not self._is_internal_link(source_url, target_url):
-                continue
-                
-            if source_url == target_url:
-                continue
-            
-            # Get page IDs
-            from_page_id = url_to_id.get(source_url)
-            to_page_id = url_to_id.get(target_url)
-            
-            if from_page_id and to_page_id:
-                link_key = (from_page_id, to_page_id)
-                
-                # Skip if link already exists in DB or in current batch
-                if link_key not in existing_links_set and link_key not in seen_links:
-                    links_data.append({
-                        "project_id": project_id,
-                        "from_page_id": from_page_id,
-                        "to_page_id": to_page_id
-                    })
-                    seen_links.add(link_key)
-        
-        return links_data
+        # Get page IDs (unknown URLs map to NaN)
+        from_page_ids = source_urls.map(url_to_id)
+        to_page_ids = target_urls.map(url_to_id)
+        
+        # Skip unknown pages and self-links, then external links
+        valid = np.flatnonzero((from_page_ids.notna() & to_page_ids.notna() & (source_urls != target_urls)).to_numpy())
+        internal = [
+            self._is_internal_link(source_url, target_url)
+            for source_url, target_url in zip(source_urls.to_numpy()[valid], target_urls.to_numpy()[valid])
+        ]
+        valid = valid[np.asarray(internal, dtype=bool)]
+        from_page_ids = from_page_ids.to_numpy()[valid].astype(np.int64)
+        to_page_ids = to_page_ids.to_numpy()[valid].astype(np.int64)
+        
+        # Skip if link already exists in DB or earlier in the file
+        keys = encode_edges(from_page_ids, to_page_ids)
+        keep = np.flatnonzero(~existing_links.contains_keys(keys))
+        keep = keep[first_occurrences(keys[keep])]
+        
+        return [
+            {
+                "project_id": project_id,
+                "from_page_id": from_page_id,
+                "to_page_id": to_page_id
+            }
+            for from_page_id, to_page_id in zip(from_page_ids[keep].tolist(), to_page_ids[keep].tolist())
+        ]
     
     def _is_internal_link(self, source_url: str, target_url: str) -> bool:
         """Check if target URL is internal to the same domain as source"""
@@ -345,6 +355,7 @@ class ImportService:
             'Type de contenu': 'content_type',
             'Profondeur du dossier': 'folder_depth',
             'Crawl profondeur': 'crawl_depth',
+            'Profondeur de crawl': 'crawl_depth',
             
             # English to lowercase (including common typos)
             'Address': 'address',
@@ -628,39 +639,8 @@ class ImportService:
         if not self._has_link_data(df):
             raise ValueError("DataFrame doesn't contain link data (source/destination columns)")
         
-        # Get existing pages for URL mapping
-        pages = await self.page_repo.get_by_project(project_id)
-        url_to_id = {page.url: page.id for page in pages}
-        
-        # Process links
-        links_data = []
-        existing_links = await self.link_repo.get_by_project(project_id)
-        existing_links_set = {(link.from_page_id, link.to_page_id) for link in existing_links}
-        
-        seen_links = set()
-        
-        for _, row in df.iterrows():
-            source_url = row['source'] if 'source' in df.columns else row['address']
-            target_url = row['destination']
-            
-            # Skip external links and self-links
-            if not self._is_internal_link(source_url, target_url) or source_url == target_url:
-                continue
-            
-            # Get page IDs
-            from_page_id = url_to_id.get(source_url)
-            to_page_id = url_to_id.get(target_url)
-            
-            if from_page_id and to_page_id:
-                link_key = (from_page_id, to_page_id)
-                
-                if link_key not in existing_links_set and link_key not in seen_links:
-                    links_data.append({
-                        "project_id": project_id,
-                        "from_page_id": from_page_id,
-                        "to_page_id": to_page_id
-                    })
-                    seen_links.add(link_key)
+        # Process links (URL mapping, internal links only, new links only)
+        links_data = await self._process_links(df, project_id)
         
         # Bulk insert links
         if links_data:
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.cancellation import cancellation_registry
+from app.core.config import settings
+from app.core.progress import progress_broker, simulation_channel
+from app.db.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _simulator(db):
+    """Simulator on a worker's own DB session"""
+    # Imported here to keep the queue importable without the simulator stack
+    from app.core.simulator import PageRankSimulator
+    from app.core.pagerank.networkx_impl import NetworkXPageRankCalculator
+    from app.repositories.sqlite import (
+        SQLitePageRepository, SQLiteLinkRepository, SQLiteSimulationRepository
+    )
+
+    return PageRankSimulator(
+        SQLitePageRepository(db),
+        SQLiteLinkRepository(db),
+        SQLiteSimulationRepository(db),
+        NetworkXPageRankCalculator()
+    )
+
+
+def _run_simulation_job(simulation_id: int,
+                        project_id: int,
+                        rules_config: List[Dict],
+                        page_boosts: List[Dict],
+                        protected_pages: List[Dict],
+                        time_budget: Optional[float] = None,
+                        seed: Optional[int] = None) -> Dict:
+    """Worker thread entry point: run one simulation with its own DB session"""
+    db = SessionLocal()
+    try:
+        return asyncio.run(_simulator(db).execute_multi_rule_simulation(
+            simulation_id, project_id, rules_config, page_boosts, protected_pages,
+            time_budget=time_budget, seed=seed
+        ))
+    except Exception as e:
+        # The simulator already marked the record as failed; inline callers get the error
+        logger.error(f"❌ Simulation job {simulation_id} failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def _run_simulator_call(method: str, *args, **kwargs):
+    """Worker thread entry point for runs without a queued record (batches, sweeps)"""
+    db = SessionLocal()
+    try:
+        return asyncio.run(getattr(_simulator(db), method)(*args, **kwargs))
+    finally:
+        db.close()
+
+
+class SimulationJobQueue:
+    """
+    Bounded in-process executor for simulation jobs.
+
+    Jobs run in worker threads, each with its own event loop and DB
+    session, so the API keeps serving requests while simulations run.
+    At most max_workers jobs run at once; the rest wait in FIFO order
+    with their Simulation record in status "pending". submit returns the
+    job's future, which inline requests await (see wait_for).
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or settings.SIMULATION_MAX_CONCURRENT_JOBS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queued: List[int] = []
+        self._running: set = set()
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="simulation-job"
+            )
+        return self._executor
+
+    def submit(self,
+               simulation_id: int,
+               project_id: int,
+               rules_config: List[Dict],
+               page_boosts: List[Dict] = None,
+               protected_pages: List[Dict] = None,
+               time_budget: Optional[float] = None,
+               seed: Optional[int] = None) -> Future:
+        """Queue a created simulation record for execution; the future resolves to the run summary"""
+        # Registered now so that a job can be cancelled while it waits
+        cancellation_registry.register(
+            simulation_id, time_budget or settings.SIMULATION_TIME_BUDGET_SECONDS
+        )
+        with self._lock:
+            self._queued.append(simulation_id)
+            progress_broker.publish(
+                simulation_channel(simulation_id), "queued", queue_position=len(self._queued)
+            )
+            future = self._futures[simulation_id] = self._get_executor().submit(
+                self._run, simulation_id, project_id,
+                rules_config, page_boosts or [], protected_pages or [], time_budget, seed
+            )
+        logger.info(f"📥 Simulation {simulation_id} queued "
+                    f"({len(self._running)} running, {len(self._queued)} waiting)")
+        return future
+
+    def _run(self, simulation_id: int, *args) -> Dict:
+        with self._lock:
+            self._queued.remove(simulation_id)
+            self._running.add(simulation_id)
+        try:
+            return _run_simulation_job(simulation_id, *args)
+        finally:
+            with self._lock:
+                self._running.discard(simulation_id)
+                self._futures.pop(simulation_id, None)
+
+    def submit_call(self, method: str, *args, **kwargs) -> Future:
+        """
+        Run a PageRankSimulator coroutine method on a worker.
+
+        Shares the max_workers bound with queued simulations, but has no
+        queue position or record of its own.
+        """
+        return self._get_executor().submit(_run_simulator_call, method, *args, **kwargs)
+
+    @staticmethod
+    async def wait_for(future: Future):
+        """
+        Result of a job, awaited without blocking the event loop.
+
+        Shielded so that a client disconnecting from an inline request
+        leaves the job running, like a queued one.
+        """
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def cancel(self, simulation_id: int) -> bool:
+        """Drop a job that has not started yet; False if it is running or unknown"""
+        with self._lock:
+            future = self._futures.get(simulation_id)
+            if future is None or not future.cancel():
+                return False
+            self._futures.pop(simulation_id, None)
+            self._queued.remove(simulation_id)
+        cancellation_registry.release(simulation_id)
+        progress_broker.publish(simulation_channel(simulation_id), "cancelled", reason="cancelled")
+        return True
+
+    def get_job_info(self, simulation_id: int) -> Dict:
+        """Queue state of a simulation (position is 1-based, None when not waiting)"""
+        with self._lock:
+            position = self._queued.index(simulation_id) + 1 if simulation_id in self._queued else None
+            return {
+                "queued": position is not None,
+                "queue_position": position,
+                "running": simulation_id in self._running,
+                "running_jobs": len(self._running),
+                "waiting_jobs": len(self._queued)
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting jobs (waiting jobs are dropped unless wait=True)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+# Process-wide queue shared by all requests
+job_queue = SimulationJobQueue()
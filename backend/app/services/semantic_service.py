@@ -5,6 +5,7 @@ import logging
 from sentence_transformers import SentenceTransformer
 from app.models.page import Page
 from app.repositories.base import PageRepository
+from app.core.semantic_index import SemanticIndex, embeddings_fingerprint
 import sqlite3
 from app.core.config import settings
 import os
@@ -130,6 +131,80 @@ class SemanticService:
             # Return zero vector as fallback
             return np.zeros(768)  # Standard embedding size
     
+    async def get_cached_embeddings(self,
+                                    content_hashes: Dict[int, str],
+                                    load_vectors: bool = True) -> Dict[int, Optional[np.ndarray]]:
+        """
+        Cached embeddings matching the given content hashes, without loading
+        the model. With load_vectors=False only the keys are read (values are None).
+        """
+        embeddings = {}
+        page_ids = list(content_hashes)
+        column = "embedding" if load_vectors else "NULL"
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            # Chunked to stay under SQLite's variable limit
+            for start in range(0, len(page_ids), 500):
+                chunk = page_ids[start:start + 500]
+                cursor.execute(f"""
+                    SELECT page_id, content_hash, {column} FROM page_embeddings 
+                    WHERE page_id IN ({",".join("?" * len(chunk))})
+                """, chunk)
+                for page_id, content_hash, embedding in cursor.fetchall():
+                    if content_hashes.get(page_id) == content_hash:
+                        embeddings[page_id] = np.frombuffer(embedding, dtype=np.float32) if load_vectors else None
+            
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error retrieving cached embeddings: {e}")
+        
+        return embeddings
+    
+    async def get_embeddings_fingerprint(self, pages: List[Page]) -> Optional[str]:
+        """Fingerprint of the cached embeddings a semantic rule would use (None when there are none)"""
+        return (await self._cached_embeddings_fingerprint(pages))[2]
+    
+    async def _cached_embeddings_fingerprint(self, pages: List[Page]) -> Tuple[Dict[int, str], Dict, Optional[str]]:
+        """Content hash of every page, the pages with a cached embedding and their fingerprint"""
+        content_hashes = {page.id: self._get_content_hash(self.extract_content(page)) for page in pages}
+        cached = await self.get_cached_embeddings(content_hashes, load_vectors=False)
+        if not cached:
+            return content_hashes, cached, None
+        return content_hashes, cached, embeddings_fingerprint((page_id, content_hashes[page_id]) for page_id in cached)
+    
+    async def get_semantic_index(self, project_id: int, pages: List[Page]) -> Optional[SemanticIndex]:
+        """
+        Nearest-neighbour index over the project's cached embeddings.
+        
+        The stored index is reused while the pages and their content are
+        unchanged, otherwise it is rebuilt and stored. Only embeddings
+        already in the cache are indexed (the model is not loaded during a
+        simulation); None when no page has one.
+        """
+        content_hashes, cached, fingerprint = await self._cached_embeddings_fingerprint(pages)
+        if not cached:
+            logger.info("No cached embeddings: semantic selection falls back to categories")
+            return None
+        
+        record = await self.page_repo.get_embedding_index(project_id)
+        if record is not None and record["fingerprint"] == fingerprint:
+            return SemanticIndex.from_record(record, n_probe=settings.SEMANTIC_INDEX_PROBES)
+        
+        logger.info(f"Building semantic index for {len(cached)} pages...")
+        embeddings = await self.get_cached_embeddings({page_id: content_hashes[page_id] for page_id in cached})
+        page_ids = sorted(embeddings)
+        index = SemanticIndex.build(
+            page_ids,
+            np.stack([embeddings[page_id] for page_id in page_ids]),
+            fingerprint=fingerprint,
+            ivf_min_pages=settings.SEMANTIC_INDEX_IVF_MIN_PAGES,
+            n_probe=settings.SEMANTIC_INDEX_PROBES
+        )
+        await self.page_repo.save_embedding_index(project_id, index.to_record())
+        return index
+    
     async def get_embeddings_batch(self, pages: List[Page], batch_size: int = 50) -> Dict[int, np.ndarray]:
         """Get embeddings for multiple pages in batches"""
         embeddings = {}
@@ -1,8 +1,18 @@
-from typing import Dict, List
+import asyncio
+import logging
+from typing import Dict, List, Optional
 from app.core.simulator import PageRankSimulator
 from app.repositories.base import PageRepository, LinkRepository, SimulationRepository, ProjectRepository
 from app.core.pagerank.networkx_impl import NetworkXPageRankCalculator
-from app.api.v1.schemas.simulation import LinkingRule, PageBoost, PageProtect
+from app.api.v1.schemas.simulation import LinkingRule, PageBoost, PageProtect, SimulationCreate, SimulationSweepRequest
+from app.core.config import settings
+from app.services.job_queue import job_queue
+from app.core.cancellation import cancellation_registry
+from app.core.simulation_cache import resolve_seed_and_key
+from app.services.semantic_service import SemanticService
+from app.core.result_arrays import SORT_KEYS
+
+logger = logging.getLogger(__name__)
 
 class SimulationService:
     """Service layer for simulation operations"""
@@ -28,7 +38,9 @@ class SimulationService:
                                simulation_name: str,
                                rules: List[LinkingRule],
                                page_boosts: List[PageBoost] = None,
-                               protected_pages: List[PageProtect] = None) -> Dict:
+                               protected_pages: List[PageProtect] = None,
+                               time_budget: float = None,
+                               seed: int = None) -> Dict:
         """Create and run a new simulation with multiple rules"""
         
         # Validate project exists
@@ -49,12 +61,252 @@ class SimulationService:
         if protected_pages:
             protected_pages_config = [protect.model_dump() for protect in protected_pages]
         
-        # Run simulation using the multi-rule approach with page boosts and protection
-        result = await self.simulator.run_multi_rule_simulation(
-            project_id, simulation_name, rules_config, page_boosts_config, protected_pages_config
+        # Identical request on the same graph: reuse the stored results
+        seed, cache_key = await self._resolve_seed_and_key(
+            project, rules_config, page_boosts_config, protected_pages_config, seed
         )
+        cached = await self._create_from_cache(project_id, cache_key, simulation_name)
+        if cached:
+            return cached
         
-        return result
+        # Run on a job-queue worker and wait for it there, so the event loop
+        # keeps serving status, events and cancel requests meanwhile
+        simulation = await self.simulation_repo.create(
+            project_id, simulation_name, rules_config, page_boosts_config, protected_pages_config,
+            seed=seed, cache_key=cache_key
+        )
+        job = job_queue.submit(
+            simulation.id, project_id, rules_config, page_boosts_config, protected_pages_config,
+            time_budget=time_budget, seed=seed
+        )
+        try:
+            result = await job_queue.wait_for(job)
+        except asyncio.CancelledError:
+            if not job.cancelled():
+                raise
+            # Cancelled (POST /simulations/{id}/cancel) before a worker picked it up
+            result = {
+                "simulation_id": simulation.id,
+                "status": "cancelled",
+                "summary": None,
+                "new_links_count": 0,
+                "solver_stats": {"stopped": "cancelled"}
+            }
+        
+        return {**result, "cache_hit": False}
+    
+    async def enqueue_simulation(self,
+                                 project_id: int,
+                                 simulation_name: str,
+                                 rules: List[LinkingRule],
+                                 page_boosts: List[PageBoost] = None,
+                                 protected_pages: List[PageProtect] = None,
+                                 time_budget: float = None,
+                                 seed: int = None) -> Dict:
+        """Create a pending simulation and hand it to the job queue"""
+        
+        # Validate project exists
+        project = await self.project_repo.get_by_id(project_id)
+        if not project:
+            raise ValueError("Project not found")
+        
+        rules_config = [rule.model_dump() for rule in rules]
+        page_boosts_config = [boost.model_dump() for boost in page_boosts or []]
+        protected_pages_config = [protect.model_dump() for protect in protected_pages or []]
+        
+        # Identical request on the same graph: completed at once, nothing to queue
+        seed, cache_key = await self._resolve_seed_and_key(
+            project, rules_config, page_boosts_config, protected_pages_config, seed
+        )
+        cached = await self._create_from_cache(project_id, cache_key, simulation_name)
+        if cached:
+            return {**cached, **job_queue.get_job_info(cached["simulation_id"])}
+        
+        simulation = await self.simulation_repo.create(
+            project_id, simulation_name, rules_config, page_boosts_config, protected_pages_config,
+            seed=seed, cache_key=cache_key
+        )
+        job_queue.submit(
+            simulation.id, project_id, rules_config, page_boosts_config, protected_pages_config,
+            time_budget=time_budget, seed=seed
+        )
+        
+        return {
+            "simulation_id": simulation.id,
+            "status": "pending",
+            "cache_hit": False,
+            **job_queue.get_job_info(simulation.id)
+        }
+    
+    async def _resolve_seed_and_key(self,
+                                    project,
+                                    rules_config: List[Dict],
+                                    page_boosts_config: List[Dict],
+                                    protected_pages_config: List[Dict],
+                                    seed: Optional[int]):
+        """Seed and cache key of a request, with the embeddings fingerprint when a rule is semantic"""
+        fingerprint = None
+        if any(rule.get('selection_method') == 'semantic' for rule in rules_config):
+            pages = await self.page_repo.get_by_project(project.id)
+            fingerprint = await SemanticService(self.page_repo).get_embeddings_fingerprint(pages)
+        return resolve_seed_and_key(
+            project, rules_config, page_boosts_config, protected_pages_config, seed,
+            embeddings_fingerprint=fingerprint
+        )
+    
+    async def _create_from_cache(self, project_id: int, cache_key: str, simulation_name: str) -> Optional[Dict]:
+        """New simulation record referencing the results of an identical completed run"""
+        if not settings.SIMULATION_CACHE_ENABLED:
+            return None
+        
+        source = await self.simulation_repo.find_cached(project_id, cache_key)
+        if source is None:
+            return None
+        
+        simulation = await self.simulation_repo.create_from_cache(source, simulation_name)
+        logger.info(f"♻️  Simulation {simulation.id} reuses the results of simulation {source.id}")
+        summary = source.summary or {}
+        return {
+            "simulation_id": simulation.id,
+            "status": "completed",
+            "summary": source.summary,
+            "new_links_count": summary.get("new_links_added", 0),
+            "solver_stats": source.solver_stats,
+            "cache_hit": True,
+            "cache_source_id": source.id
+        }
+    
+    async def get_simulation_status(self, simulation_id: int) -> Dict:
+        """Lightweight status for polling, without loading results"""
+        simulation = await self.simulation_repo.get_by_id(simulation_id)
+        if not simulation:
+            raise ValueError("Simulation not found")
+        
+        return {
+            "simulation_id": simulation.id,
+            "status": simulation.status,
+            "created_at": simulation.created_at,
+            "updated_at": simulation.updated_at,
+            **job_queue.get_job_info(simulation.id)
+        }
+    
+    async def cancel_simulation(self, simulation_id: int) -> Dict:
+        """Cancel a queued simulation or ask a running one to stop"""
+        simulation = await self.simulation_repo.get_by_id(simulation_id)
+        if not simulation:
+            raise LookupError("Simulation not found")
+        
+        if simulation.status not in ("pending", "running"):
+            raise ValueError(f"Simulation is already {simulation.status}")
+        
+        # Not started yet: drop it from the queue
+        if job_queue.cancel(simulation_id):
+            await self.simulation_repo.update_status(simulation_id, "cancelled")
+            return {"simulation_id": simulation_id, "status": "cancelled"}
+        
+        # Running: the solver stops at its next check and keeps its best-so-far vector
+        token = cancellation_registry.get(simulation_id)
+        if token is None:
+            # Left over from a previous process
+            await self.simulation_repo.update_status(simulation_id, "cancelled")
+            return {"simulation_id": simulation_id, "status": "cancelled"}
+        
+        token.cancel()
+        return {"simulation_id": simulation_id, "status": "cancelling"}
+    
+    async def create_batch_simulation(self,
+                                      project_id: int,
+                                      scenarios: List[SimulationCreate]) -> Dict:
+        """Create and run several simulations sharing one graph load"""
+        
+        # Validate project exists
+        project = await self.project_repo.get_by_id(project_id)
+        if not project:
+            raise ValueError("Project not found")
+        
+        if not scenarios:
+            raise ValueError("At least one scenario is required")
+        
+        if len(scenarios) > settings.MAX_BATCH_SCENARIOS:
+            raise ValueError(f"Too many scenarios: {len(scenarios)}. Maximum allowed: {settings.MAX_BATCH_SCENARIOS}")
+        
+        # Link generation and solves run on a job-queue worker, off the event loop
+        job = job_queue.submit_call("run_batch_simulation", project_id, [
+            {
+                "name": scenario.name,
+                "rules_config": [rule.model_dump() for rule in scenario.rules],
+                "page_boosts": [boost.model_dump() for boost in scenario.page_boosts],
+                "protected_pages": [protect.model_dump() for protect in scenario.protected_pages],
+                "seed": scenario.seed
+            }
+            for scenario in scenarios
+        ])
+        return await job_queue.wait_for(job)
+    
+    async def run_parameter_sweep(self,
+                                  project_id: int,
+                                  sweep: SimulationSweepRequest) -> Dict:
+        """Solve a links_per_page / damping / budget grid sharing one graph load"""
+        
+        # Validate project exists
+        project = await self.project_repo.get_by_id(project_id)
+        if not project:
+            raise ValueError("Project not found")
+        
+        if not sweep.links_per_page or min(sweep.links_per_page) < 1:
+            raise ValueError("links_per_page values must be positive")
+        
+        # Selection and one solve per grid point run on a job-queue worker, off the event loop
+        job = job_queue.submit_call(
+            "run_parameter_sweep",
+            project_id,
+            [rule.model_dump() for rule in sweep.rules],
+            page_boosts=[boost.model_dump() for boost in sweep.page_boosts],
+            protected_pages=[protect.model_dump() for protect in sweep.protected_pages],
+            links_per_page_values=sweep.links_per_page,
+            damping_values=sweep.damping,
+            eta_boost_values=sweep.eta_boost,
+            eta_protect_values=sweep.eta_protect,
+            seed=sweep.seed
+        )
+        return await job_queue.wait_for(job)
+    
+    async def get_top_results(self,
+                              simulation_id: int,
+                              sort_by: str = "pagerank_delta",
+                              k: int = 50,
+                              descending: bool = True) -> Dict:
+        """Top-k pages of a simulation by new PageRank, delta or percent change"""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_by}")
+        return await self.simulator.get_top_results(simulation_id, sort_by, k, descending)
+    
+    async def get_results_page(self,
+                               simulation_id: int,
+                               sort_by: str = "pagerank_delta",
+                               descending: bool = True,
+                               limit: int = 100,
+                               page_type: str = None,
+                               category: str = None,
+                               url_contains: str = None,
+                               cursor: str = None) -> Dict:
+        """Sorted, filtered and cursor-paginated results of a simulation"""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_by}")
+        return await self.simulator.get_results_page(
+            simulation_id, sort_by, descending, limit,
+            page_type=page_type, category=category, url_contains=url_contains, cursor=cursor
+        )
+    
+    async def compare_simulations(self,
+                                  simulation_id_a: int,
+                                  simulation_id_b: int,
+                                  top_n: int = 1000,
+                                  limit: int = 50) -> Dict:
+        """Per-page differences, rank correlation and category aggregates of two simulations"""
+        if simulation_id_a == simulation_id_b:
+            raise ValueError("Cannot compare a simulation with itself")
+        return await self.simulator.compare_simulations(simulation_id_a, simulation_id_b, top_n, limit)
     
     async def get_simulation(self, simulation_id: int) -> Dict:
         """Get simulation details and results"""
@@ -105,6 +357,8 @@ class SimulationService:
                 "rules": rules,
                 "page_boosts": page_boosts,
                 "protected_pages": protected_pages,
+                "seed": getattr(sim, 'seed', None),
+                "cache_source_id": getattr(sim, 'cache_source_id', None),
                 "created_at": sim.created_at
             })
         
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Link generation benchmark: sequential MultiRule vs source partitions on a process pool.
+
+Builds a synthetic catalog, generates the links of a few rules both ways
+and checks that the parallel run returns exactly the sequential links.
+
+    python benchmarks/bench_link_generation.py --pages 100000 --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.edge_set import EdgeSet
+from app.core.page_index import PageIndex
+from app.core.rules.multi_rule import MultiRule
+from app.core.simulator import PageRankSimulator
+
+RULES = [
+    {'source_types': ['product'], 'target_types': ['product'],
+     'selection_method': 'category', 'links_per_page': 5, 'bidirectional': True},
+    {'source_types': ['product'], 'target_types': ['category'],
+     'selection_method': 'pagerank_high', 'pagerank_top_n': 50, 'links_per_page': 2},
+    {'source_types': ['category'], 'target_types': ['product'],
+     'selection_method': 'random', 'links_per_page': 10},
+]
+
+
+def create_catalog(n_pages: int, n_categories: int = 200, links_per_page: int = 8, seed: int = 0):
+    """Pages (one in ten is a category page) and random existing links"""
+    rng = np.random.default_rng(seed)
+    pagerank = rng.random(n_pages)
+    pages = [
+        SimpleNamespace(id=i + 1, url=f"https://ex.com/c{i % n_categories}/p{i + 1}",
+                        type='category' if i % 10 == 0 else 'product',
+                        category=f"/c{i % n_categories}/", current_pagerank=float(pagerank[i]))
+        for i in range(n_pages)
+    ]
+    from_ids = np.repeat(np.arange(1, n_pages + 1), links_per_page)
+    to_ids = rng.integers(1, n_pages + 1, len(from_ids))
+    return pages, EdgeSet.from_arrays(from_ids, to_ids)
+
+
+async def run(n_pages: int, workers: int, seed: int) -> None:
+    pages, existing_edges = create_catalog(n_pages)
+    index = PageIndex(pages)
+    simulator = PageRankSimulator(None, None, None, None)
+    print(f"{n_pages} pages, {len(existing_edges)} existing links, {len(RULES)} rules")
+
+    start = time.perf_counter()
+    multi_rule = MultiRule(RULES, seed=seed)
+    sequential = multi_rule.merge_selections(existing_edges, multi_rule.select_links(index, existing_edges))
+    sequential_time = time.perf_counter() - start
+    print(f"sequential:  {sequential_time:7.2f}s  {len(sequential)} links")
+
+    settings.LINK_GENERATION_WORKERS = workers
+    settings.LINK_GENERATION_PARALLEL_MIN_SOURCES = 0
+    start = time.perf_counter()
+    multi_rule = MultiRule(RULES, seed=seed)
+    parallel = multi_rule.merge_selections(existing_edges, await simulator._select_links(index, existing_edges, multi_rule))
+    parallel_time = time.perf_counter() - start
+    print(f"{workers} workers:   {parallel_time:7.2f}s  {len(parallel)} links  "
+          f"(x{sequential_time / parallel_time:.2f})")
+
+    assert parallel == sequential, "parallel links differ from the sequential run"
+    print("✅ identical links")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.pages, args.workers, args.seed))
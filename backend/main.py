@@ -3,9 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from app.api.v1 import api_router
-from app.db.base import engine, Base
+from app.db.base import engine, Base, SessionLocal
+from app.repositories.sqlite import SQLiteSimulationRepository
+from app.services.job_queue import job_queue
 from app.models import *  # Import all models to register them
 from logging_config import setup_logging
+import logging
 import os
 
 # Setup logging for large dataset processing
@@ -36,6 +39,21 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def recover_simulation_jobs():
+    # Jobs queued by a previous process are lost with it
+    db = SessionLocal()
+    try:
+        count = await SQLiteSimulationRepository(db).fail_unfinished()
+        if count:
+            logging.getLogger(__name__).warning(f"⚠️  Marked {count} interrupted simulations as failed")
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+async def stop_simulation_jobs():
+    job_queue.shutdown(wait=False)
+
 # Serve static files (built frontend)
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 if os.path.exists(static_dir):
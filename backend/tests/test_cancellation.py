@@ -0,0 +1,55 @@
+import pytest
+import time
+from app.core.cancellation import CancellationToken, SimulationCancelled
+from app.core.pagerank.networkx_impl import NetworkXPageRankCalculator
+from app.core.rules.multi_rule import MultiRule
+
+def create_pages(n=50):
+    return [{'id': i, 'type': 'product', 'category': '/a/', 'current_pagerank': 0.0} for i in range(n)]
+
+def test_token_reasons():
+    """Test cancel and time budget stop reasons"""
+    token = CancellationToken(time_budget=0.01)
+    assert token.reason is None
+    
+    # The budget only runs once started
+    time.sleep(0.02)
+    assert token.reason is None
+    token.start()
+    time.sleep(0.02)
+    assert token.reason == "timeout"
+    
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(SimulationCancelled) as exc:
+        token.raise_if_stopped()
+    assert exc.value.reason == "cancelled"
+
+@pytest.mark.asyncio
+async def test_sparse_solver_returns_best_so_far_when_cancelled():
+    """Test that a stopped power iteration returns a vector and its residual"""
+    pages = create_pages()
+    links = [(i, (i + 1) % 50) for i in range(50)] + [(i, (i * 7) % 50) for i in range(50) if (i * 7) % 50 != i]
+    
+    token = CancellationToken()
+    token.cancel()
+    
+    calculator = NetworkXPageRankCalculator()
+    result = await calculator._calculate_with_sparse_matrix(
+        pages, links, 0.85, 100, 1e-12, None, cancel_token=token
+    )
+    
+    assert len(result) == 50
+    assert calculator.last_run_stats["stopped"] == "cancelled"
+    assert calculator.last_run_stats["iterations"] == 1
+    assert calculator.last_run_stats["converged"] is False
+    assert calculator.last_run_stats["residual"] is not None
+
+def test_multi_rule_stops_when_cancelled():
+    """Test that link generation raises once the token is stopped"""
+    token = CancellationToken()
+    token.cancel()
+    
+    rules = [{'source_types': [], 'target_types': [], 'selection_method': 'random', 'links_per_page': 2}]
+    with pytest.raises(SimulationCancelled):
+        MultiRule(rules, cancel_token=token).generate_links(create_pages(), [])
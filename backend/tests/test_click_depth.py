@@ -0,0 +1,50 @@
+import numpy as np
+from app.core.pagerank.graph import compile_graph
+from app.core.pagerank.depth import find_root_index, compute_click_depth, UNREACHABLE_DEPTH
+
+def create_pages():
+    """Homepage -> category -> product chain plus an orphan page"""
+    return [
+        {'id': 10, 'url': 'https://example.com/category/'},
+        {'id': 11, 'url': 'https://example.com/'},
+        {'id': 12, 'url': 'https://example.com/category/product'},
+        {'id': 13, 'url': 'https://example.com/orphan'},
+    ]
+
+def test_find_root_index():
+    """Homepage is detected from its URL path"""
+    assert find_root_index(create_pages()) == 1
+
+def test_click_depth_baseline():
+    """Depth follows the shortest click path, orphans are unreachable"""
+    pages = create_pages()
+    graph = compile_graph(pages, [(11, 10), (10, 12), (12, 11)])
+    
+    depths = compute_click_depth(graph, find_root_index(pages))
+    
+    assert depths.tolist() == [1, 0, 2, UNREACHABLE_DEPTH]
+    assert depths.dtype == np.int16
+
+def test_click_depth_with_simulated_links():
+    """Adding a menu link reduces depth without mutating the baseline graph"""
+    pages = create_pages()
+    graph = compile_graph(pages, [(11, 10), (10, 12)])
+    
+    augmented = graph.with_links([(11, 12), (11, 13), (999, 12)])
+    depths = compute_click_depth(augmented, 1)
+    
+    assert depths.tolist() == [1, 0, 1, 1]
+    assert graph.n_links == 2
+    assert augmented.n_links == 4
+
+def test_click_depth_with_removed_links():
+    """Removing a menu link deepens or orphans pages without mutating the baseline graph"""
+    pages = create_pages()
+    graph = compile_graph(pages, [(11, 10), (10, 12), (11, 12), (12, 11)])
+    
+    pruned = graph.without_links(np.array([[11, 12], [10, 12], [999, 12]]))
+    
+    assert compute_click_depth(pruned, 1).tolist() == [1, 0, UNREACHABLE_DEPTH, UNREACHABLE_DEPTH]
+    assert graph.n_links == 4
+    assert pruned.n_links == 2
+    assert graph.without_links([]) is graph
@@ -0,0 +1,36 @@
+import numpy as np
+from app.core.result_arrays import ResultArrays
+from app.core.comparison import compare_results, rank_correlation
+
+def create_arrays(page_ids, new_pagerank, deltas):
+    return ResultArrays.build(page_ids, new_pagerank, deltas, None)
+
+def test_compare_aligns_on_page_ids():
+    """Test that pages are matched by id, whatever their order in each simulation"""
+    a = create_arrays([1, 2, 3, 4], [0.1, 0.2, 0.3, 0.4], [0.01, -0.01, 0.02, 0.0])
+    b = create_arrays([4, 3, 2, 5], [0.5, 0.25, 0.2, 0.05], [0.1, -0.03, -0.01, 0.0])
+    
+    comparison = compare_results(a, b, categories=["x", "y", "x", None], limit=10)
+    
+    assert comparison["common_pages"] == 3
+    assert comparison["differences"]["pages_higher_in_b"] == 1  # Page 4
+    assert comparison["differences"]["pages_higher_in_a"] == 1  # Page 3
+    assert comparison["differences"]["pages_equal"] == 1  # Page 2
+    assert comparison["pages_gaining_in_a_losing_in_b"] == 1
+    assert [row["page_id"] for row in comparison["divergent_pages"]] == [3]
+    assert comparison["largest_differences"][0]["page_id"] == 4
+    assert comparison["by_category"]["x"]["pages"] == 1
+    assert comparison["by_category"][""]["pages"] == 1
+
+def test_rank_correlation_bounds():
+    """Test identical rankings correlate perfectly and reversed ones negatively"""
+    values = np.linspace(0.1, 1.0, 50)
+    
+    same = rank_correlation(values, values * 2, top_n=20)
+    assert np.isclose(same["spearman"], 1.0) and np.isclose(same["kendall"], 1.0)
+    assert same["top_n_overlap"] == 1.0
+    
+    reversed_ranking = rank_correlation(values, values[::-1].copy(), top_n=50)
+    assert np.isclose(reversed_ranking["spearman"], -1.0)
+    
+    assert rank_correlation(np.ones(5), np.arange(5.0), top_n=5)["spearman"] is None
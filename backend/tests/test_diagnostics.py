@@ -0,0 +1,32 @@
+import numpy as np
+from app.core.pagerank.graph import compile_graph
+from app.core.pagerank.diagnostics import diagnose_graph
+
+def test_diagnostics_flags_orphans_dead_ends_and_traps():
+    """Detect each structural problem on a small graph"""
+    pages = [{'id': i} for i in range(1, 7)]
+    links = [
+        (1, 2), (2, 1),  # Main component
+        (1, 3),          # 3 is a dead end
+        (2, 4), (4, 5), (5, 4),  # 4 <-> 5 trap PageRank
+    ]                    # 6 is an orphan (and a dead end)
+    graph = compile_graph(pages, links)
+    pagerank = np.array([0.2, 0.2, 0.1, 0.2, 0.25, 0.05])
+    
+    diagnostics = diagnose_graph(graph, pagerank, root_idx=0)
+    
+    assert graph.page_ids[diagnostics.orphans].tolist() == [6]
+    assert graph.page_ids[diagnostics.dead_ends].tolist() == [3, 6]
+    assert len(diagnostics.sink_traps) == 1
+    assert sorted(graph.page_ids[diagnostics.sink_traps[0].members].tolist()) == [4, 5]
+    assert abs(diagnostics.trap_mass - 0.45) < 1e-12
+
+def test_diagnostics_ignores_large_components():
+    """The site's giant component is not reported as a trap"""
+    pages = [{'id': i} for i in range(1, 4)]
+    graph = compile_graph(pages, [(1, 2), (2, 3), (3, 1)])
+    
+    diagnostics = diagnose_graph(graph, np.full(3, 1 / 3), max_trap_size=2)
+    
+    assert diagnostics.sink_traps == []
+    assert len(diagnostics.orphans) == 0
@@ -0,0 +1,38 @@
+import numpy as np
+from app.core.edge_set import EdgeSet, decode_keys, encode_edges, first_occurrences
+
+def test_encode_decode_roundtrip():
+    """Test that edge keys decode to the original page ids"""
+    from_ids = np.array([1, 2, 70000, 2**31 - 1])
+    to_ids = np.array([2**31 - 1, 5, 3, 0])
+
+    decoded_from, decoded_to = decode_keys(encode_edges(from_ids, to_ids))
+
+    assert np.array_equal(decoded_from, from_ids)
+    assert np.array_equal(decoded_to, to_ids)
+
+def test_membership():
+    """Test single and vectorized membership, in both directions"""
+    edges = EdgeSet.from_links([(1, 2), (2, 3), (1, 2)])
+
+    assert len(edges) == 2
+    assert (1, 2) in edges and (2, 3) in edges
+    assert (2, 1) not in edges and (9, 9) not in edges
+    assert edges.contains([1, 2, 3], [2, 1, 4]).tolist() == [True, False, False]
+    assert EdgeSet().contains([1], [2]).tolist() == [False]
+
+def test_union_and_difference():
+    """Test that set operations keep keys sorted and unique"""
+    a = EdgeSet.from_links([(1, 2), (2, 3)])
+    b = EdgeSet.from_links([(2, 3), (3, 1)])
+
+    assert a.union(b).to_links() == [(1, 2), (2, 3), (3, 1)]
+    assert a.difference(b).to_links() == [(1, 2)]
+    assert a.to_array().tolist() == [[1, 2], [2, 3]]
+
+def test_first_occurrences_keeps_order():
+    """Test that duplicates are dropped after their first position"""
+    keys = encode_edges([3, 1, 3, 2, 1], [1, 2, 1, 2, 2])
+
+    assert first_occurrences(keys).tolist() == [True, True, False, True, False]
+    assert first_occurrences(np.empty(0, dtype=np.int64)).tolist() == []
@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+import threading
+import time
+from app.core.cancellation import cancellation_registry
+from app.core.progress import ProgressReporter, progress_broker, simulation_channel, sse_events
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import SimulationJobQueue
+
+async def create_inline_service(monkeypatch, fake_job):
+    """Simulation service on an in-memory database whose queue runs fake_job"""
+    # The API package first: importing the service module alone is circular
+    import app.api.v1.schemas.simulation  # noqa: F401
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.base import Base
+    from app.repositories.sqlite import (
+        SQLiteProjectRepository, SQLitePageRepository, SQLiteLinkRepository, SQLiteSimulationRepository
+    )
+    from app.services import simulation_service as simulation_service_module
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    queue = SimulationJobQueue(max_workers=1)
+    monkeypatch.setattr(job_queue_module, "_run_simulation_job", fake_job)
+    monkeypatch.setattr(simulation_service_module, "job_queue", queue)
+    
+    service = simulation_service_module.SimulationService(
+        SQLiteProjectRepository(db), SQLitePageRepository(db), SQLiteLinkRepository(db), SQLiteSimulationRepository(db)
+    )
+    project = await service.project_repo.create("demo", "https://ex.com")
+    return service, queue, project.id
+
+async def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+def create_rules():
+    from app.api.v1.schemas.simulation import LinkingRule
+    return [LinkingRule(source_types=["product"], target_types=["category"], selection_method="random")]
+
+def test_job_queue_bounds_concurrency(monkeypatch):
+    """Test that jobs beyond max_workers wait in FIFO order"""
+    release = threading.Event()
+    started = []
+    
+    def fake_job(simulation_id, *args):
+        started.append(simulation_id)
+        release.wait(timeout=5)
+    
+    monkeypatch.setattr(job_queue_module, "_run_simulation_job", fake_job)
+    
+    queue = SimulationJobQueue(max_workers=1)
+    queue.submit(1, 10, [])
+    queue.submit(2, 10, [])
+    queue.submit(3, 10, [])
+    
+    # Wait for the first job to be picked up
+    for _ in range(100):
+        if started:
+            break
+        threading.Event().wait(0.01)
+    
+    assert queue.get_job_info(1)["running"]
+    assert queue.get_job_info(2)["queue_position"] == 1
+    assert queue.get_job_info(3)["queue_position"] == 2
+    
+    release.set()
+    queue.shutdown(wait=True)
+    
+    assert started == [1, 2, 3]
+    assert queue.get_job_info(3) == {
+        "queued": False, "queue_position": None, "running": False,
+        "running_jobs": 0, "waiting_jobs": 0
+    }
+
+@pytest.mark.asyncio
+async def test_inline_callers_await_job_result(monkeypatch):
+    """Test that submit hands back the job's summary, or its error, to an awaiting request"""
+    def fake_job(simulation_id, *args):
+        if simulation_id == 2:
+            raise ValueError("No pages found for this project")
+        return {"simulation_id": simulation_id, "status": "completed"}
+    
+    monkeypatch.setattr(job_queue_module, "_run_simulation_job", fake_job)
+    queue = SimulationJobQueue(max_workers=1)
+    
+    assert await queue.wait_for(queue.submit(1, 10, [])) == {"simulation_id": 1, "status": "completed"}
+    with pytest.raises(ValueError):
+        await queue.wait_for(queue.submit(2, 10, []))
+    
+    queue.shutdown(wait=True)
+
+@pytest.mark.asyncio
+async def test_inline_simulation_can_be_cancelled(monkeypatch):
+    """Test that cancel reaches inline runs while they wait, whether running or still queued"""
+    pytest.importorskip("sentence_transformers")
+    
+    def fake_job(simulation_id, *args):
+        # Runs until cancelled, like a solve checking its token
+        token = cancellation_registry.get(simulation_id)
+        for _ in range(500):
+            if token.should_stop():
+                break
+            time.sleep(0.01)
+        return {"simulation_id": simulation_id, "status": "partial", "summary": {},
+                "new_links_count": 0, "solver_stats": {"stopped": token.reason}}
+    
+    service, queue, project_id = await create_inline_service(monkeypatch, fake_job)
+    running = asyncio.create_task(service.create_simulation(project_id, "running", create_rules(), seed=1))
+    await wait_until(lambda: queue.get_job_info(1)["running"])
+    queued = asyncio.create_task(service.create_simulation(project_id, "queued", create_rules(), seed=2))
+    await wait_until(lambda: queue.get_job_info(2)["queued"])
+    
+    assert (await service.cancel_simulation(2))["status"] == "cancelled"
+    assert (await service.cancel_simulation(1))["status"] == "cancelling"
+    
+    queued_result = await asyncio.wait_for(queued, 5)
+    running_result = await asyncio.wait_for(running, 5)
+    assert queued_result["status"] == "cancelled" and queued_result["simulation_id"] == 2
+    assert running_result["status"] == "partial"
+    assert running_result["solver_stats"] == {"stopped": "cancelled"}
+    
+    queue.shutdown(wait=True)
+
+@pytest.mark.asyncio
+async def test_inline_simulation_streams_progress(monkeypatch):
+    """Test that an inline run's events reach SSE subscribers while the request still waits"""
+    pytest.importorskip("sentence_transformers")
+    phase_read = threading.Event()
+    
+    def fake_job(simulation_id, *args):
+        progress = ProgressReporter(progress_broker, simulation_channel(simulation_id))
+        progress.phase("solve")
+        # Only finishes once a subscriber has read the phase event
+        phase_read.wait(timeout=5)
+        progress.finish("completed")
+        return {"simulation_id": simulation_id, "status": "completed", "summary": {},
+                "new_links_count": 0, "solver_stats": {}}
+    
+    service, queue, project_id = await create_inline_service(monkeypatch, fake_job)
+    progress_broker.reset(simulation_channel(1))
+    run = asyncio.create_task(service.create_simulation(project_id, "inline", create_rules(), seed=1))
+    await wait_until(lambda: queue.get_job_info(1)["running"])
+    
+    events = []
+    async for chunk in sse_events(progress_broker, simulation_channel(1)):
+        events.append(chunk.split("\n")[0])
+        if events[-1] == "event: phase":
+            assert not run.done()
+            phase_read.set()
+    
+    assert events == ["event: queued", "event: phase", "event: completed"]
+    assert (await asyncio.wait_for(run, 5))["status"] == "completed"
+    
+    queue.shutdown(wait=True)
+
+@pytest.mark.asyncio
+async def test_submit_call_runs_simulator_on_worker(monkeypatch):
+    """Test that batch and sweep calls run on a worker thread with their own session"""
+    sessions = []
+    
+    class FakeSession:
+        def close(self):
+            sessions.append("closed")
+    
+    class FakeSimulator:
+        async def run_batch_simulation(self, project_id, scenarios):
+            return {"project_id": project_id, "scenarios": scenarios, "thread": threading.current_thread().name}
+    
+    monkeypatch.setattr(job_queue_module, "SessionLocal", FakeSession)
+    monkeypatch.setattr(job_queue_module, "_simulator", lambda db: FakeSimulator())
+    queue = SimulationJobQueue(max_workers=1)
+    
+    result = await queue.wait_for(queue.submit_call("run_batch_simulation", 10, [{"name": "a"}]))
+    
+    assert result["project_id"] == 10 and result["scenarios"] == [{"name": "a"}]
+    assert result["thread"].startswith("simulation-job")
+    assert sessions == ["closed"]
+    
+    queue.shutdown(wait=True)
@@ -62,4 +62,26 @@ async def test_pagerank_hub_and_authority():
     # Page 1 should have higher PageRank as it receives more links
     assert results[1] > results[2]
     assert results[1] > results[3] 
-    assert results[1] > results[4]
\ No newline at end of file
+    assert results[1] > results[4]
+
+@pytest.mark.asyncio
+async def test_pagerank_accepts_edge_arrays():
+    """Test that an (m, 2) edge array with aligned weights gives the same scores as tuples and a dict"""
+    import numpy as np
+    calculator = NetworkXPageRankCalculator()
+    
+    pages = [{'id': i} for i in range(1, 5)]
+    links = [(1, 2), (1, 3), (2, 3), (3, 1), (4, 3)]
+    weights = [1.0, 0.2, 1.0, 1.0, 0.5]
+    
+    expected = await calculator._calculate_with_sparse_matrix(
+        pages, links, 0.85, 100, 1e-8, dict(zip(links, weights))
+    )
+    sparse_results = await calculator._calculate_with_sparse_matrix(
+        pages, np.array(links), 0.85, 100, 1e-8, np.array(weights)
+    )
+    standard_results = await calculator._calculate_standard(pages, np.array(links), 0.85, 100, 1e-8, np.array(weights))
+    
+    for page_id in range(1, 5):
+        assert abs(sparse_results[page_id] - expected[page_id]) < 1e-12
+        assert abs(standard_results[page_id] - expected[page_id]) < 1e-4
@@ -0,0 +1,73 @@
+import pytest
+from app.core.progress import ProgressBroker, ProgressReporter, sse_events
+
+def test_reporter_estimates_eta_from_convergence_rate():
+    """Test that a geometric residual sequence yields its rate and a finite ETA"""
+    broker = ProgressBroker()
+    reporter = ProgressReporter(broker, "job", min_interval=0.0)
+    reporter.start_solve("pagerank", tolerance=1e-6)
+    
+    for iteration in range(5):
+        reporter.iteration(iteration, 0.5 ** iteration)
+    
+    last = broker._history["job"][-1]
+    assert last["type"] == "iteration"
+    assert last["convergence_rate"] == pytest.approx(0.5)
+    assert last["eta_seconds"] is not None and last["eta_seconds"] >= 0
+
+def test_reporter_throttles_but_reports_convergence():
+    """Test that throttled iterations are dropped except the one reaching the tolerance"""
+    broker = ProgressBroker()
+    reporter = ProgressReporter(broker, "job", min_interval=60.0)
+    reporter.start_solve("pagerank", tolerance=1e-3)
+    
+    for iteration, residual in enumerate([1.0, 0.1, 0.01, 0.0005, 0.0001]):
+        reporter.iteration(iteration, residual)
+    
+    iterations = [event["iteration"] for event in broker._history["job"]]
+    assert iterations == [0, 3]
+
+@pytest.mark.asyncio
+async def test_sse_events_replay_until_terminal_event():
+    """Test that a finished channel is replayed and the stream ends"""
+    broker = ProgressBroker()
+    reporter = ProgressReporter(broker, "job")
+    reporter.phase("loading")
+    reporter.phase("solve")
+    reporter.finish("completed")
+    
+    chunks = [chunk async for chunk in sse_events(broker, "job")]
+    
+    assert [chunk.split("\n")[0] for chunk in chunks] == [
+        "event: phase", "event: phase", "event: completed"
+    ]
+    assert '"timings"' in chunks[-1]
+
+@pytest.mark.asyncio
+async def test_calculate_pagerank_publishes_failure():
+    """Test that an error during the PageRank run ends the SSE stream with a failed event"""
+    pytest.importorskip("sentence_transformers")
+    from fastapi import HTTPException
+    from types import SimpleNamespace
+    from app.api.v1.endpoints.projects import calculate_pagerank
+    from app.core.progress import progress_broker, pagerank_channel
+
+    class ProjectRepo:
+        async def get_by_id(self, project_id):
+            return SimpleNamespace(id=project_id)
+
+    class PageRepo:
+        async def get_by_project(self, project_id):
+            return [SimpleNamespace(id=1, url="https://ex.com/")]
+
+    class FailingLinkRepo:
+        async def get_by_project(self, project_id):
+            raise RuntimeError("database is locked")
+
+    with pytest.raises(HTTPException) as error:
+        await calculate_pagerank(987654, project_repo=ProjectRepo(), page_repo=PageRepo(), link_repo=FailingLinkRepo())
+
+    assert error.value.status_code == 500
+    chunks = [chunk async for chunk in sse_events(progress_broker, pagerank_channel(987654))]
+    assert chunks[-1].startswith("event: failed")
+    assert "database is locked" in chunks[-1]
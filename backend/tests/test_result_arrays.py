@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from app.core.result_arrays import (
+    ResultArrays, encode_array, decode_array, encode_links, decode_links,
+    encode_cursor, decode_cursor, SCORE_DTYPE, DEPTH_DTYPE
+)
+
+def create_arrays(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return ResultArrays.build(
+        np.arange(1, n + 1),
+        rng.random(n) / n,
+        rng.normal(0, 1e-4, n),
+        rng.integers(-1, 6, n)
+    )
+
+def test_encode_roundtrip():
+    """Test that compressed columns decode to the same values"""
+    arrays = create_arrays()
+    
+    assert np.array_equal(decode_array(encode_array(arrays.pagerank_delta, SCORE_DTYPE), SCORE_DTYPE), arrays.pagerank_delta)
+    assert np.array_equal(decode_array(encode_array(arrays.new_click_depth, DEPTH_DTYPE), DEPTH_DTYPE), arrays.new_click_depth)
+
+def test_from_results_roundtrip():
+    """Test conversion from and to legacy per-page result dicts (values exact in float32)"""
+    results = [
+        {"page_id": 3, "new_pagerank": 0.25, "pagerank_delta": 0.125, "new_click_depth": 1},
+        {"page_id": 7, "new_pagerank": 0.75, "pagerank_delta": -0.125, "new_click_depth": -1},
+    ]
+    
+    assert ResultArrays.from_results(results).to_results() == results
+
+def test_top_k_matches_full_sort():
+    """Test that argpartition top-k returns the same rows as a full sort"""
+    arrays = create_arrays()
+    
+    top = arrays.top_k("pagerank_delta", 25, descending=True)
+    assert np.array_equal(top, np.argsort(-arrays.pagerank_delta.astype(np.float64), kind='stable')[:25])
+    
+    bottom = arrays.top_k("new_pagerank", 10, descending=False)
+    assert np.array_equal(bottom, np.argsort(arrays.new_pagerank, kind='stable')[:10])
+    
+    assert len(arrays.top_k("pagerank_delta", 5000)) == arrays.n_pages
+
+def test_links_roundtrip():
+    """Test that generated links decode to the same (from, to) pairs"""
+    links = [(1, 2), (1, 3), (40000, 7)]
+    
+    decoded = decode_links(encode_links(links))
+    assert decoded.shape == (3, 2)
+    assert [tuple(link) for link in decoded.tolist()] == links
+    assert decode_links(encode_links([])).shape == (0, 2)
+
+def test_page_rows_walks_all_rows_in_order():
+    """Test that cursor pages concatenate to the full (value, page_id) order"""
+    arrays = create_arrays(n=500)
+    values = np.round(arrays.sort_values("pagerank_delta"), 4)  # Many ties
+    mask = arrays.page_ids % 3 != 0
+    
+    seen = []
+    after = None
+    while True:
+        rows = arrays.page_rows(values, 37, descending=True, mask=mask, after=after)
+        if len(rows) == 0:
+            break
+        seen.extend(rows.tolist())
+        after = (values[rows[-1]], arrays.page_ids[rows[-1]])
+    
+    expected = np.flatnonzero(mask)
+    expected = expected[np.lexsort((arrays.page_ids[expected], -values[expected]))]
+    assert seen == expected.tolist()
+
+def test_cursor_roundtrip():
+    """Test that a cursor decodes to its value and only for the same sort"""
+    cursor = encode_cursor("percent_change", True, 0.1 + 0.2, 42)
+    
+    assert decode_cursor(cursor, "percent_change", True) == (0.1 + 0.2, 42)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "new_pagerank", True)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "percent_change", True)
+
+@pytest.mark.asyncio
+async def test_results_page_reports_the_sorted_percent_change():
+    """Test that listed percent changes follow the sort order and the cursor value"""
+    pytest.importorskip("sentence_transformers")
+    from types import SimpleNamespace
+    from app.core.simulator import PageRankSimulator
+    
+    arrays = create_arrays(n=200)
+    # Live scores drift from the run's float32 baseline (e.g. after a recalculation)
+    pages = {
+        page_id: SimpleNamespace(id=page_id, url=f"https://ex.com/{page_id}", type="product", category="/a/",
+                                 current_pagerank=baseline * (1 + 0.01 * (page_id % 7)), click_depth=1)
+        for page_id, baseline in zip(arrays.page_ids.tolist(), arrays.baseline_pagerank().tolist())
+    }
+    
+    class SimulationRepo:
+        async def get_by_id(self, simulation_id):
+            return SimpleNamespace(id=simulation_id, project_id=1)
+        
+        async def get_result_arrays(self, simulation_id):
+            return arrays
+    
+    class PageRepo:
+        async def get_by_ids(self, page_ids):
+            return [pages[page_id] for page_id in page_ids]
+    
+    simulator = PageRankSimulator(PageRepo(), None, SimulationRepo(), None)
+    page = await simulator.get_results_page(1, "percent_change", limit=50)
+    
+    reported = [row["percent_change"] for row in page["results"]]
+    assert reported == sorted(reported, reverse=True)
+    assert decode_cursor(page["next_cursor"], "percent_change", True)[0] == reported[-1]
@@ -0,0 +1,48 @@
+import numpy as np
+from app.core.result_summary import summarize_deltas, summarize_groups
+
+def create_vectors(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    current = rng.random(n) / n
+    new = current + rng.normal(0, 1e-4, n)
+    new[:10] = current[:10]  # Unchanged pages
+    return current, new
+
+def test_summary_matches_python_loop():
+    """Test that the vectorized summary matches the per-page computation"""
+    current, new = create_vectors()
+    deltas = [n - c for c, n in zip(current.tolist(), new.tolist())]
+    positive = [d for d in deltas if d > 0]
+    negative = [d for d in deltas if d < 0]
+    
+    summary = summarize_deltas(current, new)
+    
+    assert summary["pages_with_positive_change"] == len(positive)
+    assert summary["pages_with_negative_change"] == len(negative)
+    assert summary["pages_unchanged"] == 10
+    assert np.isclose(summary["average_delta"], sum(deltas) / len(deltas))
+    assert np.isclose(summary["max_positive_delta"], max(positive))
+    assert np.isclose(summary["max_negative_delta"], min(negative))
+    assert np.isclose(summary["total_pagerank_redistribution"], sum(abs(d) for d in deltas))
+    assert summary["delta_percentiles"]["p50"] == float(np.median(new - current))
+
+def test_summary_of_empty_project():
+    """Test that an empty result set gives zero counts"""
+    summary = summarize_deltas(np.zeros(0), np.zeros(0))
+    
+    assert summary["pages_unchanged"] == 0
+    assert summary["max_positive_delta"] == 0
+    assert summary["delta_percentiles"]["p95"] == 0.0
+
+def test_group_aggregates():
+    """Test per-type aggregates, with missing labels grouped under the default"""
+    current = np.array([0.1, 0.2, 0.3, 0.4])
+    new = np.array([0.15, 0.1, 0.3, 0.45])
+    
+    groups = summarize_groups(["blog", None, "blog", "product"], current, new, default_label="other")
+    
+    assert set(groups) == {"blog", "other", "product"}
+    assert groups["blog"]["pages"] == 2
+    assert np.isclose(groups["blog"]["total_delta"], 0.05)
+    assert groups["blog"]["pages_with_positive_change"] == 1
+    assert groups["other"]["pages_with_negative_change"] == 1
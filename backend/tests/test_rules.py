@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from app.core.rules.templates.same_category import SameCategoryRule
 from app.core.rules.templates.cross_sell import CrossSellRule
 from app.core.rules.base import RuleConfig
@@ -86,4 +87,227 @@ def test_rule_excludes_existing_links():
     new_links = rule.generate_links(pages, existing_links)
     
     # Should not include the existing link
-    assert (1, 2) not in new_links
\ No newline at end of file
+    assert (1, 2) not in new_links
+
+def test_multi_rule_seed_is_reproducible():
+    """Test that a fixed seed reproduces the same random links"""
+    from app.core.rules.multi_rule import MultiRule
+    
+    pages = [MockPage(i, 'product', '/electronics/', 0.001) for i in range(1, 21)]
+    rules = [{'source_types': ['product'], 'target_types': ['product'],
+              'selection_method': 'random', 'links_per_page': 3}]
+    
+    first = MultiRule(rules, seed=7).generate_links(pages, [])
+    second = MultiRule(rules, seed=7).generate_links(pages, [])
+    
+    assert first == second
+    assert len(first) == 20 * 3
+
+def assert_prefixes_match_smaller_links_per_page(pages, rules, existing, seed, ks):
+    """Links merged from the rank < k selections equal a run with links_per_page=k"""
+    from app.core.rules.multi_rule import MultiRule
+    
+    k_max = max(ks)
+    multi_rule = MultiRule([{**rule, 'links_per_page': k_max} for rule in rules], seed=seed)
+    selections = multi_rule.select_links(pages, existing)
+    
+    for k in ks:
+        smaller = MultiRule([{**rule, 'links_per_page': k} for rule in rules], seed=seed)
+        assert multi_rule.merge_selections(existing, selections, links_per_page=k) == smaller.generate_links(pages, existing)
+
+def create_catalog_pages():
+    """60 pages over 4 categories, one in five being a category page"""
+    categories = ['/a/', '/b/', '/c/', '/d/']
+    return [MockPage(i, 'category' if i % 5 == 0 else 'product', categories[i % 4], 0.001 * (i % 7))
+            for i in range(1, 61)]
+
+def test_multi_rule_ranked_prefix_matches_smaller_links_per_page():
+    """Test that rank < k reproduces links_per_page=k under the same seed"""
+    pages = [MockPage(i, 'product', '/electronics/', 0.001) for i in range(1, 21)]
+    rules = [{'source_types': ['product'], 'target_types': ['product'],
+              'selection_method': 'random', 'links_per_page': 5}]
+    
+    assert_prefixes_match_smaller_links_per_page(pages, rules, [], 11, (1, 3, 5))
+
+def test_ranked_prefix_matches_with_overlapping_rules():
+    """Test that prefixes stay exact when a later rule re-picks links of an earlier one"""
+    rules = [{'source_types': ['product'], 'target_types': [], 'selection_method': 'category'},
+             {'source_types': [], 'target_types': ['product'], 'selection_method': 'random'},
+             {'source_types': ['product'], 'target_types': [], 'selection_method': 'pagerank_high'}]
+    
+    assert_prefixes_match_smaller_links_per_page(create_catalog_pages(), rules, [(1, 9), (6, 2)], 3, (1, 2, 3, 6))
+
+def test_ranked_prefix_matches_with_bidirectional_rules():
+    """Test that prefixes stay exact when reverse links duplicate other forward links"""
+    rules = [{'source_types': ['product'], 'target_types': ['product'],
+              'selection_method': 'category', 'bidirectional': True},
+             {'source_types': [], 'target_types': [], 'selection_method': 'random', 'bidirectional': True}]
+    
+    assert_prefixes_match_smaller_links_per_page(create_catalog_pages(), rules, [(1, 9)], 5, (1, 2, 3, 4))
+
+def test_selector_prefixes_do_not_depend_on_links_per_page():
+    """Test that semantic fallback and pagerank_top_n picks extend when links_per_page grows"""
+    rules = [{'source_types': ['product'], 'target_types': [], 'selection_method': 'semantic', 'bidirectional': True},
+             {'source_types': [], 'target_types': ['product'], 'selection_method': 'pagerank_high', 'pagerank_top_n': 4}]
+    
+    assert_prefixes_match_smaller_links_per_page(create_catalog_pages(), rules, [(1, 9)], 5, (1, 2, 3, 4, 6))
+
+def test_link_worker_matches_in_process_generation():
+    """Test that the batch worker entry point generates the same links on page dicts"""
+    from app.core.rules.multi_rule import MultiRule, init_link_worker, generate_links_in_worker
+    
+    pages = create_mock_pages()
+    page_records = [{'id': p.id, 'type': p.type, 'category': p.category,
+                     'current_pagerank': p.current_pagerank} for p in pages]
+    rules = [{'source_types': ['product'], 'target_types': [],
+              'selection_method': 'pagerank_high', 'links_per_page': 2}]
+    
+    init_link_worker(page_records, [(1, 4)])
+    
+    assert generate_links_in_worker(rules) == MultiRule(rules).generate_links(pages, [(1, 4)])
+
+def test_partitioned_generation_matches_sequential(monkeypatch):
+    """Test that merging source partitions run in workers reproduces the sequential links"""
+    from app.core.rules import multi_rule as multi_rule_module
+    from app.core.rules.multi_rule import MultiRule, init_link_worker, select_partition_in_worker
+    
+    monkeypatch.setattr(multi_rule_module, 'PARTITION_SOURCES', 7)
+    categories = ['/a/', '/b/', '/c/']
+    page_records = [{'id': i, 'type': 'product' if i % 4 else 'category', 'category': categories[i % 3],
+                     'current_pagerank': 0.001 * (i % 5)} for i in range(1, 41)]
+    # Overlapping rules: the second one mostly re-picks links of the first
+    rules = [{'source_types': ['product'], 'target_types': [],
+              'selection_method': 'category', 'links_per_page': 3, 'bidirectional': True},
+             {'source_types': [], 'target_types': ['product'],
+              'selection_method': 'pagerank_high', 'links_per_page': 2}]
+    existing = [(1, 2), (5, 8), (12, 4)]
+    multi_rule = MultiRule(rules, seed=3)
+    
+    tasks = multi_rule.partitions(page_records)
+    init_link_worker(page_records, existing)
+    results = [select_partition_in_worker(rules, 3, *task) for task in tasks]
+    
+    assert len(tasks) > 2
+    for (rule_index, joined), (expected_index, expected) in zip(multi_rule.join_partitions(tasks, results),
+                                                                multi_rule.select_links(page_records, existing)):
+        assert rule_index == expected_index
+        assert all(np.array_equal(column, expected_column) for column, expected_column in zip(joined, expected))
+
+def test_page_index_filters_rows_case_insensitively():
+    """Test that the page index filters types and categories like the rules expect"""
+    from app.core.page_index import PageIndex
+    
+    pages = create_mock_pages() + [MockPage(5, None, None, 0.0)]
+    index = PageIndex(pages)
+    
+    assert index.page_ids(index.filter_rows(['Product'], [])) == [1, 2, 3]
+    assert index.page_ids(index.filter_rows(['product'], ['/ELECTRONICS/'])) == [1, 2]
+    assert index.page_ids(index.filter_rows([], [])) == [1, 2, 3, 4, 5]
+    assert index.page_ids(index.filter_rows(['blog'], [])) == []
+    assert index.category_codes[0] == index.category_codes[3]
+
+def test_multi_rule_accepts_prebuilt_page_index():
+    """Test that a shared page index generates the same links as the page list"""
+    from app.core.rules.multi_rule import MultiRule
+    from app.core.page_index import PageIndex
+    
+    pages = create_mock_pages()
+    rules = [{'source_types': ['product'], 'target_types': [],
+              'selection_method': 'category', 'links_per_page': 2, 'bidirectional': True}]
+    
+    assert (MultiRule(rules, seed=3).generate_links(PageIndex(pages), [])
+            == MultiRule(rules, seed=3).generate_links(pages, []))
+
+def test_multi_rule_skips_existing_targets_during_selection():
+    """Test that existing links and self-links do not use up a source's picks"""
+    from app.core.rules.multi_rule import MultiRule
+    
+    pages = [MockPage(i, 'product', '/electronics/', 0.001 * i) for i in range(1, 6)]
+    existing_links = [(1, 2), (1, 3), (1, 4)]
+    
+    for method in ('random', 'category', 'pagerank_high', 'pagerank_low'):
+        rules = [{'source_types': ['product'], 'target_types': ['product'],
+                  'selection_method': method, 'links_per_page': 1}]
+        links = MultiRule(rules, seed=1).generate_links(pages, existing_links)
+        
+        assert (1, 5) in links
+        assert all(a != b for a, b in links)
+        assert len(links) == len(pages)
+
+def test_candidate_pool_category_buckets():
+    """Test that the category buckets of a candidate pool split the candidates"""
+    from app.core.page_index import PageIndex
+    
+    pages = create_mock_pages() + [MockPage(5, 'product', '/clothing/', 0.0)]
+    index = PageIndex(pages)
+    pool = index.candidates(index.filter_rows(['product'], []))
+    
+    assert index.page_ids(pool.same_category(0)) == [1, 2]
+    assert index.page_ids(pool.same_category(3)) == [1, 2]
+    assert index.page_ids(list(pool.other_categories(0))) == [3, 5]
+    assert index.page_ids(pool.same_category(2)) == [3, 5]
+    assert index.page_ids(list(pool.other_categories(2))) == [1, 2]
+
+def test_pagerank_selector_spreads_over_top_n():
+    """Test that pagerank_top_n draws targets among the N best pages"""
+    from app.core.rules.multi_rule import MultiRule
+    
+    pages = [MockPage(i, 'product', '/electronics/', 0.001 * i) for i in range(1, 31)]
+    rules = [{'source_types': ['product'], 'target_types': ['product'],
+              'selection_method': 'pagerank_high', 'links_per_page': 2}]
+    
+    best = MultiRule(rules, seed=5).generate_links(pages, [])
+    spread = MultiRule([{**rules[0], 'pagerank_top_n': 10}], seed=5).generate_links(pages, [])
+    
+    assert {target for _, target in best} == {28, 29, 30}
+    assert {target for _, target in spread} <= set(range(20, 31))
+    assert len({target for _, target in spread}) > 3
+    assert len(spread) == len(best) == 30 * 2
+
+def test_footer_rule_emits_edge_arrays():
+    """Test that footer rules emit source x target edges grouped by source, without self-links"""
+    from app.core.rules.templates.footer_modification import FooterModificationRule
+    
+    pages = [{'id': i, 'url': f'https://ex.com/{kind}/{i}', 'type': kind}
+             for i, kind in enumerate(['product', 'blog', 'product', 'category', 'product'], start=1)]
+    config = RuleConfig(
+        source_filter={'target_urls': ['/product/1', '/category/'], 'source_types': ['Product']},
+        target_selector='footer_modification',
+        links_count=1
+    )
+    
+    from_ids, to_ids = FooterModificationRule(config).generate_edges(pages, [])
+    
+    assert list(zip(from_ids.tolist(), to_ids.tolist())) == [(1, 4), (3, 1), (3, 4), (5, 1), (5, 4)]
+    assert FooterModificationRule(config).generate_links(pages, []) == [(1, 4), (3, 1), (3, 4), (5, 1), (5, 4)]
+
+def test_removal_rules_mask_existing_links():
+    """Test that removal rules delete existing links and leave additions to the other rules"""
+    from app.core.rules.multi_rule import MultiRule
+    
+    # Ids out of page order, so the adjacency rows are not sorted by id
+    pages = [{'id': page_id, 'url': f'https://ex.com/{kind}/{page_id}', 'type': kind, 'category': '/c/', 'current_pagerank': 0.0}
+             for page_id, kind in [(3, 'menu'), (1, 'product'), (2, 'product'), (4, 'category')]]
+    existing = [(1, 3), (2, 3), (3, 1), (4, 3), (1, 2), (4, 1)]
+    rules = [{'source_types': ['product'], 'target_types': ['category'], 'selection_method': 'random', 'links_per_page': 1},
+             {'action': 'remove', 'source_types': ['product'], 'target_urls': ['/menu/'], 'bidirectional': True}]
+    
+    multi_rule = MultiRule(rules, seed=3)
+    
+    assert multi_rule.removed_links(pages, existing).to_links() == [(1, 3), (2, 3), (3, 1)]
+    assert sorted(multi_rule.generate_links(pages, existing)) == [(1, 4), (2, 4)]
+    assert MultiRule(rules[:1]).removed_links(pages, existing).to_links() == []
+
+def test_target_urls_restrict_added_links():
+    """Test that target_urls limits the targets of an adding rule"""
+    from app.core.rules.multi_rule import MultiRule
+    
+    pages = [MockPage(i, 'product', '/electronics/', 0.001) for i in range(1, 6)]
+    for page in pages:
+        page.url = f'https://ex.com/p/{page.id}'
+    rules = [{'source_types': ['product'], 'target_urls': ['/p/4', '/p/5'], 'selection_method': 'random', 'links_per_page': 3}]
+    
+    links = MultiRule(rules, seed=1).generate_links(pages, [])
+    
+    assert {target for _, target in links} == {4, 5}
+    assert len(links) == 3 * 2 + 2 * 1
\ No newline at end of file
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from app.core.semantic_index import SemanticIndex, embeddings_fingerprint
+
+def create_vectors(n=3000, dim=32, clusters=40, seed=0):
+    """Clustered random embeddings (pages of the same topic are close)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+
+def exact_neighbours(vectors, query_row, k, candidates):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized[candidates] @ normalized[query_row]
+    return candidates[np.lexsort((candidates, -scores))][:k].tolist()
+
+def test_exact_search_matches_brute_force():
+    """Test that small indexes return the exact nearest candidates, best first"""
+    vectors = create_vectors(n=500)
+    index = SemanticIndex.build(np.arange(500), vectors, ivf_min_pages=1000)
+    candidates = np.arange(0, 500, 2)
+    mask = np.zeros(500, dtype=bool)
+    mask[candidates] = True
+
+    assert not index.is_ivf
+    assert index.search(10, 5, mask, candidates) == exact_neighbours(vectors, 10, 5, candidates)
+
+def test_search_skips_rejected_rows():
+    """Test that rows refused by accept are replaced by the next best ones"""
+    vectors = create_vectors(n=500)
+    index = SemanticIndex.build(np.arange(500), vectors, ivf_min_pages=1000)
+    candidates = np.arange(500)
+    mask = np.ones(500, dtype=bool)
+
+    expected = exact_neighbours(vectors, 7, 6, candidates)
+    found = index.search(7, 4, mask, candidates, accept=lambda row: row not in (7, expected[1]))
+
+    assert found == [row for row in expected if row not in (7, expected[1])][:4]
+
+def test_ivf_search_recall():
+    """Test that the IVF index finds most of the exact neighbours"""
+    vectors = create_vectors()
+    index = SemanticIndex.build(np.arange(len(vectors)), vectors, ivf_min_pages=1000)
+    candidates = np.arange(len(vectors))
+    mask = np.ones(len(vectors), dtype=bool)
+
+    assert index.is_ivf
+    # IVF rows are stored list by list: compare page ids
+    row_of_page = np.argsort(index.page_ids)
+    hits = 0
+    for page in range(0, 3000, 100):
+        expected = set(exact_neighbours(vectors, page, 10, candidates))
+        found = index.page_ids[index.search(row_of_page[page], 10, mask, candidates)]
+        hits += len(expected & set(found.tolist()))
+
+    assert hits / (30 * 10) > 0.9
+
+def test_ivf_search_widens_probe_for_sparse_candidates():
+    """Test that a query still finds k rows when few candidates are near it"""
+    vectors = create_vectors()
+    index = SemanticIndex.build(np.arange(len(vectors)), vectors, ivf_min_pages=1000, n_probe=1)
+    candidates = np.arange(0, len(vectors), 97)
+    mask = np.zeros(len(vectors), dtype=bool)
+    mask[candidates] = True
+
+    found = index.search(5, 10, mask, candidates)
+
+    assert len(found) == 10
+    assert set(found) <= set(candidates.tolist())
+
+def test_record_roundtrip():
+    """Test that a stored index gives the same neighbours"""
+    vectors = create_vectors()
+    index = SemanticIndex.build(np.arange(len(vectors)), vectors, fingerprint="abc", ivf_min_pages=1000)
+    restored = SemanticIndex.from_record(index.to_record())
+    candidates = np.arange(len(vectors))
+    mask = np.ones(len(vectors), dtype=bool)
+
+    assert restored.fingerprint == "abc"
+    assert np.array_equal(restored.page_ids, index.page_ids)
+    assert np.array_equal(restored.list_bounds, index.list_bounds)
+    overlap = len(set(restored.search(3, 10, mask, candidates)) & set(index.search(3, 10, mask, candidates)))
+    assert overlap >= 9
+
+def test_fingerprint_ignores_order():
+    """Test that the fingerprint depends on the pages and content, not their order"""
+    assert embeddings_fingerprint([(1, "a"), (2, "b")]) == embeddings_fingerprint([(2, "b"), (1, "a")])
+    assert embeddings_fingerprint([(1, "a"), (2, "b")]) != embeddings_fingerprint([(1, "a"), (2, "c")])
+
+def test_semantic_selector_links_nearest_pages():
+    """Test that semantic rules link each page to its nearest candidates"""
+    from app.core.page_index import PageIndex
+    from app.core.rules.multi_rule import MultiRule
+
+    vectors = np.array([[1, 0], [0.9, 0.1], [0, 1], [0.1, 0.9], [0.7, 0.7]], dtype=np.float32)
+    pages = [{'id': i + 1, 'type': 'product', 'category': '/a/' if i < 4 else '/b/', 'current_pagerank': 0.0}
+             for i in range(5)]
+    index = PageIndex(pages)
+    # Page 5 has no embedding: it falls back to the category mix and is not a semantic target
+    index.attach_semantic(SemanticIndex.build([1, 2, 3, 4], vectors[:4]))
+    rules = [{'source_types': ['product'], 'target_types': [],
+              'selection_method': 'semantic', 'links_per_page': 1}]
+
+    links = MultiRule(rules, seed=1).generate_links(index, [(1, 2)])
+
+    assert (2, 1) in links and (3, 4) in links and (4, 3) in links
+    # Existing link 1 -> 2 is skipped, the next nearest page is used
+    assert (1, 4) in links
+    assert len([link for link in links if link[0] == 5]) == 1
+    assert all(target != 5 for source, target in links if source != 5)
@@ -0,0 +1,71 @@
+import pytest
+from types import SimpleNamespace
+from app.core.simulation_cache import canonical_payload, payload_seed, simulation_cache_key, resolve_seed_and_key
+
+RULES = [
+    {"source_types": ["product", "blog"], "target_types": ["category"], "selection_method": "random", "links_per_page": 3},
+    {"source_types": [], "target_types": ["product"], "selection_method": "pagerank_high", "links_per_page": 1},
+]
+BOOSTS = [{"url": "https://ex.com/a", "boost_factor": 2.0}, {"url": "https://ex.com/b", "boost_factor": 1.5}]
+
+def test_key_ignores_set_ordering():
+    """Test that reordered filters and boosts give the same cache key"""
+    reordered_rules = [{**RULES[0], "source_types": ["blog", "product"]}, RULES[1]]
+    
+    first = canonical_payload(RULES, BOOSTS)
+    second = canonical_payload(reordered_rules, list(reversed(BOOSTS)))
+    
+    assert first == second
+    assert simulation_cache_key(1, 3, first, 42) == simulation_cache_key(1, 3, second, 42)
+
+def test_key_changes_with_inputs():
+    """Test that rule order, graph version and seed are part of the key"""
+    payload = canonical_payload(RULES, BOOSTS)
+    key = simulation_cache_key(1, 3, payload, 42)
+    
+    assert simulation_cache_key(1, 4, payload, 42) != key
+    assert simulation_cache_key(1, 3, payload, 43) != key
+    assert simulation_cache_key(2, 3, payload, 42) != key
+    assert simulation_cache_key(1, 3, canonical_payload(list(reversed(RULES)), BOOSTS), 42) != key
+    assert simulation_cache_key(1, 3, payload, 42, pages_version=1) != key
+    assert simulation_cache_key(1, 3, payload, 42, embeddings_fingerprint="abc") != key
+
+def test_default_seed_is_deterministic():
+    """Test that identical requests without a seed resolve to the same seed and key"""
+    project = SimpleNamespace(id=1, links_version=3, pages_version=5)
+    
+    seed, key = resolve_seed_and_key(project, RULES, BOOSTS)
+    assert (seed, key) == resolve_seed_and_key(project, RULES, list(reversed(BOOSTS)))
+    assert seed == payload_seed(canonical_payload(RULES, BOOSTS))
+    assert resolve_seed_and_key(project, RULES, BOOSTS, seed=7)[0] == 7
+
+@pytest.mark.asyncio
+async def test_page_category_change_misses_cache():
+    """Test that re-importing pages with another category invalidates the stored results"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.base import Base
+    from app.repositories.sqlite import SQLitePageRepository, SQLiteProjectRepository, SQLiteSimulationRepository
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    projects, pages, simulations = SQLiteProjectRepository(db), SQLitePageRepository(db), SQLiteSimulationRepository(db)
+    
+    project = await projects.create("demo", "https://ex.com")
+    page_rows = [{"project_id": project.id, "url": f"https://ex.com/p{i}", "type": "product", "category": "/a/"}
+                 for i in range(3)]
+    await pages.bulk_insert(page_rows)
+    seed, key = resolve_seed_and_key(await projects.get_by_id(project.id), RULES)
+    simulation = await simulations.create(project.id, "first", RULES, seed=seed, cache_key=key)
+    await simulations.update_status(simulation.id, "completed")
+    assert (await simulations.find_cached(project.id, key)).id == simulation.id
+    
+    # Same URLs, one page moved to another category
+    await pages.delete_by_project(project.id)
+    await pages.bulk_insert([{**page_rows[0], "category": "/b/"}] + page_rows[1:])
+    _, new_key = resolve_seed_and_key(await projects.get_by_id(project.id), RULES)
+    
+    assert new_key != key
+    assert await simulations.find_cached(project.id, new_key) is None
+
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from app.core.url_matcher import UrlMatcher, get_url_matcher
+from app.core.rules.base import RuleConfig
+from app.core.rules.templates.menu_modification import MenuModificationRule
+
+URLS = [
+    "https://ex.com/",
+    "https://ex.com/blog/guide",
+    "https://ex.com/produit/chaussure",
+    "https://ex.com/blog/",
+    "https://ex.com/produit/chaussure-rouge",
+]
+
+def brute_force(patterns):
+    return [row for row, url in enumerate(URLS) if any(pattern == url or pattern in url for pattern in patterns)]
+
+def test_rows_containing_matches_substring_scan():
+    """Test that pattern matching gives the same rows as checking every URL"""
+    matcher = UrlMatcher(range(10, 15), URLS)
+
+    for patterns in (["/blog/"], ["chaussure"], ["https://ex.com/"], ["/blog/", "rouge"], ["absent"], []):
+        assert matcher.rows_containing(patterns).tolist() == brute_force(patterns)
+    # A pattern never spans two URLs
+    assert matcher.rows_containing(["guide\nhttps"]).tolist() == []
+    assert matcher.ids_containing(["rouge"]) == [14]
+
+def test_resolve_exact_urls():
+    """Test that exact lookups only return known URLs"""
+    matcher = UrlMatcher(range(10, 15), URLS)
+
+    assert matcher.resolve(["https://ex.com/blog/", "https://ex.com/blog", None]) == {"https://ex.com/blog/": 13}
+
+def test_matcher_is_reused_until_pages_version_changes():
+    """Test that a project's matcher is cached per pages version"""
+    pages = [{"id": i, "url": url, "project_id": 999} for i, url in enumerate(URLS)]
+
+    matcher = get_url_matcher(pages, pages_version=1)
+    assert get_url_matcher([dict(page) for page in pages], pages_version=1) is matcher
+    assert get_url_matcher(pages, pages_version=2) is not matcher
+    # Without a version the matcher is built from the pages
+    pages[1]["url"] = "https://ex.com/blog/autre"
+    assert get_url_matcher(pages).resolve(["https://ex.com/blog/autre"]) == {"https://ex.com/blog/autre": 1}
+
+def test_matcher_uses_version_of_page_project():
+    """Test that ORM pages are keyed on their project's pages_version"""
+    project = SimpleNamespace(pages_version=3)
+    pages = [SimpleNamespace(id=i, url=url, project_id=998, project=project) for i, url in enumerate(URLS)]
+
+    matcher = get_url_matcher(pages)
+    assert get_url_matcher(pages) is matcher
+    project.pages_version = 4
+    assert get_url_matcher(pages) is not matcher
+
+def test_matcher_rows_follow_caller_page_order():
+    """Test that the same pages in another order do not reuse a matcher built for the first order"""
+    project = SimpleNamespace(pages_version=1)
+    pages = [SimpleNamespace(id=i, url=url, project_id=997, project=project) for i, url in enumerate(URLS)]
+    reordered = pages[1:] + pages[:1]
+
+    get_url_matcher(pages)
+    rows = get_url_matcher(reordered).rows_containing(["/blog/"])
+
+    assert [reordered[row].url for row in rows] == ["https://ex.com/blog/guide", "https://ex.com/blog/"]
+
+def test_menu_rule_targets_matching_pages():
+    """Test that menu rules link every page to the pages matching target_urls"""
+    pages = [{"id": i + 1, "url": url, "type": "page"} for i, url in enumerate(URLS)]
+    config = RuleConfig(source_filter={"target_urls": ["/blog/"]}, target_selector="menu_modification", links_count=1)
+
+    links = MenuModificationRule(config).generate_links(pages, [])
+
+    assert sorted(links) == sorted((source, target) for source in range(1, 6) for target in (2, 4) if source != target)